@@ -0,0 +1,58 @@
+from collections.abc import Callable  # noqa: D100
+from typing import Any
+
+from .blocking_calls import blocking_calls_layer
+from .cfg_dataflow import dataflow_layer
+from .cfg_dominators import dominator_layer
+from .cfg_metrics import metrics_layer
+from .cfg_paths import paths_layer
+from .concurrent_awaits import concurrent_awaits_layer
+from .db_round_trips import db_round_trips_layer
+from .di_graph import di_graph_layer
+from .import_cost import import_cost_layer
+from .lazy_loads import lazy_loads_layer
+from .n_plus_one import n_plus_one_layer
+from .table_access import table_access_layer
+
+# name -> layer(dependencies, project_analyzer, options); results go to
+# output["analyses"], options come from the scan request per layer name
+ANALYSIS_LAYERS: dict[str, Callable[[dict[str, Any], Any, dict[str, Any]], Any]] = {
+    "blocking_calls": blocking_calls_layer,
+    "concurrent_awaits": concurrent_awaits_layer,
+    "dataflow": dataflow_layer,
+    "db_round_trips": db_round_trips_layer,
+    "di_graph": di_graph_layer,
+    "dominators": dominator_layer,
+    "import_cost": import_cost_layer,
+    "lazy_loads": lazy_loads_layer,
+    "metrics": metrics_layer,
+    "n_plus_one": n_plus_one_layer,
+    "paths": paths_layer,
+    "table_access": table_access_layer,
+}
+
+
+def check_analysis_names(names: list[str]) -> None:
+    """Fail fast, before scanning, on layers that do not exist."""  # noqa: DOC501
+    unknown = [name for name in names if name not in ANALYSIS_LAYERS]
+    if unknown:
+        msg = (
+            f"Unknown analyses: {', '.join(unknown)}; "
+            f"available: {', '.join(ANALYSIS_LAYERS)}"
+        )
+        raise ValueError(msg)
+
+
+def run_analysis_layers(
+    dependencies: dict[str, Any],
+    names: list[str],
+    analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Run the requested optional analysis layers over a finished scan."""  # noqa: DOC201
+    check_analysis_names(names)
+    options = options or {}
+    return {
+        name: ANALYSIS_LAYERS[name](dependencies, analyzer, options.get(name, {}))
+        for name in names
+    }
@@ -0,0 +1,129 @@
+from typing import Any  # noqa: D100
+
+from .call_graph import CallGraph
+from .db_calls import DEFAULT_DB_CALL_PATTERNS, CallMatcher
+
+# category -> fnmatch patterns over import-qualified external call names
+DEFAULT_BLOCKING_CATALOG: dict[str, list[str]] = {
+    "sleep": ["time.sleep"],
+    "http": [
+        "requests.*",
+        "urllib.request.*",
+        "urllib3.*",
+        "http.client.*",
+        "httpx.get",
+        "httpx.post",
+        "httpx.put",
+        "httpx.patch",
+        "httpx.delete",
+        "httpx.head",
+        "httpx.request",
+        "httpx.stream",
+        "httpx.Client",
+    ],
+    "file_io": [
+        "open",
+        "io.open",
+        "*.read_text",
+        "*.write_text",
+        "*.read_bytes",
+        "*.write_bytes",
+        "shutil.*",
+        "os.listdir",
+        "os.walk",
+        "os.remove",
+        "os.makedirs",
+        "json.load",
+        "json.dump",
+        "pickle.load",
+        "pickle.dump",
+    ],
+    "subprocess": ["subprocess.*", "os.system", "os.popen"],
+    "sync_db": [
+        "sqlalchemy.create_engine",
+        "sqlmodel.create_engine",
+        "psycopg2.connect",
+        "sqlite3.connect",
+        "pymysql.connect",
+    ],
+}
+
+
+class BlockingCatalog:
+    """Classifies external calls into blocking-API categories."""
+
+    def __init__(  # noqa: D107
+        self,
+        catalog: dict[str, list[str]],
+        db_patterns: tuple[str, ...] | list[str] = DEFAULT_DB_CALL_PATTERNS,
+    ) -> "BlockingCatalog":
+        self.matchers = {
+            category: CallMatcher(patterns) for category, patterns in catalog.items()
+        }
+        self.db_calls = CallMatcher(db_patterns)
+
+    def classify(self, call: dict[str, Any]) -> str | None:
+        """Category of a blocking ``external_calls`` record, or None."""  # noqa: DOC201
+        for category, matcher in self.matchers.items():
+            if matcher.matches(call["name"]):
+                return category
+        # AsyncSession methods are awaited, a sync Session's are not
+        if not call.get("awaited") and self.db_calls.matches(call["name"]):
+            return "sync_db"
+        return None
+
+
+def blocking_calls_layer(
+    dependencies: dict[str, Any],
+    _analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Blocking calls reachable from every ``async def`` handler.
+
+    ``options["catalog"]`` replaces ``DEFAULT_BLOCKING_CATALOG`` and
+    ``options["db_patterns"]`` the session calls that block when not awaited.
+    Returns the classified external-call index and a per-handler report.
+    """  # noqa: DOC201
+    options = options or {}
+    catalog = BlockingCatalog(
+        options.get("catalog") or DEFAULT_BLOCKING_CATALOG,
+        options.get("db_patterns") or DEFAULT_DB_CALL_PATTERNS,
+    )
+    call_graph = CallGraph(dependencies)
+
+    index: dict[str, list[dict[str, Any]]] = {}
+    blocking: dict[int, list[dict[str, Any]]] = {}
+    for function_id, node in enumerate(call_graph.nodes):
+        for call in node.get("external_calls", []):
+            category = catalog.classify(call)
+            if category is None:
+                continue
+            record = {
+                "function": call_graph.names[function_id],
+                "call": call["name"],
+                "lineno": call["lineno"],
+                "category": category,
+            }
+            index.setdefault(category, []).append(record)
+            blocking.setdefault(function_id, []).append(record)
+
+    handlers = []
+    for function_id, node in enumerate(call_graph.nodes):
+        if node.get("type") != "handler" or not node.get("async"):
+            continue
+        found = [
+            {**call, "chain": chain}
+            for callee, chain in call_graph.call_chains(function_id).items()
+            for call in blocking.get(callee, [])
+        ]
+        if found:
+            handlers.append(
+                {
+                    "symbol": call_graph.names[function_id],
+                    "http_method": node.get("http_method"),
+                    "path": node.get("path"),
+                    "blocking_calls": found,
+                },
+            )
+    handlers.sort(key=lambda handler: -len(handler["blocking_calls"]))
+    return {"index": index, "handlers": handlers}
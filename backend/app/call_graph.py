@@ -0,0 +1,145 @@
+from collections import defaultdict, deque  # noqa: D100
+from collections.abc import Iterator
+from typing import Any
+
+FUNCTION_TYPES = ("function", "handler")
+
+
+def function_symbol(module: str, qualname: str) -> str:
+    """Qualified symbol used across the scan output: ``<module file>:<qualname>``."""  # noqa: DOC201
+    return f"{module}:{qualname}"
+
+
+def iter_functions(
+    dependencies: dict[str, Any],
+) -> Iterator[tuple[str, str, str, dict[str, Any]]]:
+    """Yield ``(symbol, module, qualname, node)`` for every function in a scan."""  # noqa: DOC402
+    for module_info in dependencies.get("modules", []):
+        module = module_info["module"]
+        stack = [
+            (child, "")
+            for child in reversed(module_info.get("tree", {}).get("children", []))
+        ]
+        while stack:
+            node, prefix = stack.pop()
+            qualname = f"{prefix}{node['name']}"
+            if node.get("type") in FUNCTION_TYPES:
+                yield function_symbol(module, qualname), module, qualname, node
+            stack.extend(
+                (child, f"{qualname}.") for child in reversed(node.get("children", []))
+            )
+
+
+class CallGraph:
+    """Integer-indexed graph of resolved internal calls between scanned functions."""
+
+    def __init__(self, dependencies: dict[str, Any]) -> "CallGraph":  # noqa: D107
+        self.names: list[str] = []
+        self.nodes: list[dict[str, Any]] = []
+        self.modules: list[str] = []
+        self.index: dict[str, int] = {}
+        # (module, short name) -> function ids, for resolving call sites
+        self._by_short_name: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._module_cache: dict[str, str | None] = {}
+
+        functions = list(iter_functions(dependencies))
+        for symbol, module, qualname, node in functions:
+            function_id = len(self.names)
+            self.names.append(symbol)
+            self.nodes.append(node)
+            self.modules.append(module)
+            self.index[symbol] = function_id
+            short_name = qualname.rsplit(".", maxsplit=1)[-1]
+            candidates = self._by_short_name[module, short_name]
+            if "." in qualname:
+                candidates.append(function_id)
+            else:
+                # module-level functions shadow same-named methods
+                candidates.insert(0, function_id)
+            if short_name == "__init__" and "." in qualname:
+                # calling a class runs its constructor
+                class_name = qualname.rsplit(".", maxsplit=2)[-2]
+                self._by_short_name[module, class_name].append(function_id)
+
+        self._scanned_modules = {
+            module_info["module"] for module_info in dependencies.get("modules", [])
+        }
+
+        self.successors: list[list[int]] = [[] for _ in self.names]
+        self.predecessors: list[list[int]] = [[] for _ in self.names]
+        self.call_sites: dict[tuple[int, int], int] = defaultdict(int)
+
+        for caller, (_, module, _, node) in enumerate(functions):
+            for call in node.get("calls", []):
+                callee = self.resolve_call(module, call)
+                if callee is None:
+                    continue
+                if (caller, callee) not in self.call_sites:
+                    self.successors[caller].append(callee)
+                    self.predecessors[callee].append(caller)
+                self.call_sites[caller, callee] += 1
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.names)
+
+    def _scanned_module(self, call_module: str) -> str | None:
+        # call records carry the analyzer's module key (project root + file path)
+        if call_module not in self._module_cache:
+            match = None
+            if call_module in self._scanned_modules:
+                match = call_module
+            else:
+                for module in self._scanned_modules:
+                    if call_module.endswith(f"/{module}") and (
+                        match is None or len(module) > len(match)
+                    ):
+                        match = module
+            self._module_cache[call_module] = match
+        return self._module_cache[call_module]
+
+    def resolve_call(self, caller_module: str, call: dict[str, Any]) -> int | None:
+        """Map a ``calls`` record onto a function id, or None if it is not scanned."""  # noqa: DOC201
+        if call.get("type") not in {"local", "internal"}:
+            return None
+        module = (
+            caller_module
+            if call.get("module") is None
+            else self._scanned_module(call["module"])
+        )
+        if module is None:
+            return None
+        candidates = self._by_short_name.get((module, call["function"]))
+        if not candidates:
+            return None
+        return candidates[0]
+
+    def call_site_targets(self, function_id: int) -> dict[tuple[int, str], int]:
+        """Resolved callees of one function keyed by ``(lineno, short name)``."""  # noqa: DOC201
+        resolved = {}
+        for call in self.nodes[function_id].get("calls", []):
+            callee = self.resolve_call(self.modules[function_id], call)
+            if callee is not None:
+                resolved[call["lineno"], call["function"]] = callee
+        return resolved
+
+    def call_chains(self, start: int) -> dict[int, list[str]]:
+        """Shortest call chain from ``start`` to every function it reaches, in BFS order."""  # noqa: DOC201
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            function_id = queue.popleft()
+            for callee in self.successors[function_id]:
+                if callee not in parent:
+                    parent[callee] = function_id
+                    queue.append(callee)
+
+        chains = {}
+        for function_id in parent:
+            chain = []
+            node = function_id
+            while node is not None:
+                chain.append(self.names[node])
+                node = parent[node]
+            chain.reverse()
+            chains[function_id] = chain
+        return chains
@@ -0,0 +1,217 @@
+import ast  # noqa: D100
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import app.cfg_visitor as cfg_visitor
+
+
+# statements whose AST node spans their whole body
+COMPOUND_STATEMENTS = {
+    "FunctionDef",
+    "AsyncFunctionDef",
+    "ClassDef",
+    "For",
+    "AsyncFor",
+    "With",
+    "AsyncWith",
+    "Try",
+    "TryStar",
+}
+
+
+def _last_line(node: dict[str, Any]) -> int | None:
+    if node["ast_type"] in COMPOUND_STATEMENTS:
+        return node.get("lineno")
+    return node.get("end_lineno")
+
+
+def _is_synthetic(node: dict[str, Any]) -> bool:
+    # branch/merge/body markers created by CFGVisitor without a statement
+    return node["ast_type"] is None and not node["label"].startswith("Parameters")
+
+
+def _replace_edge(edges: list[int], old: int, new: int) -> None:
+    # keep branch order: the replacement takes the place of the removed node
+    position = edges.index(old)
+    if new in edges:
+        edges.pop(position)
+    else:
+        edges[position] = new
+
+
+def _remove_pass_through(
+    cfg: dict[str, Any],
+    successors: dict[int, list[int]],
+    predecessors: dict[int, list[int]],
+) -> None:
+    protected = {cfg["entry_node_id"], cfg["exit_node_id"]}
+    for node in cfg["nodes"]:
+        node_id = node["id"]
+        if node_id in protected or not _is_synthetic(node):
+            continue
+        targets = successors[node_id]
+        sources = predecessors[node_id]
+        if len(targets) > 1 or node_id in targets:
+            continue
+
+        target = targets[0] if targets else None
+        for source in sources:
+            if target is None:
+                successors[source].remove(node_id)
+            else:
+                _replace_edge(successors[source], node_id, target)
+        if target is not None:
+            predecessors[target].remove(node_id)
+            for source in sources:
+                if source not in predecessors[target]:
+                    predecessors[target].append(source)
+
+        del successors[node_id]
+        del predecessors[node_id]
+
+
+def compact_cfg(cfg: dict[str, Any]) -> dict[str, Any]:
+    """Merge straight-line runs of a CFG into basic blocks.
+
+    Pass-through synthetic nodes ("If merge", "For body", ...) are removed
+    first. The result keeps the node schema of ``CFGVisitor.to_json`` so it
+    can be rendered the same way; every block lists its original node ids
+    and the statement line range it covers.
+    """  # noqa: DOC201
+    if "nodes" not in cfg:
+        return cfg
+
+    nodes = {node["id"]: node for node in cfg["nodes"]}
+    successors = {node["id"]: list(node["successors"]) for node in cfg["nodes"]}
+    predecessors = {node["id"]: list(node["predecessors"]) for node in cfg["nodes"]}
+    _remove_pass_through(cfg, successors, predecessors)
+
+    entry, exit_ = cfg["entry_node_id"], cfg["exit_node_id"]
+    leaders = {
+        node_id
+        for node_id in successors
+        if node_id in {entry, exit_}
+        or len(predecessors[node_id]) != 1
+        or len(successors[predecessors[node_id][0]]) != 1
+    }
+
+    block_of: dict[int, int] = {}
+    runs: list[list[int]] = []
+
+    def _grow(start: int) -> None:
+        run = [start]
+        block_of[start] = len(runs)
+        current = start
+        while len(successors[current]) == 1:
+            following = successors[current][0]
+            if following in leaders or following in block_of:
+                break
+            run.append(following)
+            block_of[following] = len(runs)
+            current = following
+        runs.append(run)
+
+    for node_id in sorted(leaders):
+        _grow(node_id)
+    # nodes on a cycle without any leader are unreachable, keep them anyway
+    for node_id in sorted(successors):
+        if node_id not in block_of:
+            _grow(node_id)
+
+    blocks = []
+    for block_id, run in enumerate(runs):
+        statements = [nodes[node_id] for node_id in run]
+        first_lines = [n["lineno"] for n in statements if n.get("lineno") is not None]
+        last_lines = [_last_line(n) for n in statements if _last_line(n) is not None]
+        block_successors = []
+        for target in successors[run[-1]]:
+            if block_of[target] not in block_successors:
+                block_successors.append(block_of[target])
+        blocks.append(
+            {
+                "id": block_id,
+                "label": "\n".join(n["label"] for n in statements),
+                "successors": block_successors,
+                "predecessors": [],
+                "ast_type": statements[0]["ast_type"],
+                "node_ids": run,
+                "lineno": min(first_lines, default=None),
+                "end_lineno": max(last_lines, default=None),
+            },
+        )
+    for block in blocks:
+        for target in block["successors"]:
+            blocks[target]["predecessors"].append(block["id"])
+
+    compacted = {
+        key: value
+        for key, value in cfg.items()
+        if key not in {"nodes", "entry_node_id", "exit_node_id"}
+    }
+    compacted.update(
+        {
+            "entry_node_id": block_of.get(entry),
+            "exit_node_id": block_of.get(exit_),
+            "nodes": blocks,
+            "compacted": True,
+        },
+    )
+    return compacted
+
+
+def cfg_size(cfg: dict[str, Any]) -> tuple[int, int]:
+    """Return ``(nodes, edges)`` of a CFG dict."""  # noqa: DOC201
+    nodes = cfg.get("nodes", [])
+    return len(nodes), sum(len(node["successors"]) for node in nodes)
+
+
+def benchmark_compaction(project_path: str) -> dict[str, Any]:
+    """Build and compact the CFG of every function under ``project_path``."""  # noqa: DOC201
+    totals = {
+        "functions": 0,
+        "nodes_before": 0,
+        "edges_before": 0,
+        "nodes_after": 0,
+        "edges_after": 0,
+        "build_seconds": 0.0,
+        "compact_seconds": 0.0,
+    }
+    for py_file in sorted(Path(project_path).rglob("*.py")):
+        try:
+            code = py_file.read_text(encoding="utf-8")
+            tree = ast.parse(code)
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        for stmt in tree.body:
+            if not isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            started = time.perf_counter()
+            cfg = json.loads(cfg_visitor.generate_cfg_from_code(code, stmt.name))
+            built = time.perf_counter()
+            compacted = compact_cfg(cfg)
+            totals["compact_seconds"] += time.perf_counter() - built
+            totals["build_seconds"] += built - started
+
+            nodes, edges = cfg_size(cfg)
+            block_nodes, block_edges = cfg_size(compacted)
+            totals["functions"] += 1
+            totals["nodes_before"] += nodes
+            totals["edges_before"] += edges
+            totals["nodes_after"] += block_nodes
+            totals["edges_after"] += block_edges
+    return totals
+
+
+if __name__ == "__main__":
+    # python -m app.cfg_blocks <project path>
+    report = benchmark_compaction(sys.argv[1] if len(sys.argv) > 1 else ".")
+    print(f"functions: {report['functions']}")
+    print(f"nodes: {report['nodes_before']} -> {report['nodes_after']}")
+    print(f"edges: {report['edges_before']} -> {report['edges_after']}")
+    print(
+        f"build: {report['build_seconds']:.3f}s, "
+        f"compaction: {report['compact_seconds']:.3f}s",
+    )
@@ -0,0 +1,381 @@
+import ast  # noqa: D100
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+
+from .call_graph import function_symbol
+from .cfg_dominators import reverse_postorder
+from .cfg_visitor import CFGNode, CFGVisitor
+
+FunctionNode = ast.FunctionDef | ast.AsyncFunctionDef
+# AST nodes whose children include statement bodies
+STATEMENT_CONTAINERS = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def solve_bitvector(
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+    gen: list[int],
+    kill: list[int],
+    *,
+    forward: bool = True,
+    start: int = 0,
+) -> tuple[list[int], list[int]]:
+    """Worklist solver for union ("may") bit-vector problems.
+
+    Sets are Python ints used as bitsets. For a forward problem
+    ``out = gen | (in & ~kill)`` with ``in`` the union over predecessors;
+    a backward problem swaps the roles of predecessors and successors.
+    Returns ``(in, out)`` per node, both in the direction of the flow.
+    """  # noqa: DOC201
+    if not forward:
+        successors, predecessors = predecessors, successors
+    size = len(successors)
+    inflow = [0] * size
+    outflow = list(gen)
+
+    # reverse postorder first, so most nodes see their inputs before running
+    order = reverse_postorder(successors, start) if size else []
+    seen = set(order)
+    order.extend(node for node in range(size) if node not in seen)
+    worklist = deque(order)
+    queued = [True] * size
+    while worklist:
+        node = worklist.popleft()
+        queued[node] = False
+        merged = 0
+        for pred in predecessors[node]:
+            merged |= outflow[pred]
+        inflow[node] = merged
+        updated = gen[node] | (merged & ~kill[node])
+        if updated != outflow[node]:
+            outflow[node] = updated
+            for succ in successors[node]:
+                if not queued[succ]:
+                    queued[succ] = True
+                    worklist.append(succ)
+    return inflow, outflow
+
+
+def bits(value: int) -> Iterator[int]:
+    """Indices of the set bits of a bitset."""  # noqa: DOC402
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+class _NameCollector(ast.NodeVisitor):
+    # names read and bound by one statement in the function's own scope
+
+    def __init__(self) -> "_NameCollector":
+        self.uses: set[str] = set()
+        # reads evaluated by the statement itself, not by a nested scope
+        self.direct_uses: set[str] = set()
+        self.defs: set[str] = set()
+        self._nested = 0
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if not isinstance(node.ctx, ast.Store):
+            self.uses.add(node.id)
+            if not self._nested:
+                self.direct_uses.add(node.id)
+        elif not self._nested:
+            self.defs.add(node.id)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        # walrus binds in the enclosing function even inside a comprehension
+        self.defs.add(node.target.id)
+        self.visit(node.value)
+
+    def _visit_scope(self, node: ast.AST) -> None:
+        # free variables read in a nested scope count as uses here
+        self._nested += 1
+        self.generic_visit(node)
+        self._nested -= 1
+
+    visit_Lambda = _visit_scope  # noqa: N815
+    visit_ListComp = _visit_scope  # noqa: N815
+    visit_SetComp = _visit_scope  # noqa: N815
+    visit_DictComp = _visit_scope  # noqa: N815
+    visit_GeneratorExp = _visit_scope  # noqa: N815
+
+    def visit_FunctionDef(self, node: FunctionNode | ast.ClassDef) -> None:
+        if not self._nested:
+            self.defs.add(node.name)
+        self._visit_scope(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # noqa: N815
+    visit_ClassDef = visit_FunctionDef  # noqa: N815
+
+    def visit_alias(self, node: ast.alias) -> None:
+        if node.name != "*" and not self._nested:
+            self.defs.add(node.asname or node.name.split(".")[0])
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.name:
+            self.defs.add(node.name)
+        if node.type:
+            self.visit(node.type)
+
+    def visit_MatchAs(self, node: ast.MatchAs) -> None:
+        if node.name:
+            self.defs.add(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.MatchStar) -> None:
+        if node.name:
+            self.defs.add(node.name)
+
+    def visit_MatchMapping(self, node: ast.MatchMapping) -> None:
+        if node.rest:
+            self.defs.add(node.rest)
+        self.generic_visit(node)
+
+
+def statement_names(ast_node: ast.AST) -> _NameCollector:
+    """Names bound (``defs``) and read (``uses``) by one CFG node's statement."""  # noqa: DOC201
+    # compound statements only contribute their header, not their body
+    collector = _NameCollector()
+    if isinstance(ast_node, (ast.For, ast.AsyncFor)):
+        collector.visit(ast_node.target)
+        collector.visit(ast_node.iter)
+    elif isinstance(ast_node, (ast.With, ast.AsyncWith)):
+        for item in ast_node.items:
+            collector.visit(item)
+    elif isinstance(ast_node, (ast.Try, ast.TryStar)):
+        pass
+    elif isinstance(ast_node, ast.ExceptHandler):
+        collector.visit_ExceptHandler(ast_node)
+    elif isinstance(ast_node, ast.AugAssign):
+        collector.visit(ast_node)
+        if isinstance(ast_node.target, ast.Name):
+            collector.uses.add(ast_node.target.id)
+            collector.direct_uses.add(ast_node.target.id)
+    else:
+        collector.visit(ast_node)
+    return collector
+
+
+class FunctionDataflow:
+    """Reaching definitions and live variables of one function.
+
+    Built from ``CFGVisitor`` nodes, which keep the AST of their statement.
+    """
+
+    def __init__(self, function: FunctionNode) -> "FunctionDataflow":  # noqa: D107
+        visitor = CFGVisitor(target_function=function.name)
+        visitor.visit(function)
+        self.nodes: list[CFGNode] = visitor.nodes
+        self.entry = visitor.entry_node.id
+        self.successors = [node.successors for node in self.nodes]
+        self.predecessors = [node.predecessors for node in self.nodes]
+
+        self.parameters = _parameters(function)
+        self.defs: list[set[str]] = []
+        self.uses: list[set[str]] = []
+        self.direct_uses: list[set[str]] = []
+        for node in self.nodes:
+            if node.id == self.entry or node.ast_node is None:
+                if node.label.startswith("Parameters"):
+                    self.defs.append(set(self.parameters))
+                else:
+                    self.defs.append(set())
+                self.uses.append(set())
+                self.direct_uses.append(set())
+                continue
+            names = statement_names(node.ast_node)
+            self.defs.append(names.defs)
+            self.uses.append(names.uses)
+            self.direct_uses.append(names.direct_uses)
+
+        # names whose binding is not local to this function
+        nonlocal_names: set[str] = set()
+        for stmt in ast.walk(function):
+            if isinstance(stmt, (ast.Global, ast.Nonlocal)):
+                nonlocal_names.update(stmt.names)
+        self.local_names = set().union(*self.defs) - nonlocal_names
+        # read by closures, so alive for as long as the frame is
+        self.cell_names = set().union(
+            *(uses - direct for uses, direct in zip(self.uses, self.direct_uses))
+        )
+
+        variables = sorted(set().union(*self.defs, *self.uses))
+        self.variables = variables
+        self.variable_bit = {name: 1 << i for i, name in enumerate(variables)}
+
+        # definitions: one bit per (node, variable) pair; the entry node
+        # "defines" every local as unbound, so an unbound value can reach a read
+        self.definitions: list[tuple[int, str]] = [
+            (self.entry, name) for name in sorted(self.local_names)
+        ]
+        self.definitions.extend(
+            (node, name) for node, names in enumerate(self.defs) for name in sorted(names)
+        )
+
+    def _variable_set(self, names: set[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.variable_bit[name]
+        return mask
+
+    def live_variables(self) -> tuple[list[int], list[int]]:
+        """Backward liveness; returns ``(live_out, live_in)`` variable bitsets."""  # noqa: DOC201
+        gen = [self._variable_set(uses) for uses in self.uses]
+        kill = [self._variable_set(defs) for defs in self.defs]
+        exits = [i for i, succs in enumerate(self.successors) if not succs]
+        return solve_bitvector(
+            self.successors,
+            self.predecessors,
+            gen,
+            kill,
+            forward=False,
+            start=exits[0] if exits else self.entry,
+        )
+
+    def reaching_definitions(self) -> tuple[list[int], list[int]]:
+        """Forward reaching definitions; returns ``(in, out)`` definition bitsets."""  # noqa: DOC201
+        by_variable: dict[str, int] = {}
+        gen = [0] * len(self.nodes)
+        for index, (node, name) in enumerate(self.definitions):
+            gen[node] |= 1 << index
+            by_variable[name] = by_variable.get(name, 0) | (1 << index)
+        kill = [0] * len(self.nodes)
+        for node, names in enumerate(self.defs):
+            for name in names:
+                kill[node] |= by_variable[name]
+        return solve_bitvector(
+            self.successors,
+            self.predecessors,
+            gen,
+            kill,
+            start=self.entry,
+        )
+
+    def names(self, bitset: int) -> list[str]:  # noqa: D102
+        return [self.variables[i] for i in bits(bitset)]
+
+    def report(self) -> dict[str, list[dict[str, Any]]]:
+        """Unused assignments, possibly unbound reads and values kept across awaits."""  # noqa: DOC201
+        live_out, _ = self.live_variables()
+        reaching_in, _ = self.reaching_definitions()
+
+        unused = []
+        for node, names in enumerate(self.defs):
+            if self.nodes[node].label.startswith("Parameters"):
+                continue
+            for name in sorted(names & self.local_names - self.cell_names):
+                if not name.startswith("_") and not (
+                    live_out[node] & self.variable_bit[name]
+                ):
+                    unused.append({"name": name, "lineno": self._lineno(node)})
+
+        unbound_bits = {
+            name: 1 << index
+            for index, (node, name) in enumerate(self.definitions)
+            if node == self.entry
+        }
+        unbound = [
+            {"name": name, "lineno": self._lineno(node)}
+            for node, uses in enumerate(self.direct_uses)
+            for name in sorted(uses & self.local_names)
+            if reaching_in[node] & unbound_bits[name]
+        ]
+
+        local_mask = self._variable_set(self.local_names | self.parameters)
+        across_await = []
+        for node, cfg_node in enumerate(self.nodes):
+            if not awaits(cfg_node.ast_node):
+                continue
+            # locals the coroutine frame holds while suspended
+            kept = live_out[node] & local_mask & ~self._variable_set(self.defs[node])
+            if kept:
+                across_await.append(
+                    {"lineno": self._lineno(node), "names": self.names(kept)},
+                )
+
+        return {
+            "unused_assignments": unused,
+            "possibly_unbound": unbound,
+            "live_across_await": across_await,
+        }
+
+    def _lineno(self, node: int) -> int | None:
+        return getattr(self.nodes[node].ast_node, "lineno", None)
+
+
+def _parameters(function: FunctionNode) -> set[str]:
+    args = function.args
+    names = {arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs}
+    if args.vararg:
+        names.add(args.vararg.arg)
+    if args.kwarg:
+        names.add(args.kwarg.arg)
+    return names
+
+
+def statement_header(ast_node: ast.AST | None) -> list[ast.AST]:
+    """Parts of a CFG node's AST evaluated by the node itself, bodies excluded."""  # noqa: DOC201
+    if ast_node is None or isinstance(ast_node, (ast.Try, ast.TryStar)):
+        return []
+    if isinstance(ast_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        defaults = ast_node.args.defaults + ast_node.args.kw_defaults
+        return ast_node.decorator_list + [d for d in defaults if d is not None]
+    if isinstance(ast_node, ast.ClassDef):
+        return ast_node.decorator_list + ast_node.bases + ast_node.keywords
+    if isinstance(ast_node, ast.ExceptHandler):
+        return [ast_node.type] if ast_node.type else []
+    if isinstance(ast_node, (ast.For, ast.AsyncFor)):
+        return [ast_node.target, ast_node.iter]
+    if isinstance(ast_node, (ast.With, ast.AsyncWith)):
+        return list(ast_node.items)
+    return [ast_node]
+
+
+def awaits(ast_node: ast.AST | None) -> bool:
+    """Whether a CFG node's statement suspends the coroutine."""  # noqa: DOC201
+    if isinstance(ast_node, (ast.AsyncFor, ast.AsyncWith)):
+        return True
+    return any(
+        isinstance(child, ast.Await)
+        for header in statement_header(ast_node)
+        for child in ast.walk(header)
+    )
+
+
+def iter_function_defs(
+    module: str,
+    tree: ast.Module,
+) -> Iterator[tuple[str, FunctionNode]]:
+    """Yield ``(symbol, FunctionDef)`` for every function of a parsed module."""  # noqa: DOC402
+    stack = [(stmt, "") for stmt in reversed(tree.body)]
+    while stack:
+        node, prefix = stack.pop()
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # definitions under if/try/with/for/match keep the enclosing
+            # qualname, as in the scan's function tree
+            stack.extend(
+                (child, prefix)
+                for child in reversed(list(ast.iter_child_nodes(node)))
+                if isinstance(child, STATEMENT_CONTAINERS)
+            )
+            continue
+        qualname = f"{prefix}{node.name}"
+        if not isinstance(node, ast.ClassDef):
+            yield function_symbol(module, qualname), node
+        stack.extend((child, f"{qualname}.") for child in reversed(node.body))
+
+
+def dataflow_layer(
+    _dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Dataflow findings of every function that has any, keyed by function symbol."""  # noqa: DOC201
+    layer = {}
+    for module, tree in analyzer.get_source_trees().items():
+        for symbol, function in iter_function_defs(module, tree):
+            findings = FunctionDataflow(function).report()
+            if any(findings.values()):
+                layer[symbol] = findings
+    return layer
@@ -0,0 +1,177 @@
+from typing import Any  # noqa: D100
+
+from .call_graph import iter_functions
+from .cfg_shapes import per_shape
+
+UNDEFINED = -1
+
+
+def reverse_postorder(successors: list[list[int]], start: int) -> list[int]:
+    """Nodes reachable from ``start`` in reverse postorder of an iterative DFS."""  # noqa: DOC201
+    order = []
+    visited = [False] * len(successors)
+    visited[start] = True
+    stack = [(start, 0)]
+    while stack:
+        node, edge = stack[-1]
+        if edge < len(successors[node]):
+            stack[-1] = (node, edge + 1)
+            target = successors[node][edge]
+            if not visited[target]:
+                visited[target] = True
+                stack.append((target, 0))
+        else:
+            stack.pop()
+            order.append(node)
+    order.reverse()
+    return order
+
+
+def immediate_dominators(
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+    start: int,
+) -> list[int]:
+    """Cooper-Harvey-Kennedy iterative dominator algorithm.
+
+    Returns the immediate dominator of every node; ``start`` maps to itself
+    and nodes unreachable from ``start`` map to ``UNDEFINED``.
+    """  # noqa: DOC201
+    order = reverse_postorder(successors, start)
+    # postorder number: higher means closer to the start node
+    rank = [UNDEFINED] * len(successors)
+    for position, node in enumerate(order):
+        rank[node] = len(order) - position
+
+    idom = [UNDEFINED] * len(successors)
+    idom[start] = start
+
+    changed = True
+    while changed:
+        changed = False
+        for node in order[1:]:
+            new_idom = UNDEFINED
+            for pred in predecessors[node]:
+                if idom[pred] == UNDEFINED:
+                    continue
+                if new_idom == UNDEFINED:
+                    new_idom = pred
+                    continue
+                # intersect: walk both fingers up the tree until they meet
+                finger_a, finger_b = pred, new_idom
+                while finger_a != finger_b:
+                    while rank[finger_a] < rank[finger_b]:
+                        finger_a = idom[finger_a]
+                    while rank[finger_b] < rank[finger_a]:
+                        finger_b = idom[finger_b]
+                new_idom = finger_a
+            if idom[node] != new_idom:
+                idom[node] = new_idom
+                changed = True
+    return idom
+
+
+def dominator_chain(idom: list[int], node: int) -> list[int]:
+    """Nodes dominating ``node``, from ``node`` up to the start node."""  # noqa: DOC201
+    if node < 0 or idom[node] == UNDEFINED:
+        return []
+    chain = [node]
+    while idom[node] != node:
+        node = idom[node]
+        chain.append(node)
+    return chain
+
+
+def cfg_adjacency(cfg: dict[str, Any]) -> tuple[list[list[int]], list[list[int]]]:
+    """Integer successor/predecessor lists of a CFG dict, indexed by position."""  # noqa: DOC201
+    position = {node["id"]: i for i, node in enumerate(cfg["nodes"])}
+    successors = [
+        [position[target] for target in node["successors"]] for node in cfg["nodes"]
+    ]
+    predecessors = [
+        [position[source] for source in node["predecessors"]]
+        for node in cfg["nodes"]
+    ]
+    return successors, predecessors
+
+
+def cfg_dominators(cfg: dict[str, Any]) -> dict[str, list[int]] | None:
+    """Immediate dominators and post-dominators of one function CFG."""  # noqa: DOC201
+    if not cfg.get("nodes") or cfg.get("entry_node_id") is None:
+        return None
+
+    position = {node["id"]: i for i, node in enumerate(cfg["nodes"])}
+    successors, predecessors = cfg_adjacency(cfg)
+    entry = position[cfg["entry_node_id"]]
+    idom = immediate_dominators(successors, predecessors, entry)
+
+    exit_id = cfg.get("exit_node_id")
+    if exit_id is None:
+        ipdom = [UNDEFINED] * len(successors)
+        must_pass = []
+    else:
+        exit_ = position[exit_id]
+        # post-dominators are dominators of the reversed graph
+        ipdom = immediate_dominators(predecessors, successors, exit_)
+        must_pass = dominator_chain(idom, exit_)[::-1]
+
+    ids = [node["id"] for node in cfg["nodes"]]
+    return {
+        "idom": [ids[d] if d != UNDEFINED else UNDEFINED for d in idom],
+        "ipdom": [ids[d] if d != UNDEFINED else UNDEFINED for d in ipdom],
+        # statements on every entry-to-exit path
+        "must_pass": [ids[n] for n in must_pass],
+    }
+
+
+def dominator_layer(
+    dependencies: dict[str, Any],
+    _analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Dominator trees of every function CFG in a scan, keyed by function symbol."""  # noqa: DOC201
+    layer = {}
+    by_shape = {}
+    for symbol, _, _, node in iter_functions(dependencies):
+        trees = per_shape(dependencies, node, cfg_dominators, by_shape)
+        if trees is not None:
+            layer[symbol] = trees
+    return layer
+
+
+def natural_loops(
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+    idom: list[int],
+) -> dict[int, set[int]]:
+    """Natural loops of a CFG as ``{header: body nodes}``.
+
+    A back edge ``tail -> header`` is one whose header dominates its tail;
+    loops sharing a header are merged into one body.
+    """  # noqa: DOC201
+    loops: dict[int, set[int]] = {}
+    for tail, targets in enumerate(successors):
+        if idom[tail] == UNDEFINED:
+            continue
+        chain = set(dominator_chain(idom, tail))
+        for header in targets:
+            if header not in chain:
+                continue
+            body = loops.setdefault(header, {header})
+            stack = [tail]
+            while stack:
+                node = stack.pop()
+                if node in body:
+                    continue
+                body.add(node)
+                stack.extend(predecessors[node])
+    return loops
+
+
+def loop_depths(loops: dict[int, set[int]], size: int) -> list[int]:
+    """Number of natural loops enclosing each node."""  # noqa: DOC201
+    depth = [0] * size
+    for body in loops.values():
+        for node in body:
+            depth[node] += 1
+    return depth
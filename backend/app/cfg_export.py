@@ -0,0 +1,200 @@
+import sys  # noqa: D100
+from array import array
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_shapes import function_cfg
+
+CFG_MEDIA_TYPE = "application/vnd.cfg-columnar"
+MAGIC = 0x42474643  # b"CFGB" read as a little-endian int32
+VERSION = 1
+MISSING = -1
+
+# Layout: one little-endian int32 buffer, so a client can view all of it with
+# a single Int32Array; the UTF-8 string bytes at the end are zero-padded to 4.
+#
+#   header           MAGIC, VERSION, functions F, nodes N, edges E,
+#                    strings S, string bytes B
+#   function_nodes   F + 1  CSR offsets of each function's nodes
+#   function_symbol  F      string ids
+#   function_entry   F      global node index, -1 if no CFG
+#   function_exit    F      global node index, -1 if none
+#   node_kind        N      string id of the AST statement type, -1 if synthetic
+#   node_label       N      string id
+#   node_lineno      N      -1 if unknown
+#   node_end_lineno  N      -1 if unknown
+#   edge_offsets     N + 1  CSR offsets into edge_targets
+#   edge_targets     E      global node indices
+#   string_offsets   S + 1  byte offsets into the string bytes
+#   string bytes     B      UTF-8, padded
+HEADER_SIZE = 7
+
+
+class _StringTable:
+    def __init__(self) -> "_StringTable":
+        self.index: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def add(self, value: str | None) -> int:
+        if value is None:
+            return MISSING
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+
+def _int32(values: list[int]) -> array:
+    packed = array("i", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _or_missing(value: int | None) -> int:
+    return MISSING if value is None else value
+
+
+def encode_cfgs(dependencies: dict[str, Any]) -> bytes:
+    """Pack every function CFG of a scan into the columnar binary layout."""  # noqa: DOC201
+    strings = _StringTable()
+    function_nodes = [0]
+    function_symbol, function_entry, function_exit = [], [], []
+    node_kind, node_label, node_lineno, node_end_lineno = [], [], [], []
+    edge_offsets = [0]
+    edge_targets = []
+
+    for symbol, _, _, node in iter_functions(dependencies):
+        cfg = function_cfg(dependencies, node)
+        base = len(node_kind)
+        nodes = cfg.get("nodes", [])
+        position = {cfg_node["id"]: base + i for i, cfg_node in enumerate(nodes)}
+
+        function_symbol.append(strings.add(symbol))
+        function_entry.append(position.get(cfg.get("entry_node_id"), MISSING))
+        function_exit.append(position.get(cfg.get("exit_node_id"), MISSING))
+        for cfg_node in nodes:
+            node_kind.append(strings.add(cfg_node.get("ast_type")))
+            node_label.append(strings.add(cfg_node.get("label", "")))
+            node_lineno.append(_or_missing(cfg_node.get("lineno")))
+            node_end_lineno.append(_or_missing(cfg_node.get("end_lineno")))
+            edge_targets.extend(position[target] for target in cfg_node["successors"])
+            edge_offsets.append(len(edge_targets))
+        function_nodes.append(len(node_kind))
+
+    encoded = [value.encode() for value in strings.strings]
+    string_offsets = [0]
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    string_bytes = b"".join(encoded)
+
+    header = [
+        MAGIC,
+        VERSION,
+        len(function_symbol),
+        len(node_kind),
+        len(edge_targets),
+        len(encoded),
+        len(string_bytes),
+    ]
+    body = _int32(
+        header
+        + function_nodes
+        + function_symbol
+        + function_entry
+        + function_exit
+        + node_kind
+        + node_label
+        + node_lineno
+        + node_end_lineno
+        + edge_offsets
+        + edge_targets
+        + string_offsets,
+    ).tobytes()
+    padding = b"\0" * (-len(string_bytes) % 4)
+    return body + string_bytes + padding
+
+
+def decode_cfgs(buffer: bytes) -> dict[str, dict[str, Any]]:
+    """Unpack the binary layout back into ``{symbol: cfg}`` dicts."""  # noqa: DOC201, DOC501
+    header = array("i", buffer[: HEADER_SIZE * 4])
+    if sys.byteorder == "big":
+        header.byteswap()
+    magic, version, functions, nodes, edges, string_count, string_size = header
+    if magic != MAGIC or version != VERSION:
+        msg = "not a columnar CFG export"
+        raise ValueError(msg)
+
+    int_count = HEADER_SIZE + 4 * functions + 1 + 5 * nodes + 1 + edges
+    int_count += string_count + 1
+    values = array("i", buffer[: int_count * 4])
+    if sys.byteorder == "big":
+        values.byteswap()
+    sizes = [
+        functions + 1,
+        functions,
+        functions,
+        functions,
+        nodes,
+        nodes,
+        nodes,
+        nodes,
+        nodes + 1,
+        edges,
+        string_count + 1,
+    ]
+    sections = []
+    offset = HEADER_SIZE
+    for size in sizes:
+        sections.append(values[offset : offset + size])
+        offset += size
+    (
+        function_nodes,
+        function_symbol,
+        function_entry,
+        function_exit,
+        node_kind,
+        node_label,
+        node_lineno,
+        node_end_lineno,
+        edge_offsets,
+        edge_targets,
+        string_offsets,
+    ) = sections
+    raw = buffer[int_count * 4 : int_count * 4 + string_size]
+    strings = [
+        raw[string_offsets[i] : string_offsets[i + 1]].decode()
+        for i in range(string_count)
+    ]
+
+    def text(string_id: int) -> str | None:
+        return None if string_id == MISSING else strings[string_id]
+
+    def number(value: int) -> int | None:
+        return None if value == MISSING else value
+
+    result = {}
+    for function in range(functions):
+        start, end = function_nodes[function], function_nodes[function + 1]
+        entry, exit_ = function_entry[function], function_exit[function]
+        result[strings[function_symbol[function]]] = {
+            "entry_node_id": None if entry == MISSING else entry - start,
+            "exit_node_id": None if exit_ == MISSING else exit_ - start,
+            "nodes": [
+                {
+                    "id": node - start,
+                    "label": text(node_label[node]),
+                    "ast_type": text(node_kind[node]),
+                    "lineno": number(node_lineno[node]),
+                    "end_lineno": number(node_end_lineno[node]),
+                    "successors": [
+                        target - start
+                        for target in edge_targets[
+                            edge_offsets[node] : edge_offsets[node + 1]
+                        ]
+                    ],
+                }
+                for node in range(start, end)
+            ],
+        }
+    return result
@@ -0,0 +1,111 @@
+import heapq  # noqa: D100
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_dominators import (
+    cfg_adjacency,
+    immediate_dominators,
+    loop_depths,
+    natural_loops,
+)
+from .cfg_shapes import per_shape
+
+# metrics derived from the CFG are None for functions whose CFG failed to build
+METRICS = ("cyclomatic", "max_loop_depth", "nodes", "edges", "call_sites")
+
+
+def cfg_metrics(cfg: dict[str, Any]) -> dict[str, int] | None:
+    """Complexity metrics of one function CFG (full or compacted)."""  # noqa: DOC201
+    if not cfg.get("nodes") or cfg.get("entry_node_id") is None:
+        return None
+
+    successors, predecessors = cfg_adjacency(cfg)
+    entry = next(
+        i for i, node in enumerate(cfg["nodes"]) if node["id"] == cfg["entry_node_id"]
+    )
+    idom = immediate_dominators(successors, predecessors, entry)
+    reachable = [node for node, dominator in enumerate(idom) if dominator != -1]
+    edges = sum(len(successors[node]) for node in reachable)
+    depths = loop_depths(natural_loops(successors, predecessors, idom), len(idom))
+    return {
+        # McCabe: E - N + 2 over the part of the graph that can run
+        "cyclomatic": edges - len(reachable) + 2,
+        "max_loop_depth": max(depths, default=0),
+        "nodes": len(cfg["nodes"]),
+        "edges": sum(len(targets) for targets in successors),
+    }
+
+
+class FunctionMetrics:
+    """Per-function metrics stored as one column per metric."""
+
+    def __init__(self, dependencies: dict[str, Any]) -> "FunctionMetrics":  # noqa: D107
+        self.symbols: list[str] = []
+        self.types: list[str] = []
+        self.linenos: list[int | None] = []
+        self.columns: dict[str, list[int | None]] = {name: [] for name in METRICS}
+
+        by_shape = {}
+        for symbol, _, _, node in iter_functions(dependencies):
+            self.symbols.append(symbol)
+            self.types.append(node.get("type"))
+            self.linenos.append(node.get("lineno"))
+            values = dict(per_shape(dependencies, node, cfg_metrics, by_shape) or {})
+            values["call_sites"] = len(node.get("calls", []))
+            for name, column in self.columns.items():
+                column.append(values.get(name))
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Any]) -> "FunctionMetrics":
+        """Rebuild from the ``metrics`` analysis layer stored in a scan."""  # noqa: DOC201
+        metrics = cls.__new__(cls)
+        metrics.symbols = columns["symbols"]
+        metrics.types = columns["types"]
+        metrics.linenos = columns["linenos"]
+        metrics.columns = {name: columns[name] for name in METRICS}
+        return metrics
+
+    def to_columns(self) -> dict[str, Any]:  # noqa: D102
+        return {
+            "symbols": self.symbols,
+            "types": self.types,
+            "linenos": self.linenos,
+            **self.columns,
+        }
+
+    def row(self, index: int) -> dict[str, Any]:  # noqa: D102
+        return {
+            "symbol": self.symbols[index],
+            "type": self.types[index],
+            "lineno": self.linenos[index],
+            **{name: column[index] for name, column in self.columns.items()},
+        }
+
+    def top(
+        self,
+        metric: str,
+        count: int,
+        function_type: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """The ``count`` functions with the largest ``metric``, largest first."""  # noqa: DOC201
+        column = self.columns[metric]
+        candidates = (
+            index
+            for index, value in enumerate(column)
+            if value is not None
+            and (function_type is None or self.types[index] == function_type)
+        )
+        # partial sort: O(n log k) instead of sorting the whole project
+        return [
+            self.row(index)
+            for index in heapq.nlargest(count, candidates, key=column.__getitem__)
+        ]
+
+
+def metrics_layer(
+    dependencies: dict[str, Any],
+    _analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Columnar complexity metrics of every function in a scan."""  # noqa: DOC201
+    return FunctionMetrics(dependencies).to_columns()
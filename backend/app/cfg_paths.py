@@ -0,0 +1,123 @@
+import heapq  # noqa: D100
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_dominators import cfg_adjacency
+from .cfg_shapes import per_shape
+from .graph_layout import condense, strongly_connected_components
+
+# upper bound on search steps of one enumeration, whatever ``top`` is
+MAX_EXPANSIONS = 100_000
+
+
+class CondensedCFG:
+    """CFG with every loop (strongly connected component) collapsed to one step.
+
+    Tarjan numbers components in reverse topological order, so every
+    successor of a component has a smaller id than the component itself.
+    """
+
+    def __init__(self, cfg: dict[str, Any]) -> "CondensedCFG":  # noqa: D107
+        ids = [node["id"] for node in cfg["nodes"]]
+        position = {node_id: i for i, node_id in enumerate(ids)}
+        successors, _ = cfg_adjacency(cfg)
+        component = strongly_connected_components(successors)
+        self.successors, _ = condense(successors, component)
+
+        self.members: list[list[int]] = [[] for _ in self.successors]
+        for node, comp in enumerate(component):
+            self.members[comp].append(ids[node])
+        self.entry = component[position[cfg["entry_node_id"]]]
+        exit_id = cfg.get("exit_node_id")
+        self.exit = component[position[exit_id]] if exit_id is not None else None
+
+        # paths from each component to the exit, and the longest one in nodes
+        self.count = [0] * len(self.successors)
+        self.longest = [0] * len(self.successors)
+        for comp in range(len(self.successors)):
+            if comp == self.exit:
+                self.count[comp] = 1
+                self.longest[comp] = len(self.members[comp])
+                continue
+            self.count[comp] = sum(self.count[s] for s in self.successors[comp])
+            if self.count[comp]:
+                self.longest[comp] = len(self.members[comp]) + max(
+                    self.longest[s] for s in self.successors[comp] if self.count[s]
+                )
+
+    @property
+    def path_count(self) -> int:
+        """Number of acyclic entry-to-exit paths; loop bodies count as one step."""  # noqa: DOC201
+        return self.count[self.entry]
+
+    def step(self, comp: int) -> int | list[int]:
+        """A path step: the node id, or the sorted node ids of a loop."""  # noqa: DOC201
+        members = self.members[comp]
+        return members[0] if len(members) == 1 else sorted(members)
+
+    def top_paths(
+        self,
+        k: int,
+        max_expansions: int = MAX_EXPANSIONS,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """The ``k`` longest entry-to-exit paths, longest first.
+
+        Best-first search where the priority is the length so far plus the
+        exact longest remainder, so complete paths come out in order and no
+        other path is ever expanded past its first divergence. Returns the
+        paths and whether ``max_expansions`` cut the search short.
+        """  # noqa: DOC201
+        if not self.path_count:
+            return [], False
+
+        found = []
+        counter = 0
+        heap = [(-self.longest[self.entry], counter, 0, (self.entry,))]
+        expansions = 0
+        while heap and len(found) < k:
+            if expansions >= max_expansions:
+                return found, True
+            expansions += 1
+            _, _, length, path = heapq.heappop(heap)
+            comp = path[-1]
+            length += len(self.members[comp])
+            if comp == self.exit:
+                found.append(
+                    {"length": length, "steps": [self.step(c) for c in path]},
+                )
+                continue
+            for target in self.successors[comp]:
+                if not self.count[target]:
+                    continue
+                counter += 1
+                priority = -(length + self.longest[target])
+                heapq.heappush(heap, (priority, counter, length, (*path, target)))
+        return found, False
+
+
+def path_summary(cfg: dict[str, Any]) -> dict[str, Any] | None:
+    """Path count and longest path length of one function CFG."""  # noqa: DOC201
+    if not cfg.get("nodes") or cfg.get("entry_node_id") is None:
+        return None
+    condensed = CondensedCFG(cfg)
+    return {
+        # decimal string: counts overflow JSON numbers on branchy functions
+        "paths": str(condensed.path_count),
+        "longest": condensed.longest[condensed.entry],
+        "loops": sum(len(members) > 1 for members in condensed.members),
+    }
+
+
+def paths_layer(
+    dependencies: dict[str, Any],
+    _analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Path counts of every function CFG in a scan, keyed by function symbol."""  # noqa: DOC201
+    layer = {}
+    by_shape = {}
+    for symbol, _, _, node in iter_functions(dependencies):
+        summary = per_shape(dependencies, node, path_summary, by_shape)
+        if summary is not None:
+            layer[symbol] = summary
+    return layer
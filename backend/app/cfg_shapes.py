@@ -0,0 +1,152 @@
+import hashlib  # noqa: D100
+import json
+from collections.abc import Callable
+from typing import Any
+
+from .call_graph import iter_functions
+
+CFG_REF_TYPE = "function_cfg_ref"
+
+# per-node fields that stay with the function instead of the shared shape
+OVERLAY_FIELDS = ("label", "lineno", "end_lineno", "node_ids")
+
+
+def _canonical_order(cfg: dict[str, Any]) -> list[int]:
+    # DFS preorder from the entry following successor order, so that two CFGs
+    # built from the same statement structure number their nodes identically
+    nodes = {node["id"]: node for node in cfg["nodes"]}
+    order = []
+    seen = set()
+    stack = [cfg["entry_node_id"]] if cfg.get("entry_node_id") is not None else []
+    while stack:
+        node_id = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        order.append(node_id)
+        stack.extend(reversed(nodes[node_id]["successors"]))
+    # unreachable nodes keep their original relative order
+    order.extend(node["id"] for node in cfg["nodes"] if node["id"] not in seen)
+    return order
+
+
+def cfg_shape(cfg: dict[str, Any]) -> tuple[dict[str, Any], list[int]]:
+    """Structure of a CFG with canonical node numbering.
+
+    Returns the shape (statement kinds and edges only) and the original node
+    ids in canonical order.
+    """  # noqa: DOC201
+    order = _canonical_order(cfg)
+    position = {node_id: i for i, node_id in enumerate(order)}
+    nodes = {node["id"]: node for node in cfg["nodes"]}
+    exit_id = cfg.get("exit_node_id")
+    shape = {
+        "ast_types": [nodes[node_id]["ast_type"] for node_id in order],
+        "successors": [
+            [position[target] for target in nodes[node_id]["successors"]]
+            for node_id in order
+        ],
+        "entry": 0,
+        "exit": position[exit_id] if exit_id is not None else None,
+        "compacted": bool(cfg.get("compacted")),
+    }
+    return shape, order
+
+
+def shape_hash(shape: dict[str, Any]) -> str:
+    """Canonical structural hash of a CFG shape."""  # noqa: DOC201
+    encoded = json.dumps(shape, separators=(",", ":"), sort_keys=True).encode()
+    return hashlib.sha1(encoded, usedforsecurity=False).hexdigest()[:16]
+
+
+class ShapeTable:
+    """Hash-consing table: every distinct CFG shape is stored once."""
+
+    def __init__(self) -> "ShapeTable":  # noqa: D107
+        self.shapes: dict[str, dict[str, Any]] = {}
+
+    def intern(self, cfg: dict[str, Any]) -> dict[str, Any]:
+        """Replace a full CFG by a reference to its shape plus a per-node overlay."""  # noqa: DOC201
+        if not cfg.get("nodes"):
+            return cfg
+
+        shape, order = cfg_shape(cfg)
+        shape_id = shape_hash(shape)
+        stored = self.shapes.setdefault(shape_id, {**shape, "functions": 0})
+        stored["functions"] += 1
+
+        nodes = {node["id"]: node for node in cfg["nodes"]}
+        ref = {"type": CFG_REF_TYPE, "function_name": cfg.get("function_name")}
+        ref["shape"] = shape_id
+        for field in OVERLAY_FIELDS:
+            if field in nodes[order[0]]:
+                ref[field] = [nodes[node_id][field] for node_id in order]
+        return ref
+
+
+def expand_cfg(
+    cfg: dict[str, Any] | None,
+    shapes: dict[str, dict[str, Any]] | None,
+) -> dict[str, Any]:
+    """Rebuild a full CFG dict from a shape reference; other CFGs pass through."""  # noqa: DOC201
+    if not cfg or cfg.get("type") != CFG_REF_TYPE:
+        return cfg or {}
+
+    shape = shapes[cfg["shape"]]
+    predecessors = [[] for _ in shape["successors"]]
+    for source, targets in enumerate(shape["successors"]):
+        for target in targets:
+            predecessors[target].append(source)
+
+    nodes = []
+    for node_id, successors in enumerate(shape["successors"]):
+        node = {
+            "id": node_id,
+            "successors": list(successors),
+            "predecessors": predecessors[node_id],
+            "ast_type": shape["ast_types"][node_id],
+        }
+        for field in OVERLAY_FIELDS:
+            if field in cfg:
+                node[field] = cfg[field][node_id]
+        nodes.append(node)
+
+    expanded = {
+        "function_name": cfg.get("function_name"),
+        "type": "function_cfg",
+        "entry_node_id": shape["entry"],
+        "exit_node_id": shape["exit"],
+        "nodes": nodes,
+    }
+    if shape["compacted"]:
+        expanded["compacted"] = True
+    return expanded
+
+
+def function_cfg(dependencies: dict[str, Any], node: dict[str, Any]) -> dict[str, Any]:
+    """Full CFG of a function node, whether or not the scan shares shapes."""  # noqa: DOC201
+    return expand_cfg(node.get("cfg"), dependencies.get("cfg_shapes"))
+
+
+def intern_cfg_shapes(dependencies: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Intern every function CFG of a scan in place and return the shape table."""  # noqa: DOC201
+    table = ShapeTable()
+    for _, _, _, node in iter_functions(dependencies):
+        if node.get("cfg"):
+            node["cfg"] = table.intern(node["cfg"])
+    return table.shapes
+
+
+def per_shape(
+    dependencies: dict[str, Any],
+    node: dict[str, Any],
+    compute: Callable[[dict[str, Any]], Any],
+    cache: dict[str, Any],
+) -> Any:  # noqa: ANN401
+    """Apply a structure-only ``compute`` to a function CFG once per shape."""  # noqa: DOC201
+    shape_id = (node.get("cfg") or {}).get("shape")
+    if shape_id is None:
+        return compute(function_cfg(dependencies, node))
+    if shape_id not in cache:
+        cache[shape_id] = compute(function_cfg(dependencies, node))
+    return cache[shape_id]
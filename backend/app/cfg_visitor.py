@@ -25,11 +25,29 @@ class CFGNode:
             "successors": self.successors,
             "predecessors": self.predecessors,
             "ast_type": type(self.ast_node).__name__ if self.ast_node else None,
+            "lineno": getattr(self.ast_node, "lineno", None),
+            "end_lineno": getattr(self.ast_node, "end_lineno", None),
         }
 
 
+class FinallyBlock:
+    """Return, raise, break and continue nodes of a ``try`` that run its ``finally``."""
+
+    def __init__(self, loop_depth: int) -> "FinallyBlock":  # noqa: D107
+        # loops enclosing the try: break/continue of deeper loops stay inside
+        self.loop_depth = loop_depth
+        self.returns: list[CFGNode] = []
+        self.raises: list[CFGNode] = []
+        self.jumps: dict[str, list[CFGNode]] = {"break": [], "continue": []}
+
+
 class CFGVisitor(ast.NodeVisitor):
-    """AST visitor that builds a Control Flow Graph."""
+    """AST visitor that builds a statement-level Control Flow Graph.
+
+    Only statements are visited: every statement becomes at most one node
+    (compound statements add their branch/merge nodes), and expressions are
+    never descended into.
+    """
 
     def __init__(self, target_function: str | None = None) -> "CFGVisitor":  # noqa: D107
         self.nodes: list[CFGNode] = []
@@ -42,6 +60,14 @@ class CFGVisitor(ast.NodeVisitor):
         self.in_target_function = False
         self.function_cfg: dict[str, Any] | None = None
 
+        # (continue target, break target) of the enclosing loops
+        self._loops: list[tuple[CFGNode, CFGNode]] = []
+        # exception targets of the enclosing try statements, innermost last:
+        # handler entries around a try body, a finally block around the try
+        self._handlers: list[list[CFGNode] | FinallyBlock] = []
+        # return/raise nodes waiting for the exit node
+        self._pending_exits: list[CFGNode] = []
+
     def _create_node(self, label: str, ast_node: ast.AST | None = None) -> CFGNode:
         """Create a new CFG node."""  # noqa: DOC201
         node = CFGNode(self.node_counter, label, ast_node)
@@ -56,6 +82,18 @@ class CFGVisitor(ast.NodeVisitor):
         if from_node.id not in to_node.predecessors:
             to_node.predecessors.append(from_node.id)
 
+    def _statement(self, label: str, ast_node: ast.AST) -> CFGNode:
+        """Append a single straight-line statement node."""  # noqa: DOC201
+        node = self._create_node(label, ast_node)
+        if self.current_node:
+            self._connect_nodes(self.current_node, node)
+        self.current_node = node
+        return node
+
+    def _visit_body(self, body: list[ast.stmt]) -> None:
+        for stmt in body:
+            self.visit(stmt)
+
     def visit_Module(self, node: ast.Module):  # noqa: ANN201, D102
         if self.target_function:
             for stmt in node.body:
@@ -63,7 +101,7 @@ class CFGVisitor(ast.NodeVisitor):
                     isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef))
                     and stmt.name == self.target_function
                 ):
-                    self.visit_FunctionDef(stmt)
+                    self.visit(stmt)
                     break
             else:
                 # Function not found
@@ -78,24 +116,30 @@ class CFGVisitor(ast.NodeVisitor):
         self.current_node = entry_node
 
         # Visit all statements in the module
-        for stmt in node.body:
-            self.visit(stmt)
+        self._visit_body(node.body)
 
         # Create exit node
         exit_node = self._create_node("Module Exit")
         self.exit_node = exit_node
+        self._close_exits(exit_node)
+
+    def _close_exits(self, exit_node: CFGNode) -> None:
         if self.current_node:
             self._connect_nodes(self.current_node, exit_node)
+        for node in self._pending_exits:
+            self._connect_nodes(node, exit_node)
+        self._pending_exits = []
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):  # noqa: ANN201, D102
-        # Check if this is our target function
-        if self.target_function and node.name != self.target_function:
-            return None
-
+    def _build_function(
+        self,
+        node: ast.FunctionDef | ast.AsyncFunctionDef,
+        entry_label: str,
+        exit_label: str,
+    ) -> CFGNode:
         self.in_target_function = True
 
         # Create function entry node
-        func_entry = self._create_node(f"Function Entry: {node.name}", node)
+        func_entry = self._create_node(f"{entry_label}: {node.name}", node)
         self.entry_node = func_entry
         self.current_node = func_entry
 
@@ -106,83 +150,63 @@ class CFGVisitor(ast.NodeVisitor):
         self.current_node = params_node
 
         # Visit function body
-        for stmt in node.body:
-            self.visit(stmt)
+        self._visit_body(node.body)
 
         # Create function exit
-        func_exit = self._create_node("Function Exit")
+        func_exit = self._create_node(exit_label)
         self.exit_node = func_exit
-        if self.current_node:
-            self._connect_nodes(self.current_node, func_exit)
+        self._close_exits(func_exit)
 
         self.in_target_function = False
         return func_exit
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):  # noqa: ANN201, D102
-        # Check if this is our target function
-        print(f"{node.name=}")
-        if self.target_function and node.name != self.target_function:
-            return None
-
-        self.in_target_function = True
-
-        # Create function entry node
-        func_entry = self._create_node(f"Async Function Entry: {node.name}", node)
-        self.entry_node = func_entry
-        self.current_node = func_entry
-
-        # Create parameters node
-        params_text = ", ".join(arg.arg for arg in node.args.args)
-        params_node = self._create_node(f"Parameters: {params_text}")
-        self._connect_nodes(self.current_node, params_node)
-        self.current_node = params_node
+    def _is_target(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+        return (
+            self.target_function is not None
+            and node.name == self.target_function
+            and self.entry_node is None
+        )
 
-        # Visit function body
-        for stmt in node.body:
-            self.visit(stmt)
+    def visit_FunctionDef(self, node: ast.FunctionDef):  # noqa: ANN201, D102
+        if self._is_target(node):
+            return self._build_function(node, "Function Entry", "Function Exit")
+        # nested or module-level definition: a single statement, body not inlined
+        return self._statement(f"Function definition: {node.name}", node)
 
-        # Create function exit
-        func_exit = self._create_node("Async Function Exit")
-        self.exit_node = func_exit
-        if self.current_node:
-            self._connect_nodes(self.current_node, func_exit)
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):  # noqa: ANN201, D102
+        if self._is_target(node):
+            return self._build_function(
+                node,
+                "Async Function Entry",
+                "Async Function Exit",
+            )
+        return self._statement(f"Async function definition: {node.name}", node)
 
-        self.in_target_function = False
-        return func_exit
+    def visit_ClassDef(self, node: ast.ClassDef):  # noqa: ANN201, D102
+        return self._statement(f"Class definition: {node.name}", node)
 
     def visit_If(self, node: ast.If):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
         # Create if node
-        if_node = self._create_node("If condition", node.test)
-        if self.current_node:
-            self._connect_nodes(self.current_node, if_node)
+        if_node = self._statement("If condition", node.test)
 
         # Save current node for merging
         merge_node = self._create_node("If merge")
 
         # Process true branch
-        self.current_node = if_node
         true_entry = self._create_node("If true branch")
         self._connect_nodes(if_node, true_entry)
         self.current_node = true_entry
-
-        for stmt in node.body:
-            self.visit(stmt)
+        self._visit_body(node.body)
 
         if self.current_node:
             self._connect_nodes(self.current_node, merge_node)
 
         # Process false branch (if exists)
         if node.orelse:
-            self.current_node = if_node
             false_entry = self._create_node("If false branch")
             self._connect_nodes(if_node, false_entry)
             self.current_node = false_entry
-
-            for stmt in node.orelse:
-                self.visit(stmt)
+            self._visit_body(node.orelse)
 
             if self.current_node:
                 self._connect_nodes(self.current_node, merge_node)
@@ -190,151 +214,244 @@ class CFGVisitor(ast.NodeVisitor):
             # No else branch, connect if node directly to merge
             self._connect_nodes(if_node, merge_node)
 
-        self.current_node = merge_node
+        # both branches left the flow (return/raise/break/continue)
+        self.current_node = merge_node if merge_node.predecessors else None
         return merge_node
 
-    def visit_While(self, node: ast.While):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
-        # Create while header node
-        while_header = self._create_node("While header", node.test)
-        if self.current_node:
-            self._connect_nodes(self.current_node, while_header)
+    def _visit_loop(
+        self,
+        node: ast.While | ast.For | ast.AsyncFor,
+        header_label: str,
+        header_ast: ast.AST,
+        name: str,
+    ) -> CFGNode:
+        # Create loop header node
+        header = self._statement(header_label, header_ast)
 
         # Create merge node for after the loop
-        after_loop = self._create_node("After while")
+        after_loop = self._create_node(f"After {name}")
 
         # Process loop body
-        self.current_node = while_header
-        body_entry = self._create_node("While body")
-        self._connect_nodes(while_header, body_entry)
+        body_entry = self._create_node(f"{name.capitalize()} body")
+        self._connect_nodes(header, body_entry)
         self.current_node = body_entry
 
-        for stmt in node.body:
-            self.visit(stmt)
+        self._loops.append((header, after_loop))
+        self._visit_body(node.body)
+        self._loops.pop()
 
         # Connect back to header (loop)
         if self.current_node:
-            self._connect_nodes(self.current_node, while_header)
+            self._connect_nodes(self.current_node, header)
 
-        # Connect header to after loop (break condition)
-        self._connect_nodes(while_header, after_loop)
+        # Loop exhausted: `else` block runs, `break` skips it
+        if node.orelse:
+            else_entry = self._create_node(f"{name.capitalize()} else")
+            self._connect_nodes(header, else_entry)
+            self.current_node = else_entry
+            self._visit_body(node.orelse)
+            if self.current_node:
+                self._connect_nodes(self.current_node, after_loop)
+        else:
+            self._connect_nodes(header, after_loop)
 
         self.current_node = after_loop
         return after_loop
 
-    def visit_For(self, node: ast.For):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
-        # Create for header node
-        for_header = self._create_node("For header", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, for_header)
-
-        # Create merge node for after the loop
-        after_loop = self._create_node("After for")
-
-        # Process loop body
-        self.current_node = for_header
-        body_entry = self._create_node("For body")
-        self._connect_nodes(for_header, body_entry)
-        self.current_node = body_entry
-
-        for stmt in node.body:
-            self.visit(stmt)
+    def visit_While(self, node: ast.While):  # noqa: ANN201, D102
+        return self._visit_loop(node, "While header", node.test, "while")
 
-        # Connect back to header (loop)
-        if self.current_node:
-            self._connect_nodes(self.current_node, for_header)
+    def visit_For(self, node: ast.For):  # noqa: ANN201, D102
+        return self._visit_loop(node, "For header", node, "for")
 
-        # Connect header to after loop (break condition)
-        self._connect_nodes(for_header, after_loop)
+    def visit_AsyncFor(self, node: ast.AsyncFor):  # noqa: ANN201, D102
+        return self._visit_loop(node, "Async for header", node, "for")
 
-        self.current_node = after_loop
-        return after_loop
+    def _route_jump(self, node: CFGNode, kind: str) -> None:
+        # break/continue: through the innermost finally block inside the
+        # innermost loop, else straight to the loop exit or header
+        if not self._loops:
+            return
+        for target in reversed(self._handlers):
+            if isinstance(target, FinallyBlock):
+                if target.loop_depth < len(self._loops):
+                    break
+                target.jumps[kind].append(node)
+                return
+        header, after_loop = self._loops[-1]
+        self._connect_nodes(node, after_loop if kind == "break" else header)
 
     def visit_Break(self, node: ast.Break):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
-        # Break will be handled by the loop constructs
-        break_node = self._create_node("Break", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, break_node)
-        # The actual connection to after-loop happens in visit_While/visit_For
+        break_node = self._statement("Break", node)
+        self._route_jump(break_node, "break")
+        self.current_node = None
         return break_node
 
     def visit_Continue(self, node: ast.Continue):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
-        # Continue will be handled by the loop constructs
-        continue_node = self._create_node("Continue", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, continue_node)
-        # The actual connection back to loop header happens in visit_While/visit_For
+        continue_node = self._statement("Continue", node)
+        self._route_jump(continue_node, "continue")
+        self.current_node = None
         return continue_node
 
-    def visit_Return(self, node: ast.Return):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
+    def _route_return(self, node: CFGNode) -> None:
+        # through the innermost finally block, else straight to the exit
+        for target in reversed(self._handlers):
+            if isinstance(target, FinallyBlock):
+                target.returns.append(node)
+                return
+        self._pending_exits.append(node)
+
+    def _route_raise(self, node: CFGNode) -> None:
+        # to the innermost handlers or finally block, else out of the function
+        for target in reversed(self._handlers):
+            if isinstance(target, FinallyBlock):
+                target.raises.append(node)
+                return
+            if target:
+                for handler_entry in target:
+                    self._connect_nodes(node, handler_entry)
+                return
+        self._pending_exits.append(node)
 
-        return_node = self._create_node("Return", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, return_node)
+    def visit_Return(self, node: ast.Return):  # noqa: ANN201, D102
+        return_node = self._statement("Return", node)
         # Return ends the current flow
+        self._route_return(return_node)
         self.current_node = None
         return return_node
 
-    def visit_Expr(self, node: ast.Expr):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
+    def visit_Raise(self, node: ast.Raise):  # noqa: ANN201, D102
+        raise_node = self._statement("Raise", node)
+        self._route_raise(raise_node)
+        self.current_node = None
+        return raise_node
+
+    def visit_Try(self, node: ast.Try):  # noqa: ANN201, D102
+        try_node = self._statement("Try", node)
+
+        handler_entries = []
+        for handler in node.handlers:
+            exception = ast.unparse(handler.type) if handler.type else "any"
+            handler_entry = self._create_node(f"Except {exception}", handler)
+            # any statement of the body may raise into the handler
+            self._connect_nodes(try_node, handler_entry)
+            handler_entries.append(handler_entry)
+        after_try = self._create_node("After try")
+
+        # returns, raises, breaks and continues anywhere in the try run the
+        # finally block first
+        finally_block = FinallyBlock(len(self._loops))
+        if node.finalbody:
+            self._handlers.append(finally_block)
+
+        self._handlers.append(handler_entries)
+        self._visit_body(node.body)
+        self._handlers.pop()
+
+        self._visit_body(node.orelse)
+        branch_ends = [self.current_node]
+
+        for handler, handler_entry in zip(node.handlers, handler_entries):
+            self.current_node = handler_entry
+            self._visit_body(handler.body)
+            branch_ends.append(self.current_node)
+
+        if node.finalbody:
+            self._handlers.pop()
+            finally_entry = self._create_node("Finally")
+            abrupt = [
+                *finally_block.returns,
+                *finally_block.raises,
+                *finally_block.jumps["break"],
+                *finally_block.jumps["continue"],
+            ]
+            for end in branch_ends + abrupt:
+                if end:
+                    self._connect_nodes(end, finally_entry)
+            self.current_node = finally_entry
+            self._visit_body(node.finalbody)
+            finally_end = self.current_node
+            if finally_end:
+                if any(branch_ends):
+                    self._connect_nodes(finally_end, after_try)
+                # abrupt exits carry on past the finally block
+                if finally_block.returns:
+                    self._route_return(finally_end)
+                if finally_block.raises:
+                    self._route_raise(finally_end)
+                for kind, jumps in finally_block.jumps.items():
+                    if jumps:
+                        self._route_jump(finally_end, kind)
+        else:
+            for end in branch_ends:
+                if end:
+                    self._connect_nodes(end, after_try)
+
+        self.current_node = after_try if after_try.predecessors else None
+        return after_try
+
+    visit_TryStar = visit_Try  # noqa: N815
+
+    def _visit_with(self, node: ast.With | ast.AsyncWith, label: str):  # noqa: ANN202
+        with_node = self._statement(label, node)
+        self._visit_body(node.body)
+        return with_node
+
+    def visit_With(self, node: ast.With):  # noqa: ANN201, D102
+        return self._visit_with(node, "With")
+
+    def visit_AsyncWith(self, node: ast.AsyncWith):  # noqa: ANN201, D102
+        return self._visit_with(node, "Async with")
+
+    def visit_Match(self, node: ast.Match):  # noqa: ANN201, D102
+        match_node = self._statement("Match subject", node.subject)
+        merge_node = self._create_node("Match merge")
+
+        exhaustive = False
+        for case in node.cases:
+            case_entry = self._create_node(
+                f"Case {ast.unparse(case.pattern)}",
+                case.pattern,
+            )
+            self._connect_nodes(match_node, case_entry)
+            self.current_node = case_entry
+            self._visit_body(case.body)
+            if self.current_node:
+                self._connect_nodes(self.current_node, merge_node)
+            if (
+                isinstance(case.pattern, ast.MatchAs)
+                and case.pattern.pattern is None
+                and case.guard is None
+            ):
+                exhaustive = True
+
+        if not exhaustive:
+            # no irrefutable `case _:`, the subject may match nothing
+            self._connect_nodes(match_node, merge_node)
+
+        self.current_node = merge_node if merge_node.predecessors else None
+        return merge_node
 
-        expr_node = self._create_node("Expression", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, expr_node)
-        self.current_node = expr_node
-        return expr_node
+    def visit_Expr(self, node: ast.Expr):  # noqa: ANN201, D102
+        return self._statement("Expression", node)
 
     def visit_Assign(self, node: ast.Assign):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
+        return self._statement("Assignment", node)
 
-        assign_node = self._create_node("Assignment", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, assign_node)
-        self.current_node = assign_node
-        return assign_node
+    def visit_AnnAssign(self, node: ast.AnnAssign):  # noqa: ANN201, D102
+        return self._statement("Assignment", node)
 
     def visit_AugAssign(self, node: ast.AugAssign):  # noqa: ANN201, D102
-        if not self.in_target_function and self.target_function:
-            return None
-
-        aug_assign_node = self._create_node("Augmented Assignment", node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, aug_assign_node)
-        self.current_node = aug_assign_node
-        return aug_assign_node
+        return self._statement("Augmented Assignment", node)
 
     def generic_visit(self, node: ast.AST):  # noqa: ANN201
-        """Handle all other node types."""  # noqa: DOC201
-        if not self.in_target_function and self.target_function:
-            return None
+        """Handle all other statements (Assert, Import, Pass, ...) as one node."""  # noqa: DOC201
+        return self._statement(type(node).__name__, node)
 
-        node_label = type(node).__name__
-        new_node = self._create_node(node_label, node)
-        if self.current_node:
-            self._connect_nodes(self.current_node, new_node)
-        self.current_node = new_node
-        super().generic_visit(node)
-        return new_node
-
-    def to_json(self) -> str:
-        """Convert CFG to JSON format."""  # noqa: DOC201
+    def to_dict(self) -> dict[str, Any]:
+        """Convert CFG to a JSON-ready dict."""  # noqa: DOC201
         if self.function_cfg:
-            return json.dumps(self.function_cfg, indent=2)
+            return self.function_cfg
 
         cfg_dict = {
             "entry_node_id": self.entry_node.id if self.entry_node else None,
@@ -349,7 +466,11 @@ class CFGVisitor(ast.NodeVisitor):
         else:
             cfg_dict["type"] = "module_cfg"
 
-        return json.dumps(cfg_dict, indent=2)
+        return cfg_dict
+
+    def to_json(self) -> str:
+        """Convert CFG to JSON format."""  # noqa: DOC201
+        return json.dumps(self.to_dict(), indent=2)
 
     def build_cfg(self, code: str) -> str:
         """Build CFG from Python code and return as JSON."""  # noqa: DOC201
@@ -367,6 +488,15 @@ def generate_cfg_from_code(code: str, function_name: str | None = None) -> str:
     return visitor.build_cfg(code)
 
 
+def generate_cfg_from_node(
+    node: ast.FunctionDef | ast.AsyncFunctionDef,
+) -> dict[str, Any]:
+    """Build the CFG of an already parsed function, nested ones and methods too."""  # noqa: DOC201
+    visitor = CFGVisitor(target_function=node.name)
+    visitor.visit(node)
+    return visitor.to_dict()
+
+
 def generate_cfg_from_file(filename: str, function_name: str | None = None) -> str:
     """Generate CFG JSON from a Python file."""  # noqa: DOC201
     with open(filename, encoding="utf-8") as f:  # noqa: FURB101, PTH123
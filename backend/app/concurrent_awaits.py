@@ -0,0 +1,163 @@
+import ast  # noqa: D100
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_dataflow import awaits, iter_function_defs, statement_header, statement_names
+from .cfg_visitor import CFGNode, CFGVisitor
+from .db_calls import call_name
+
+# statements whose body follows them in the CFG; a run never crosses them
+BARRIERS = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.With,
+    ast.AsyncWith,
+    ast.For,
+    ast.AsyncFor,
+    ast.Try,
+    ast.TryStar,
+    ast.ExceptHandler,
+)
+
+
+class _Statement:
+    def __init__(self, node: CFGNode) -> "_Statement":
+        names = statement_names(node.ast_node)
+        self.node = node
+        self.lineno = node.ast_node.lineno
+        self.uses = names.uses
+        self.defs = set(names.defs)
+        self.calls = []
+        for header in statement_header(node.ast_node):
+            for child in ast.walk(header):
+                if not isinstance(child, ast.Call):
+                    continue
+                self.calls.append(call_name(child))
+                # a method call may change its receiver: `session.commit()`
+                receiver = child.func
+                while isinstance(receiver, ast.Attribute):
+                    receiver = receiver.value
+                if isinstance(receiver, ast.Name) and receiver is not child.func:
+                    self.defs.add(receiver.id)
+        self.awaits = awaits(node.ast_node)
+
+    def conflicts(self, other: "_Statement") -> bool:
+        # true, anti or output dependency in either order
+        return bool(
+            self.defs & (other.uses | other.defs) or self.uses & other.defs,
+        )
+
+
+def straight_line_runs(nodes: list[CFGNode]) -> list[list[CFGNode]]:
+    """Maximal single-entry single-exit chains of statement nodes."""  # noqa: DOC201
+    def joins(node: CFGNode) -> bool:
+        return (
+            node.ast_node is not None
+            and not isinstance(node.ast_node, BARRIERS)
+            and len(node.predecessors) == 1
+        )
+
+    runs = []
+    for node in nodes:
+        if node.ast_node is None or isinstance(node.ast_node, BARRIERS):
+            continue
+        previous = nodes[node.predecessors[0]] if len(node.predecessors) == 1 else None
+        if (
+            previous is not None
+            and joins(node)
+            and previous.ast_node is not None
+            and not isinstance(previous.ast_node, BARRIERS)
+            and len(previous.successors) == 1
+        ):
+            continue  # not the head of a run
+        run = [node]
+        while len(run[-1].successors) == 1:
+            following = nodes[run[-1].successors[0]]
+            if not joins(following):
+                break
+            run.append(following)
+        runs.append(run)
+    return runs
+
+
+def gather_groups(run: list[CFGNode]) -> list[list[_Statement]]:
+    """Groups of awaits in one run that could be started together.
+
+    An await joins the group of an earlier await when it has no dependency,
+    in either direction, on any statement from that await up to itself, so
+    hoisting it next to the first one changes no value.
+    """  # noqa: DOC201
+    statements = [_Statement(node) for node in run]
+    grouped: set[int] = set()
+    groups = []
+    for first, head in enumerate(statements):
+        if not head.awaits or first in grouped:
+            continue
+        group = [first]
+        for position in range(first + 1, len(statements)):
+            candidate = statements[position]
+            if not candidate.awaits or position in grouped:
+                continue
+            if not any(
+                candidate.conflicts(statements[between])
+                for between in range(first, position)
+            ):
+                group.append(position)
+        if len(group) > 1:
+            grouped.update(group)
+            groups.append([statements[position] for position in group])
+    return groups
+
+
+def concurrent_awaits_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """``asyncio.gather`` candidates of every async function, handlers first.
+
+    Each group of independent awaits saves ``len(group) - 1`` sequential
+    round trips; ``options["round_trip_ms"]`` turns that into milliseconds.
+    """  # noqa: DOC201
+    round_trip_ms = (options or {}).get("round_trip_ms")
+    nodes = {symbol: node for symbol, _, _, node in iter_functions(dependencies)}
+
+    report = []
+    for module, tree in analyzer.get_source_trees().items():
+        for symbol, function in iter_function_defs(module, tree):
+            if not isinstance(function, ast.AsyncFunctionDef):
+                continue
+            visitor = CFGVisitor(target_function=function.name)
+            visitor.visit(function)
+            groups = [
+                group
+                for run in straight_line_runs(visitor.nodes)
+                for group in gather_groups(run)
+            ]
+            if not groups:
+                continue
+
+            saved = sum(len(group) - 1 for group in groups)
+            node = nodes.get(symbol, {})
+            entry = {
+                "symbol": symbol,
+                "type": node.get("type", "function"),
+                "http_method": node.get("http_method"),
+                "path": node.get("path"),
+                "groups": [
+                    [
+                        {"lineno": statement.lineno, "calls": statement.calls}
+                        for statement in group
+                    ]
+                    for group in groups
+                ],
+                "round_trips_saved": saved,
+            }
+            if round_trip_ms is not None:
+                entry["estimated_ms_saved"] = saved * round_trip_ms
+            report.append(entry)
+
+    report.sort(
+        key=lambda item: (item["type"] != "handler", -item["round_trips_saved"]),
+    )
+    return report
@@ -0,0 +1,298 @@
+import json  # noqa: D100
+import sqlite3
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_shapes import function_cfg
+from .profile_overlay import ModuleFiles
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+TOP_COLD_FUNCTIONS = 20
+# CFGVisitor headers whose outgoing arcs coverage.py records as branches
+ARC_BRANCH_LABELS = (
+    "If condition",
+    "While header",
+    "For header",
+    "Async for header",
+)
+
+Arc = tuple[int, int]
+
+
+class FileCoverage:
+    """Executed lines of one measured file, sorted, and its executed arcs.
+
+    ``arc_sources`` are the lines whose outgoing arcs were measured: every
+    line of a ``--branch`` SQLite file, only branch lines of a JSON report.
+    Edges leaving other lines are inferred from executed lines.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        lines: set[int],
+        arcs: set[Arc] | None = None,
+        arc_sources: set[int] | None = None,
+    ) -> "FileCoverage":
+        self.lines = sorted(lines)
+        self.arcs = arcs or set()
+        self.arc_sources = arc_sources if arc_sources is not None else set()
+
+    def lines_between(self, first: int, last: int) -> list[int]:
+        """Executed lines of an inclusive line interval, by binary search."""  # noqa: DOC201
+        start = bisect_left(self.lines, first)
+        return self.lines[start : bisect_right(self.lines, last, lo=start)]
+
+
+def numbits_lines(numbits: bytes) -> set[int]:
+    """Line numbers of a coverage.py ``numbits`` blob (bit n set: line n ran)."""  # noqa: DOC201
+    lines = set()
+    for index, byte in enumerate(numbits):
+        if not byte:
+            continue
+        for bit in range(8):
+            if byte & (1 << bit):
+                lines.add(index * 8 + bit)
+    return lines
+
+
+def _load_sqlite(data: bytes) -> dict[str, FileCoverage]:
+    # a .coverage data file; measurement contexts are merged
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.deserialize(data)
+        files = dict(connection.execute("SELECT id, path FROM file"))
+        lines: dict[int, set[int]] = {file_id: set() for file_id in files}
+        arcs: dict[int, set[Arc]] = {file_id: set() for file_id in files}
+        tables = {
+            name for (name,) in connection.execute("SELECT name FROM sqlite_master")
+        }
+        if "line_bits" in tables:
+            for file_id, numbits in connection.execute(
+                "SELECT file_id, numbits FROM line_bits",
+            ):
+                lines[file_id] |= numbits_lines(numbits)
+        if "arc" in tables:
+            for file_id, from_line, to_line in connection.execute(
+                "SELECT file_id, fromno, tono FROM arc",
+            ):
+                arcs[file_id].add((from_line, to_line))
+                # branch data has no line table: lines are arc endpoints
+                for line in (from_line, to_line):
+                    if line > 0:
+                        lines[file_id].add(line)
+    except sqlite3.DatabaseError as e:
+        msg = f"not a coverage data file: {e}"
+        raise ValueError(msg) from e
+    finally:
+        connection.close()
+
+    coverage = {}
+    for file_id, path in files.items():
+        file_arcs = arcs[file_id]
+        sources = {from_line for from_line, _ in file_arcs} if file_arcs else set()
+        coverage[path] = FileCoverage(lines[file_id], file_arcs, sources)
+    return coverage
+
+
+def _load_json(data: bytes) -> dict[str, FileCoverage]:
+    # ``coverage json`` report; branches are listed only for branch lines
+    try:
+        report = json.loads(data)
+        files = report["files"]
+    except (ValueError, KeyError, TypeError) as e:
+        msg = f"not a coverage JSON report: {e}"
+        raise ValueError(msg) from e
+
+    coverage = {}
+    for path, measured in files.items():
+        executed = {tuple(arc) for arc in measured.get("executed_branches", [])}
+        missing = {tuple(arc) for arc in measured.get("missing_branches", [])}
+        coverage[path] = FileCoverage(
+            set(measured.get("executed_lines", [])),
+            executed,
+            {from_line for from_line, _ in executed | missing},
+        )
+    return coverage
+
+
+def load_coverage(data: bytes) -> dict[str, FileCoverage]:
+    """``{measured path: FileCoverage}`` of a ``.coverage`` file or JSON report."""  # noqa: DOC201
+    if data.startswith(SQLITE_HEADER):
+        return _load_sqlite(data)
+    return _load_json(data)
+
+
+def load_coverage_file(path: str) -> dict[str, FileCoverage]:
+    """``load_coverage`` of a file on disk."""  # noqa: DOC201
+    return load_coverage(Path(path).read_bytes())
+
+
+def _node_lines(cfg: dict[str, Any], marker: int) -> list[int | None]:
+    # coverage.py marks function entry and exit with -co_firstlineno;
+    # branch and merge nodes have no line
+    return [
+        marker
+        if node["id"] in (cfg.get("entry_node_id"), cfg.get("exit_node_id"))
+        else node.get("lineno")
+        for node in cfg["nodes"]
+    ]
+
+
+def _through_synthetic(
+    start: int,
+    edges: list[list[int]],
+    lines: list[int | None],
+) -> set[int]:
+    # lines reached from ``start`` along ``edges`` without crossing a line
+    found = set()
+    seen = {start}
+    stack = [start]
+    while stack:
+        node_id = stack.pop()
+        if lines[node_id] is not None:
+            found.add(lines[node_id])
+            continue
+        for next_id in edges[node_id]:
+            if next_id not in seen:
+                seen.add(next_id)
+                stack.append(next_id)
+    return found
+
+
+def cfg_coverage(
+    cfg: dict[str, Any],
+    file_coverage: FileCoverage,
+    firstlineno: int,
+) -> dict[str, Any] | None:
+    """Executed nodes and taken edges of one function CFG, or None if it never ran.
+
+    A statement node ran when its first line did. An edge leaving an
+    ``if``/``while``/``for`` header was taken when coverage recorded the arc
+    from the header to a line after it; other edges, and all edges without
+    arc data, were taken when lines on both sides of them ran (looking
+    through branch and merge nodes, which ran when an incoming edge did).
+    """  # noqa: DOC201
+    if not cfg.get("nodes"):
+        return None
+    marker = -firstlineno
+    nodes = cfg["nodes"]
+    lines = _node_lines(cfg, marker)
+    last = max(
+        [firstlineno, *(node.get("end_lineno") or 0 for node in nodes)],
+    )
+    span = set(file_coverage.lines_between(firstlineno, last))
+    if not any(line is not None and line in span for line in lines):
+        return None
+
+    def ran(line: int) -> bool:
+        return line == marker or line in span
+
+    successors = [node["successors"] for node in nodes]
+    predecessors = [node["predecessors"] for node in nodes]
+    # statement lines after each edge target, through synthetic nodes
+    after = {}
+    measured_branches = not cfg.get("compacted")
+    taken = []
+    not_taken = []
+    for node in nodes:
+        node_id = node["id"]
+        before = _through_synthetic(node_id, predecessors, lines)
+        for target in node["successors"]:
+            if target not in after:
+                after[target] = _through_synthetic(target, successors, lines)
+            if (
+                measured_branches
+                and node.get("label") in ARC_BRANCH_LABELS
+                and lines[node_id] in file_coverage.arc_sources
+            ):
+                hit = any(
+                    (lines[node_id], line) in file_coverage.arcs
+                    for line in after[target]
+                )
+            else:
+                hit = any(ran(line) for line in before) and any(
+                    ran(line) for line in after[target]
+                )
+            (taken if hit else not_taken).append([node_id, target])
+
+    reached = {target for _, target in taken}
+    executed = [
+        node["id"]
+        for node, line in zip(nodes, lines, strict=True)
+        if (ran(line) if line is not None else node["id"] in reached)
+    ]
+    executed_ids = set(executed)
+    cold_branches = []
+    for node in nodes:
+        if node["id"] not in executed_ids or len(node["successors"]) < 2:
+            continue
+        missed = [target for source, target in not_taken if source == node["id"]]
+        if missed:
+            cold_branches.append(
+                {"node": node["id"], "lineno": node.get("lineno"), "not_taken": missed},
+            )
+    return {
+        "executed": executed,
+        "missed": [node["id"] for node in nodes if node["id"] not in executed_ids],
+        "taken_edges": taken,
+        "not_taken_edges": not_taken,
+        "cold_branches": cold_branches,
+    }
+
+
+def apply_coverage(
+    dependencies: dict[str, Any],
+    coverage: dict[str, FileCoverage],
+) -> dict[str, Any]:
+    """CFG coverage of every measured function, summarised; the scan is not modified.
+
+    ``functions`` maps function symbols to executed and missed CFG node
+    ids, taken and not taken edges and the branches real traffic never
+    took; functions whose file was measured but that never ran are listed
+    as ``not_run``.
+    """  # noqa: DOC201
+    files = ModuleFiles(
+        [module_info["module"] for module_info in dependencies.get("modules", [])],
+    )
+    by_module: dict[str, FileCoverage] = {}
+    for path, file_coverage in coverage.items():
+        module = files.module(path)
+        if module is not None:
+            by_module[module] = file_coverage
+
+    functions = {}
+    not_run = []
+    cold = []
+    for symbol, module, _, node in iter_functions(dependencies):
+        file_coverage = by_module.get(module)
+        if file_coverage is None:
+            continue
+        result = cfg_coverage(
+            function_cfg(dependencies, node),
+            file_coverage,
+            node.get("firstlineno", node["lineno"]),
+        )
+        if result is None:
+            not_run.append(symbol)
+            continue
+        functions[symbol] = result
+        if result["cold_branches"]:
+            cold.append(
+                {
+                    "symbol": symbol,
+                    "type": node.get("type"),
+                    "cold_branches": len(result["cold_branches"]),
+                    "not_taken_edges": len(result["not_taken_edges"]),
+                },
+            )
+    cold.sort(key=lambda item: (-item["not_taken_edges"], item["symbol"]))
+    return {
+        "files": len(by_module),
+        "unmatched_files": len(coverage) - len(by_module),
+        "covered_functions": len(functions),
+        "not_run": not_run,
+        "cold_functions": cold[:TOP_COLD_FUNCTIONS],
+        "functions": functions,
+    }
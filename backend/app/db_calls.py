@@ -0,0 +1,76 @@
+import ast  # noqa: D100
+import fnmatch
+import re
+
+# fnmatch patterns over the dotted callee of a call site ("session.exec",
+# "self.db.get", "crud.create_user"); calls that reach the database
+DEFAULT_DB_CALL_PATTERNS = (
+    "*session.exec",
+    "*session.execute",
+    "*session.get",
+    "*session.scalar",
+    "*session.scalars",
+    "*session.query",
+    "*session.refresh",
+    "*session.flush",
+    "*session.commit",
+    "*session.merge",
+    "*session.delete",
+    "db.exec",
+    "db.execute",
+    "db.get",
+    "db.scalar",
+    "db.scalars",
+    "db.query",
+    "db.refresh",
+    "db.flush",
+    "db.commit",
+    "db.merge",
+    "db.delete",
+    "crud.*",
+)
+
+# session methods that each cost one round trip to the database server
+ROUND_TRIP_METHODS = (
+    "exec",
+    "execute",
+    "get",
+    "scalar",
+    "scalars",
+    "refresh",
+    "flush",
+    "commit",
+)
+DEFAULT_ROUND_TRIP_PATTERNS = tuple(
+    pattern
+    for pattern in DEFAULT_DB_CALL_PATTERNS
+    if pattern.rsplit(".", maxsplit=1)[-1] in ROUND_TRIP_METHODS
+)
+
+
+def call_name(node: ast.Call) -> str | None:
+    """Dotted name of the called expression, or None for computed callees."""  # noqa: DOC201
+    parts = []
+    current = node.func
+    while isinstance(current, ast.Attribute):
+        parts.append(current.attr)
+        current = current.value
+    if not isinstance(current, ast.Name):
+        return None
+    parts.append(current.id)
+    return ".".join(reversed(parts))
+
+
+class CallMatcher:
+    """Matches dotted call names against a set of fnmatch patterns."""
+
+    def __init__(self, patterns: tuple[str, ...] | list[str]) -> "CallMatcher":  # noqa: D107
+        self.patterns = list(patterns)
+        # one alternation instead of trying every pattern per call
+        self._regex = re.compile(
+            "|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in self.patterns)
+            or r"(?!)",
+        )
+
+    def matches(self, name: str | None) -> bool:  # noqa: D102
+        return name is not None and self._regex.match(name) is not None
@@ -0,0 +1,191 @@
+import ast  # noqa: D100
+from collections.abc import Callable
+from typing import Any
+
+from .call_graph import CallGraph
+from .cfg_dataflow import FunctionNode, iter_function_defs, statement_header
+from .cfg_visitor import CFGVisitor
+from .db_calls import DEFAULT_ROUND_TRIP_PATTERNS, CallMatcher, call_name
+from .graph_layout import condense, strongly_connected_components
+from .n_plus_one import expression_calls
+
+# (min, max) round trips; a max of None means unbounded
+Cost = tuple[int, int | None]
+NONE: Cost = (0, 0)
+
+
+def _add(a: Cost, b: Cost) -> Cost:
+    return a[0] + b[0], None if a[1] is None or b[1] is None else a[1] + b[1]
+
+
+def _repeat(cost: Cost) -> Cost:
+    # zero or more times
+    return 0, 0 if cost[1] == 0 else None
+
+
+def _either(costs: list[Cost]) -> Cost:
+    maxima = [cost[1] for cost in costs]
+    return (
+        min(cost[0] for cost in costs),
+        None if None in maxima else max(maxima),
+    )
+
+
+class RoundTripEstimator:
+    """Min/max DB round trips of scanned functions along their CFG paths.
+
+    Loops, comprehensions and recursion containing a round trip make the
+    maximum unbounded and count as zero iterations for the minimum. Calls
+    into scanned functions add the callee's cost, memoized per function;
+    functions without parsed source cost nothing.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        call_graph: CallGraph,
+        functions: dict[int, FunctionNode],
+        matcher: CallMatcher,
+    ) -> "RoundTripEstimator":
+        self.call_graph = call_graph
+        self.functions = functions
+        self.matcher = matcher
+        self._costs: dict[int, Cost] = {}
+        # mutually recursive functions are costed together, per call-graph SCC
+        self._component = strongly_connected_components(call_graph.successors)
+        self._cycles: dict[int, list[int]] = {}
+        for function_id, comp in enumerate(self._component):
+            self._cycles.setdefault(comp, []).append(function_id)
+        for comp, members in list(self._cycles.items()):
+            first, *others = members
+            if not others and first not in call_graph.successors[first]:
+                del self._cycles[comp]
+
+    def cost(self, function_id: int) -> Cost:
+        """``(min, max)`` round trips of one call to the function."""  # noqa: DOC201
+        if function_id not in self._costs:
+            comp = self._component[function_id]
+            members = self._cycles.get(comp, [function_id])
+            costs = {member: self._function_cost(member) for member in members}
+            # recursion repeats any round trip of the cycle
+            if comp in self._cycles and any(cost[1] != 0 for cost in costs.values()):
+                costs = {member: (cost[0], None) for member, cost in costs.items()}
+            self._costs.update(costs)
+        return self._costs[function_id]
+
+    def _call_cost(
+        self,
+        caller: int,
+        call: ast.Call,
+        resolved: dict[tuple[int, str], int],
+    ) -> Cost:
+        name = call_name(call)
+        if self.matcher.matches(name):
+            return 1, 1
+        if name is None:
+            return NONE
+        callee = resolved.get((call.lineno, name.rsplit(".", maxsplit=1)[-1]))
+        if callee is None or self._component[callee] == self._component[caller]:
+            return NONE  # calls within a recursion cycle are costed by cost()
+        return self.cost(callee)
+
+    def _function_cost(self, function_id: int) -> Cost:
+        function = self.functions.get(function_id)
+        if function is None:
+            return NONE
+        visitor = CFGVisitor(target_function=function.name)
+        visitor.visit(function)
+        resolved = self.call_graph.call_site_targets(function_id)
+
+        # per node: cost paid once on entering its loop, and on every visit
+        before = [NONE] * len(visitor.nodes)
+        each = [NONE] * len(visitor.nodes)
+        for node in visitor.nodes:
+            if node is visitor.entry_node:
+                continue  # decorators and defaults run at definition time
+            if isinstance(node.ast_node, (ast.For, ast.AsyncFor)):
+                parts = [(node.ast_node.iter, -1), (node.ast_node.target, 0)]
+            else:
+                parts = [(header, 0) for header in statement_header(node.ast_node)]
+            for expr, depth in parts:
+                for call, level in expression_calls(expr, depth):
+                    cost = self._call_cost(function_id, call, resolved)
+                    if level < 0:
+                        before[node.id] = _add(before[node.id], cost)
+                    elif level == 0:
+                        each[node.id] = _add(each[node.id], cost)
+                    else:
+                        each[node.id] = _add(each[node.id], _repeat(cost))
+
+        successors = [node.successors for node in visitor.nodes]
+        component = strongly_connected_components(successors)
+        dag, _ = condense(successors, component)
+        members: list[list[int]] = [[] for _ in dag]
+        for node, comp in enumerate(component):
+            members[comp].append(node)
+
+        # Tarjan ids are reverse topological: successors are already done
+        total: list[Cost] = []
+        for comp, nodes in enumerate(members):
+            weight = NONE
+            repeated = NONE
+            for node in nodes:
+                weight = _add(weight, before[node])
+                repeated = _add(repeated, each[node])
+            loop = len(nodes) > 1 or nodes[0] in successors[nodes[0]]
+            weight = _add(weight, _repeat(repeated) if loop else repeated)
+            if dag[comp]:
+                weight = _add(weight, _either([total[s] for s in dag[comp]]))
+            total.append(weight)
+        return total[component[visitor.entry_node.id]]
+
+
+def round_trip_sort_key(column: str) -> Callable[[dict[str, Any]], tuple]:
+    """Sort key for the handler table by ``min`` or ``max``, largest first."""  # noqa: DOC201
+    if column == "min":
+        return lambda row: (-row["min_round_trips"], row["symbol"])
+    return lambda row: (
+        not row["unbounded"],
+        -(row["max_round_trips"] or 0),
+        -row["min_round_trips"],
+        row["symbol"],
+    )
+
+
+def db_round_trips_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Static min/max DB round trips of every handler, most expensive first.
+
+    ``options["patterns"]`` replaces ``DEFAULT_ROUND_TRIP_PATTERNS``. An
+    unbounded maximum is reported as ``max_round_trips: null``.
+    """  # noqa: DOC201
+    matcher = CallMatcher(
+        (options or {}).get("patterns") or DEFAULT_ROUND_TRIP_PATTERNS,
+    )
+    call_graph = CallGraph(dependencies)
+    functions = {}
+    for module, tree in analyzer.get_source_trees().items():
+        for symbol, function in iter_function_defs(module, tree):
+            if symbol in call_graph.index:
+                functions[call_graph.index[symbol]] = function
+    estimator = RoundTripEstimator(call_graph, functions, matcher)
+
+    table = []
+    for function_id, node in enumerate(call_graph.nodes):
+        if node.get("type") != "handler":
+            continue
+        low, high = estimator.cost(function_id)
+        table.append(
+            {
+                "symbol": call_graph.names[function_id],
+                "http_method": node.get("http_method"),
+                "path": node.get("path"),
+                "min_round_trips": low,
+                "max_round_trips": high,
+                "unbounded": high is None,
+            },
+        )
+    table.sort(key=round_trip_sort_key("max"))
+    return table
@@ -14,12 +14,22 @@
 import argparse
 import ast
 import json
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
 
+from .analysis_layers import check_analysis_names, run_analysis_layers
+from .cfg_export import encode_cfgs
+from .coverage_overlay import apply_coverage, load_coverage_file
+from .cfg_shapes import intern_cfg_shapes
 from .file_processor import ProjectAnalyzer
+from .function_cache import FunctionCache
+from .profile_overlay import apply_profile, load_stats_file
+from .route_index import build_route_index
+from .stack_samples import CollapsedStackImporter
 import sys
 
+DEFAULT_EXCLUDED_DIRS = "tests,venv,.venv,__pycache__,migrations,alembic,scripts,.git"
+
 
 def parse_arguments():
     """Парсит аргументы командной строки"""
@@ -47,23 +57,69 @@ def parse_arguments():
     parser.add_argument(
         "--exclude",
         type=str,
-        default="tests,venv,.venv,__pycache__,migrations,alembic,scripts,.git",
+        default=DEFAULT_EXCLUDED_DIRS,
         help="Директории/файлы для исключения через запятую (по умолчанию: tests,venv,.venv,__pycache__,migrations)",
     )
     parser.add_argument(
         "--root-module",
         type=str,
         default="",
-        help="Корневой модуль для преобразования путей (опционально)",
+        help="Входной модуль (например, app.main или app/main.py): анализируются только достижимые из него файлы (опционально)",
     )
     parser.add_argument(
         "--verbose", action="store_true", help="Показывать подробную информацию"
     )
+    parser.add_argument(
+        "--compact-cfg",
+        action="store_true",
+        help="Сжимать CFG функций в базовые блоки",
+    )
+    parser.add_argument(
+        "--share-cfg-shapes",
+        action="store_true",
+        help="Хранить одинаковые по структуре CFG один раз в таблице cfg_shapes",
+    )
+    parser.add_argument(
+        "--analyses",
+        type=str,
+        default="",
+        help="Дополнительные слои анализа через запятую (например, dominators)",
+    )
+    parser.add_argument(
+        "--analysis-options",
+        type=json.loads,
+        default={},
+        help='Параметры слоёв анализа в JSON, например {"n_plus_one": {"patterns": ["*.session.exec"]}}',
+    )
     parser.add_argument(
         "--max-depth",
         type=int,
         default=0,
-        help="Максимальная глубина анализа (0 = без ограничений)",
+        help="Максимальная глубина обхода импортов от --root-module (0 = без ограничений)",
+    )
+    parser.add_argument(
+        "--cfg-export",
+        type=str,
+        default="",
+        help="Файл для бинарного колоночного экспорта всех CFG (опционально)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default="",
+        help="Дамп cProfile (.pstats), время из которого наложить на функции скана (опционально)",
+    )
+    parser.add_argument(
+        "--coverage",
+        type=str,
+        default="",
+        help="Данные coverage.py (.coverage или coverage json), наложить на CFG функций (опционально)",
+    )
+    parser.add_argument(
+        "--samples",
+        type=str,
+        default="",
+        help="Свёрнутые стеки сэмплирующего профайлера (frame;frame count), веса на граф вызовов (опционально)",
     )
 
     return parser.parse_args()
@@ -131,6 +187,10 @@ def resolve_import_path(
     Returns:
         str: Путь к файлу или None, если не найден
     """
+    # Точное совпадение — без перебора всех модулей
+    if import_name in module_to_file:
+        return module_to_file[import_name]
+
     # Проверяем, есть ли модуль в нашем проекте
     for module_path in module_to_file:
         if module_path == import_name or module_path.startswith(f"{import_name}."):
@@ -162,7 +222,12 @@ def resolve_import_path(
 
 
 def analyze_file_dependencies(
-    file_path, module_to_file, file_to_module, include_external=False, max_depth=0
+    file_path,
+    module_to_file,
+    file_to_module,
+    include_external=False,
+    max_depth=0,
+    project_root=None,
 ):
     """
     Анализирует зависимости одного файла
@@ -172,17 +237,21 @@ def analyze_file_dependencies(
         module_to_file (dict): Маппинг модулей на файлы
         file_to_module (dict): Маппинг файлов на модули
         include_external (bool): Включать внешние зависимости
-        max_depth (int): Максимальная глубина анализа
+        max_depth (int): Не используется, глубина ограничивается в analyze_project
+        project_root (Path): Корень проекта для вычисления относительного пути
 
     Returns:
         set: Множество зависимостей
     """
     dependencies = set()
-    rel_path = (
-        file_path.relative_to(file_path.parent.parent.parent).as_posix()
-        if len(file_path.parts) > 3
-        else file_path.name
-    )
+    if project_root is not None:
+        rel_path = file_path.relative_to(project_root).as_posix()
+    else:
+        rel_path = (
+            file_path.relative_to(file_path.parent.parent.parent).as_posix()
+            if len(file_path.parts) > 3
+            else file_path.name
+        )
 
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -201,6 +270,11 @@ def analyze_file_dependencies(
         )
         current_module = module_name
 
+    # Для __init__.py текущий пакет — сам модуль
+    current_package_parts = current_module.split(".")
+    if file_path.name != "__init__.py":
+        current_package_parts = current_package_parts[:-1]
+
     for node in ast.walk(tree):
         try:
             if isinstance(node, ast.Import):
@@ -212,23 +286,30 @@ def analyze_file_dependencies(
                         dependencies.add(dep_file)
 
             elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    # Обработка относительных импортов
-                    if node.level > 0 and current_module:
-                        current_parts = current_module.split(".")
-                        base_parts = (
-                            current_parts[: -node.level]
-                            if node.level < len(current_parts)
-                            else []
-                        )
-                        full_module = (
-                            ".".join(base_parts + [node.module])
-                            if base_parts
-                            else node.module
-                        )
-                    else:
-                        full_module = node.module
+                # Обработка относительных импортов
+                if node.level > 0:
+                    base_parts = (
+                        current_package_parts[: len(current_package_parts) - node.level + 1]
+                        if node.level <= len(current_package_parts)
+                        else []
+                    )
+                    full_module = ".".join(
+                        base_parts + ([node.module] if node.module else [])
+                    )
+                else:
+                    full_module = node.module or ""
 
+                # from package import submodule
+                resolved_names = False
+                for alias in node.names:
+                    candidate = (
+                        f"{full_module}.{alias.name}" if full_module else alias.name
+                    )
+                    if candidate in module_to_file:
+                        dependencies.add(module_to_file[candidate])
+                        resolved_names = True
+
+                if full_module and (node.module or not resolved_names):
                     dep_file = resolve_import_path(
                         full_module, current_module, module_to_file, include_external
                     )
@@ -240,6 +321,34 @@ def analyze_file_dependencies(
     return dependencies
 
 
+def find_entry_file(root_module, module_to_file, file_to_module):
+    """
+    Находит файл входного модуля
+
+    Args:
+        root_module (str): Имя модуля (app.main) или путь к файлу (app/main.py)
+        module_to_file (dict): Маппинг модулей на файлы
+        file_to_module (dict): Маппинг файлов на модули
+
+    Returns:
+        str: Относительный путь к файлу или None, если модуль не найден
+    """
+    if root_module in file_to_module:
+        return root_module
+    if root_module in module_to_file:
+        return module_to_file[root_module]
+
+    # Допускаем короткое имя: "main" -> "app.main"
+    candidates = [
+        module_path
+        for module_path in module_to_file
+        if module_path.endswith(f".{root_module}")
+    ]
+    if candidates:
+        return module_to_file[min(candidates, key=len)]
+    return None
+
+
 def analyze_project(
     project_path,
     include_external=False,
@@ -254,8 +363,9 @@ def analyze_project(
         project_path (Path): Путь к проекту
         include_external (bool): Включать внешние зависимости
         excluded_dirs (list): Список директорий для исключения
-        root_module (str): Корневой модуль
-        max_depth (int): Максимальная глубина анализа
+        root_module (str): Входной модуль; если задан, анализируются только
+            файлы, достижимые из него по импортам
+        max_depth (int): Максимальная глубина обхода импортов (0 = без ограничений)
 
     Returns:
         dict: Словарь зависимостей
@@ -272,7 +382,7 @@ def analyze_project(
 
     # Получаем структуру проекта
     module_to_file, file_to_module = get_project_structure(
-        project_root, root_module, excluded_dirs
+        project_root, excluded_dirs=excluded_dirs
     )
 
     if not module_to_file:
@@ -281,26 +391,50 @@ def analyze_project(
 
     print(f"📦 Найдено {len(module_to_file)} модулей")
 
+    if root_module:
+        entry_file = find_entry_file(root_module, module_to_file, file_to_module)
+        if entry_file is None:
+            msg = f"Модуль {root_module} не найден в {project_root}"
+            raise FileNotFoundError(msg)
+        print(f"🚪 Входной модуль: {entry_file}")
+        # Обход импортов в ширину: разбираются только достижимые файлы
+        queue = deque([(entry_file, 0)])
+        visited = {entry_file}
+    else:
+        # Без входного модуля анализируем все файлы проекта
+        entry_file = None
+        queue = deque()
+        for py_file in project_root.rglob("*.py"):
+            # Пропускаем исключенные файлы
+            rel_path = py_file.relative_to(project_root).as_posix()
+            if any(excl in rel_path.split("/") for excl in excluded_dirs):
+                continue
+            queue.append((rel_path, 0))
+
     # Собираем все модули проекта
     modules_list = []
     processed_files = 0
 
-    for py_file in project_root.rglob("*.py"):
-        # Пропускаем исключенные файлы
-        rel_path = py_file.relative_to(project_root).as_posix()
-        if any(excl in rel_path.split("/") for excl in excluded_dirs):
-            continue
+    while queue:
+        rel_path, depth = queue.popleft()
 
         # Получаем зависимости для этого файла
         deps = analyze_file_dependencies(
-            py_file,
+            project_root / rel_path,
             module_to_file,
             file_to_module,
             include_external,
             max_depth,
+            project_root=project_root,
         )
         processed_files += 1
 
+        if entry_file and (not max_depth or depth < max_depth):
+            for dep in sorted(deps):
+                if dep in file_to_module and dep not in visited:
+                    visited.add(dep)
+                    queue.append((dep, depth + 1))
+
         # Преобразуем зависимости в нужный формат
         imports_list = []
         if deps:
@@ -325,21 +459,86 @@ def get_json_dict(  # noqa: D103
     root_module: str = "",
     project_path: str = ".",
     included_external: bool = False,
-    excluded_dirs: str = "tests,venv,.venv,__pycache__,migrations,alembic,scripts,.git",
+    excluded_dirs: str = DEFAULT_EXCLUDED_DIRS,
     max_depth: int = 0,
+    compact_cfg: bool = False,
+    share_cfg_shapes: bool = False,
+    analyses: list[str] | None = None,
+    analysis_options: dict[str, dict] | None = None,
+    function_cache: FunctionCache | None = None,
 ) -> dict:
+    check_analysis_names(analyses or [])
     excluded_dirs_list = [d.strip() for d in excluded_dirs.split(",") if d.strip()]
     dependencies = analyze_project(
         project_path=project_path,
         include_external=included_external,
         excluded_dirs=excluded_dirs_list,
-        root_module="",
+        root_module=root_module,
         max_depth=max_depth,
     )
-    return ProjectAnalyzer(
+    if not dependencies:
+        return {"modules": [], "endpoints": []}
+
+    analyzer = ProjectAnalyzer(
         dependencies,
         project_root_dir=project_path,
-    ).analyze_and_get_dict()
+        compact_cfg=compact_cfg,
+        function_cache=function_cache,
+    )
+    if function_cache is not None:
+        function_cache.reset_stats()
+    output = analyzer.analyze_and_get_dict()
+    if function_cache is not None:
+        print(
+            f"♻️ Функций без изменений: {function_cache.hits}, "
+            f"перестроено: {function_cache.misses}"
+        )
+    output["endpoints"] = build_route_index(
+        project_path,
+        [module_info["module"] for module_info in dependencies["modules"]],
+        trees=analyzer.get_source_trees(),
+    ).endpoints
+    if share_cfg_shapes:
+        output["cfg_shapes"] = intern_cfg_shapes(output)
+    if analyses:
+        output["analyses"] = run_analysis_layers(
+            output,
+            analyses,
+            analyzer,
+            analysis_options,
+        )
+    return output
+
+
+def get_endpoints_dict(
+    *,
+    project_path: str = ".",
+    excluded_dirs: str = DEFAULT_EXCLUDED_DIRS,
+) -> dict:
+    """
+    Быстрый скан: только эндпоинты, без вызовов и CFG
+
+    Разбирает декораторы маршрутов и разрешает префиксы
+    APIRouter(prefix=...) / include_router(..., prefix=...).
+
+    Args:
+        project_path (str): Путь к проекту
+        excluded_dirs (str): Директории для исключения через запятую
+
+    Returns:
+        dict: {"endpoints": [...]} в формате EndpointModel
+    """
+    excluded_dirs_list = [d.strip() for d in excluded_dirs.split(",") if d.strip()]
+    project_root = Path(project_path).resolve()
+    if not project_root.exists():
+        msg = f"Директория {project_root} не существует"
+        raise FileNotFoundError(msg)
+
+    _, file_to_module = get_project_structure(
+        project_root, excluded_dirs=excluded_dirs_list
+    )
+    route_index = build_route_index(str(project_root), sorted(file_to_module))
+    return {"endpoints": route_index.endpoints}
 
 
 def _main() -> None:
@@ -353,9 +552,41 @@ def _main() -> None:
             excluded_dirs=args.exclude,
             root_module=args.root_module,
             max_depth=args.max_depth,
+            compact_cfg=args.compact_cfg,
+            share_cfg_shapes=args.share_cfg_shapes,
+            analyses=[a.strip() for a in args.analyses.split(",") if a.strip()],
+            analysis_options=args.analysis_options,
         )
+        if args.profile:
+            json_value["profile"] = apply_profile(
+                json_value, load_stats_file(args.profile)
+            )
+            print(
+                f"⏱️ Профиль: сопоставлено функций "
+                f"{json_value['profile']['matched_functions']}"
+            )
+        if args.coverage:
+            json_value["coverage"] = apply_coverage(
+                json_value, load_coverage_file(args.coverage)
+            )
+            print(
+                f"🧪 Покрытие: функций с данными "
+                f"{json_value['coverage']['covered_functions']}"
+            )
+        if args.samples:
+            importer = CollapsedStackImporter(json_value)
+            with open(args.samples, encoding="utf-8", errors="replace") as f:  # noqa: PTH123
+                importer.add_lines(f)
+            json_value["samples"] = importer.to_dict()
+            print(
+                f"🔥 Сэмплы: {json_value['samples']['resolved_samples']} из "
+                f"{json_value['samples']['total_samples']} попали в функции проекта"
+            )
         with open("test.json", "w", encoding="utf-8") as f:  # noqa: PTH123
             json.dump(json_value, f, indent=4, ensure_ascii=False)
+        if args.cfg_export:
+            Path(args.cfg_export).write_bytes(encode_cfgs(json_value))
+            print(f"💾 CFG сохранены в {args.cfg_export}")
     except Exception as e:  # noqa: BLE001
         print(f"❌ Критическая ошибка: {e}")
         if args.verbose:
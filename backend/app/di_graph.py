@@ -0,0 +1,352 @@
+import ast  # noqa: D100
+from typing import Any
+
+from .call_graph import CallGraph, function_symbol
+from .cfg_dataflow import FunctionNode, iter_function_defs
+
+# FastAPI markers whose first argument is a dependency callable
+DEPENDS_MARKERS = ("Depends", "Security")
+# how many import re-exports are followed to find a definition
+MAX_IMPORT_HOPS = 10
+
+SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+# one dependency use: what to call, the module its names resolve in, and
+# whether FastAPI may reuse an earlier result within the same request
+Use = tuple[ast.AST, str, bool]
+
+
+def _simple_name(node: ast.AST) -> str | None:
+    # `Depends` and `fastapi.Depends` alike
+    return node.id if isinstance(node, ast.Name) else getattr(node, "attr", None)
+
+
+def _marker_name(node: ast.AST) -> str | None:
+    if not isinstance(node, ast.Call):
+        return None
+    name = _simple_name(node.func)
+    return name if name in DEPENDS_MARKERS else None
+
+
+def _is_generator(function: FunctionNode) -> bool:
+    stack = list(function.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if not isinstance(node, SCOPES):
+            stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _module_definitions(tree: ast.Module) -> dict[str, ast.AST]:
+    # module-level functions, classes and assigned values by name
+    definitions = {}
+    for statement in tree.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions[statement.name] = statement
+        elif isinstance(statement, ast.Assign):
+            for target in statement.targets:
+                if isinstance(target, ast.Name):
+                    definitions[target.id] = statement.value
+        elif (
+            isinstance(statement, ast.AnnAssign)
+            and isinstance(statement.target, ast.Name)
+            and statement.value is not None
+        ):
+            definitions[statement.target.id] = statement.value
+        elif isinstance(statement, getattr(ast, "TypeAlias", ())):
+            definitions[statement.name.id] = statement.value
+    return definitions
+
+
+def _method(cls: ast.ClassDef, name: str) -> FunctionNode | None:
+    for statement in cls.body:
+        if (
+            isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and statement.name == name
+        ):
+            return statement
+    return None
+
+
+class DependencyResolver:
+    """Resolves ``Depends(...)`` targets and ``Annotated`` aliases across modules."""
+
+    def __init__(  # noqa: D107
+        self,
+        trees: dict[str, ast.Module],
+        import_sources: dict[str, dict[str, tuple[str, str | None]]],
+    ) -> "DependencyResolver":
+        self.import_sources = import_sources
+        self.definitions = {
+            module: _module_definitions(tree) for module, tree in trees.items()
+        }
+
+    def resolve(self, module: str, expr: ast.AST) -> tuple[str, str, ast.AST] | None:
+        """``(module, name, definition)`` a name or ``module.attr`` refers to."""  # noqa: DOC201
+        if isinstance(expr, ast.Attribute) and isinstance(expr.value, ast.Name):
+            source = self.import_sources.get(module, {}).get(expr.value.id)
+            if source is not None and source[1] is None:
+                return self._lookup(source[0], expr.attr)
+            # a method bound to a module-level instance: ``repository.get_session``
+            instance = self.resolve(module, expr.value)
+            if instance is None or not isinstance(instance[2], ast.Call):
+                return None
+            cls = self.resolve(instance[0], instance[2].func)
+            if cls is None or not isinstance(cls[2], ast.ClassDef):
+                return None
+            method = _method(cls[2], expr.attr)
+            if method is None:
+                return None
+            return cls[0], f"{cls[1]}.{expr.attr}", method
+        if isinstance(expr, ast.Name):
+            return self._lookup(module, expr.id)
+        return None
+
+    def expand_alias(self, module: str, annotation: ast.AST | None) -> ast.AST | None:
+        """An annotation with a module-level alias (``CurrentUser``) expanded.
+
+        Imports and re-exports are followed, so the result is the
+        ``Annotated[...]`` (or other type expression) the alias stands for;
+        anything else is returned unchanged.
+        """  # noqa: DOC201
+        for _ in range(MAX_IMPORT_HOPS):
+            if not isinstance(annotation, (ast.Name, ast.Attribute)):
+                return annotation
+            resolved = self.resolve(module, annotation)
+            if resolved is None or not isinstance(
+                resolved[2],
+                (ast.Subscript, ast.BinOp),
+            ):
+                return annotation
+            module, _, annotation = resolved
+        return annotation
+
+    def _lookup(self, module: str, name: str) -> tuple[str, str, ast.AST] | None:
+        for _ in range(MAX_IMPORT_HOPS):
+            definition = self.definitions.get(module, {}).get(name)
+            if definition is not None:
+                return module, name, definition
+            source = self.import_sources.get(module, {}).get(name)
+            if source is None or source[1] is None:
+                return None
+            module, name = source
+        return None
+
+    def _annotated_uses(self, module: str, annotation: ast.AST) -> list[Use]:
+        # Depends markers of ``Annotated[T, Depends(f)]`` or of an alias to it
+        for _ in range(MAX_IMPORT_HOPS):
+            if isinstance(annotation, ast.Subscript):
+                if _simple_name(annotation.value) != "Annotated" or not isinstance(
+                    annotation.slice,
+                    ast.Tuple,
+                ):
+                    return []
+                declared, *metadata = annotation.slice.elts
+                return [
+                    self._marker_use(module, marker, declared)
+                    for marker in metadata
+                    if _marker_name(marker)
+                ]
+            resolved = self.resolve(module, annotation)
+            if resolved is None or not isinstance(resolved[2], ast.Subscript):
+                return []
+            module, _, annotation = resolved
+        return []
+
+    @staticmethod
+    def _marker_use(module: str, marker: ast.Call, declared: ast.AST | None) -> Use:
+        target = marker.args[0] if marker.args else None
+        use_cache = True
+        for keyword in marker.keywords:
+            if keyword.arg == "dependency":
+                target = keyword.value
+            elif keyword.arg == "use_cache" and isinstance(keyword.value, ast.Constant):
+                use_cache = bool(keyword.value.value)
+        # ``Depends()`` calls the declared type itself
+        return (declared if target is None else target), module, use_cache
+
+    def parameter_uses(
+        self,
+        module: str,
+        function: FunctionNode,
+        skip_self: bool = False,
+    ) -> list[Use]:
+        """Dependencies declared by the parameters of a function, in order."""  # noqa: DOC201
+        arguments = function.args
+        positional = [*arguments.posonlyargs, *arguments.args]
+        defaults = [None] * (len(positional) - len(arguments.defaults)) + list(
+            arguments.defaults,
+        )
+        parameters = [
+            *zip(positional, defaults, strict=True),
+            *zip(arguments.kwonlyargs, arguments.kw_defaults, strict=True),
+        ]
+        if skip_self:
+            parameters = parameters[1:]
+
+        uses = []
+        for arg, default in parameters:
+            if _marker_name(default):
+                uses.append(self._marker_use(module, default, arg.annotation))
+            elif arg.annotation is not None:
+                uses.extend(self._annotated_uses(module, arg.annotation))
+        return uses
+
+    def marker_list_uses(self, module: str, value: ast.AST | None) -> list[Use]:
+        """Dependencies of a ``dependencies=[Depends(...), ...]`` argument."""  # noqa: DOC201
+        if not isinstance(value, (ast.List, ast.Tuple)):
+            return []
+        return [
+            self._marker_use(module, marker, None)
+            for marker in value.elts
+            if _marker_name(marker)
+        ]
+
+
+class _DependencyWalker:
+    # depth-first over one endpoint; FastAPI caches a dependency's result for
+    # the rest of the request unless it was declared with use_cache=False
+
+    def __init__(self, resolver: DependencyResolver) -> "_DependencyWalker":
+        self.resolver = resolver
+        self.nodes: dict[str, dict[str, Any]] = {}
+        self.edges: set[tuple[str, str]] = set()
+        self.executions = 0
+        self._visiting: set[str] = set()
+
+    def walk(self, parent: str, uses: list[Use]) -> None:
+        for target, module, use_cache in uses:
+            symbol, info, sub_uses = self._describe(module, target)
+            self.edges.add((parent, symbol))
+            if symbol in self.nodes and use_cache:
+                continue
+            self.executions += 1
+            if symbol in self.nodes or symbol in self._visiting:
+                continue
+            self._visiting.add(symbol)
+            self.walk(symbol, sub_uses)
+            self._visiting.discard(symbol)
+            # post-order: a dependency runs after its own dependencies
+            self.nodes[symbol] = {"symbol": symbol, **info}
+
+    def _describe(
+        self,
+        module: str,
+        target: ast.AST | None,
+    ) -> tuple[str, dict[str, Any], list[Use]]:
+        resolved = self.resolver.resolve(module, target)
+        if resolved is None:
+            text = ast.unparse(target) if target is not None else "?"
+            return text, {"kind": "unresolved"}, []
+        module, name, definition = resolved
+        symbol = function_symbol(module, name)
+
+        if isinstance(definition, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            info = {
+                "kind": "generator" if _is_generator(definition) else "function",
+                "async": isinstance(definition, ast.AsyncFunctionDef),
+                "lineno": definition.lineno,
+            }
+            # a method of a module-level instance is called already bound
+            bound = "." in name
+            uses = self.resolver.parameter_uses(module, definition, skip_self=bound)
+            return symbol, info, uses
+
+        if isinstance(definition, ast.ClassDef):
+            info = {"kind": "class", "lineno": definition.lineno}
+            return symbol, info, self._method_uses(module, definition, "__init__")
+
+        if isinstance(definition, ast.Call):
+            # a callable instance: FastAPI calls its __call__
+            info = {"kind": "instance", "lineno": definition.lineno}
+            constructor = self.resolver.resolve(module, definition.func)
+            if constructor is None or not isinstance(constructor[2], ast.ClassDef):
+                info["class"] = ast.unparse(definition.func)
+                return symbol, info, []
+            info["class"] = function_symbol(constructor[0], constructor[1])
+            uses = self._method_uses(constructor[0], constructor[2], "__call__")
+            return symbol, info, uses
+
+        return symbol, {"kind": "unresolved"}, []
+
+    def _method_uses(self, module: str, cls: ast.ClassDef, name: str) -> list[Use]:
+        method = _method(cls, name)
+        if method is None:
+            return []
+        return self.resolver.parameter_uses(module, method, skip_self=True)
+
+
+def _route_uses(
+    resolver: DependencyResolver,
+    module: str,
+    function: FunctionNode,
+) -> list[Use]:
+    # dependencies=[...] of the route decorator and of the APIRouter it uses
+    uses = []
+    definitions = resolver.definitions.get(module, {})
+    for decorator in function.decorator_list:
+        if not isinstance(decorator, ast.Call):
+            continue
+        if not isinstance(decorator.func, ast.Attribute):
+            continue
+        router = decorator.func.value
+        if isinstance(router, ast.Name):
+            constructor = definitions.get(router.id)
+            if isinstance(constructor, ast.Call):
+                for keyword in constructor.keywords:
+                    if keyword.arg == "dependencies":
+                        uses.extend(resolver.marker_list_uses(module, keyword.value))
+        for keyword in decorator.keywords:
+            if keyword.arg == "dependencies":
+                uses.extend(resolver.marker_list_uses(module, keyword.value))
+    return uses
+
+
+def endpoint_dependencies(
+    resolver: DependencyResolver,
+    module: str,
+    symbol: str,
+    function: FunctionNode,
+) -> dict[str, Any]:
+    """Deduplicated dependencies one request to an endpoint runs, in execution order."""  # noqa: DOC201
+    walker = _DependencyWalker(resolver)
+    walker.walk(symbol, _route_uses(resolver, module, function))
+    walker.walk(symbol, resolver.parameter_uses(module, function))
+    return {
+        "dependencies": list(walker.nodes.values()),
+        "edges": sorted(walker.edges),
+        "executions": walker.executions,
+    }
+
+
+def di_graph_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """``Depends`` graph of every handler, handlers with the most dependencies first."""  # noqa: DOC201
+    trees = analyzer.get_source_trees()
+    resolver = DependencyResolver(trees, analyzer.get_import_sources())
+    call_graph = CallGraph(dependencies)
+
+    report = []
+    for module, tree in trees.items():
+        for symbol, function in iter_function_defs(module, tree):
+            function_id = call_graph.index.get(symbol)
+            if function_id is None:
+                continue
+            node = call_graph.nodes[function_id]
+            if node.get("type") != "handler":
+                continue
+            report.append(
+                {
+                    "symbol": symbol,
+                    "http_method": node.get("http_method"),
+                    "path": node.get("path"),
+                    **endpoint_dependencies(resolver, module, symbol, function),
+                },
+            )
+    report.sort(key=lambda item: (-len(item["dependencies"]), item["symbol"]))
+    return report
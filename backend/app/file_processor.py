@@ -1,6 +1,10 @@
 import ast  # noqa: D100
 import json
+import app.cfg_blocks as cfg_blocks
 import app.cfg_visitor as cfg_visitor
+from app.db_calls import call_name
+from app.function_cache import FunctionCache, module_context_hash, source_span_hash
+from app.orm_models import relationship_info
 from typing import Any, Literal
 
 # TODO: process import using *
@@ -13,35 +17,56 @@ class ProjectAnalyzer:
         self,
         input_data: dict[Literal["module", "imports"], str],
         project_root_dir: str,
+        compact_cfg: bool = False,
+        function_cache: FunctionCache | None = None,
     ):
         self.input_data = input_data
         self.project_root_dir = project_root_dir
+        self.compact_cfg = compact_cfg
+        self.function_cache = function_cache
         self.project_index = {}
         self.modules_data = {}
         self.module_mapping = self._build_module_mapping()
 
     def _build_module_mapping(self) -> dict[str, str]:
+        # dotted module names -> keys of self.modules_data (file paths)
         mapping = {}
+        fallback = {}
         for module_info in self.input_data["modules"]:
             file_path = module_info["module"]
+            module_key = self.project_root_dir + "/" + file_path
 
-            module_name = file_path[:-3].replace(
-                "/",
-                ".",
-            )  # Remove file extension and format as modules
-
-            mapping[module_name] = module_name
+            module_name = self._dotted_module_name(file_path)
+            mapping[module_name] = module_key
+            if file_path.endswith("__init__.py"):
+                # a package is imported by its own name, not as `pkg.__init__`
+                module_name = module_name.rsplit(".", maxsplit=1)[0]
+                mapping[module_name] = module_key
 
             parts = module_name.split(".")
             if parts:
                 short_name = parts[-1]
-                mapping[short_name] = module_name
+                fallback.setdefault(short_name, module_key)
 
             for i in range(1, len(parts)):
                 prefix = ".".join(parts[:i])
-                mapping[prefix] = module_name
+                fallback.setdefault(prefix, module_key)
+
+        # exact module names win over short names and prefixes
+        fallback.update(mapping)
+        return fallback
 
-        return mapping
+    @staticmethod
+    def _dotted_module_name(file_path: str) -> str:
+        # Remove file extension and format as modules
+        return file_path[:-3].replace("/", ".")
+
+    @classmethod
+    def _package_name(cls, file_path: str) -> str:
+        module_name = cls._dotted_module_name(file_path)
+        if file_path.endswith("__init__.py"):
+            return module_name.rsplit(".", maxsplit=1)[0]
+        return module_name.rsplit(".", maxsplit=1)[0] if "." in module_name else ""
 
     def _first_pass(self) -> None:
         analyzing_dir = self.project_root_dir
@@ -55,14 +80,20 @@ class ProjectAnalyzer:
             tree = ast.parse(source_code)
             module_name = file_path
 
-            collector = DeclarationCollector(module_name, self.module_mapping)
+            collector = DeclarationCollector(
+                module_name,
+                self.module_mapping,
+                package=self._package_name(module_info["module"]),
+            )
             collector.visit(tree)
 
             self.modules_data[module_name] = {
                 "declarations": collector.get_declarations(),
                 "imports": collector.get_imports(),
+                "import_targets": collector.get_import_targets(),
                 "exports": collector.get_exports(),
                 "source_tree": tree,
+                "source_lines": source_code.splitlines(),
                 "filename": file_path,
                 "original_path": file_path,
             }
@@ -87,6 +118,44 @@ class ProjectAnalyzer:
             output["modules"].append(output_module)
         return output
 
+    def get_source_trees(self) -> dict[str, ast.Module]:
+        # parsed modules keyed by their path relative to the project root
+        prefix = self.project_root_dir + "/"
+        return {
+            module_name.removeprefix(prefix): module_data["source_tree"]
+            for module_name, module_data in self.modules_data.items()
+        }
+
+    def get_source_sizes(self) -> dict[str, int]:
+        # source size in bytes, keyed like get_source_trees
+        prefix = self.project_root_dir + "/"
+        return {
+            module_name.removeprefix(prefix): sum(
+                len(line.encode()) + 1 for line in module_data["source_lines"]
+            )
+            for module_name, module_data in self.modules_data.items()
+        }
+
+    def get_import_sources(self) -> dict[str, dict[str, tuple[str, str | None]]]:
+        # per module: imported name -> (scanned module it comes from, name
+        # there, or None when the import binds that module itself)
+        prefix = self.project_root_dir + "/"
+        sources = {}
+        for module_name, module_data in self.modules_data.items():
+            imported = {}
+            for name, source in module_data["imports"].items():
+                if source not in self.modules_data:
+                    continue
+                target = module_data["import_targets"].get(name, name)
+                original = (
+                    None
+                    if self.module_mapping.get(target) == source
+                    else target.rsplit(".", maxsplit=1)[-1]
+                )
+                imported[name] = (source.removeprefix(prefix), original)
+            sources[module_name.removeprefix(prefix)] = imported
+        return sources
+
     def _update_project_index(
         self,
         module_name: str,
@@ -118,6 +187,8 @@ class ProjectAnalyzer:
                 module_data=module_data,
                 project_index=self.project_index,
                 modules_data=self.modules_data,
+                compact_cfg=self.compact_cfg,
+                function_cache=self.function_cache,
             )
             analyzer.visit(module_data["source_tree"])
 
@@ -140,17 +211,22 @@ class DeclarationCollector(ast.NodeVisitor):
         self,
         module_name: str,
         module_mapping: dict[str, str],
+        package: str = "",
     ) -> "DeclarationCollector":
         self.module_name = module_name
         self.module_mapping = module_mapping
+        self.package = package
         self.declarations = {}
         self.imports = {}
+        # local name -> dotted name of what it is bound to ("np" -> "numpy")
+        self.import_targets = {}
         self.exports = set()
         self.found_sql_models = set()
 
     def visit_ClassDef(self, node: ast.ClassDef) -> None:
         class_type = "class"
         model_fields = []
+        relationships = []
         table_name = "None"
 
         for item in node.body:
@@ -164,15 +240,29 @@ class DeclarationCollector(ast.NodeVisitor):
                 self.found_sql_models.add(node.name)
                 table_name = item.value.value
                 break
+        else:
+            # SQLModel ``class X(SQLModel, table=True)`` is mapped to the
+            # lowercased class name unless ``__tablename__`` says otherwise
+            if any(
+                keyword.arg == "table"
+                and isinstance(keyword.value, ast.Constant)
+                and keyword.value.value is True
+                for keyword in node.keywords
+            ):
+                class_type = "sql_class"
+                self.found_sql_models.add(node.name)
+                table_name = node.name.lower()
 
         if class_type == "sql_class":
             model_fields = self._extract_model_fields(node)
+            relationships = self._extract_relationships(node)
 
         self.declarations[node.name] = {
             "type": class_type,
             "lineno": node.lineno,
             "table_name": table_name,
             "model_fields": model_fields,
+            "relationships": relationships,
         }
         self.generic_visit(node)
 
@@ -194,6 +284,28 @@ class DeclarationCollector(ast.NodeVisitor):
 
         return fields
 
+    def _extract_relationships(self, node: ast.ClassDef) -> list[dict[str, Any]]:  # noqa: PLR6301
+        relationships = []
+
+        for item in node.body:
+            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+                name, annotation = item.target.id, item.annotation
+            elif (
+                isinstance(item, ast.Assign)
+                and len(item.targets) == 1
+                and isinstance(item.targets[0], ast.Name)
+            ):
+                name, annotation = item.targets[0].id, None
+            else:
+                continue
+            if not isinstance(item.value, ast.Call):
+                continue
+            info = relationship_info(item.value, annotation)
+            if info:
+                relationships.append({"name": name, "lineno": item.lineno, **info})
+
+        return relationships
+
     def _parse_assign_field(self, node: ast.Assign) -> dict[str, Any]:
         if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
             return None
@@ -364,19 +476,46 @@ class DeclarationCollector(ast.NodeVisitor):
             self.imports[alias.name] = full_module_path
             if alias.asname:
                 self.imports[alias.asname] = full_module_path
+                self.import_targets[alias.asname] = alias.name
+            else:
+                # `import os.path` binds `os`
+                top_level = alias.name.split(".", maxsplit=1)[0]
+                self.import_targets[top_level] = top_level
 
     def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
-        source_module = node.module or ""
+        source_module = self._absolute_module_name(node)
         # form full path
         full_source_path = self._resolve_full_module_path(source_module)
 
         for alias in node.names:
             if alias.name == "*":
                 self.imports["*"] = full_source_path
+                continue
+
+            imported_name = alias.asname or alias.name
+            self.import_targets[imported_name] = (
+                f"{source_module}.{alias.name}" if source_module else alias.name
+            )
+            # `from package import submodule`
+            submodule = (
+                f"{source_module}.{alias.name}" if source_module else alias.name
+            )
+            if submodule in self.module_mapping:
+                self.imports[imported_name] = self.module_mapping[submodule]
             else:
-                imported_name = alias.asname or alias.name
                 self.imports[imported_name] = full_source_path
 
+    def _absolute_module_name(self, node: ast.ImportFrom) -> str:
+        if not node.level:
+            return node.module or ""
+
+        package_parts = self.package.split(".") if self.package else []
+        if node.level > 1:
+            package_parts = package_parts[: -(node.level - 1)]
+        if node.module:
+            package_parts.append(node.module)
+        return ".".join(package_parts)
+
     def _resolve_full_module_path(self, module_name: str) -> str:
         if not module_name:
             return ""
@@ -416,6 +555,9 @@ class DeclarationCollector(ast.NodeVisitor):
     def get_imports(self) -> dict[str, str]:
         return self.imports
 
+    def get_import_targets(self) -> dict[str, str]:
+        return self.import_targets
+
     def get_exports(self) -> set[str]:
         return self.exports
 
@@ -427,15 +569,33 @@ class CallAnalyzer(ast.NodeVisitor):
         module_data: dict[str, Any],
         project_index: dict[str, Any],
         modules_data: dict[str, Any],
+        compact_cfg: bool = False,
+        function_cache: FunctionCache | None = None,
     ):
         self.module_name = module_name
         self.module_data = module_data
         self.project_index = project_index
         self.modules_data = modules_data
+        self.compact_cfg = compact_cfg
+        self.function_cache = function_cache
 
         self.tree = {"children": []}
         self._current_path = [self.tree]
         self._available_names = self._build_available_names()
+        # function nodes whose calls came from the cache
+        self._cached_nodes: set[int] = set()
+        # ids of Call nodes directly under an `await`
+        self._awaited: set[int] = set()
+        self._context_hash = (
+            module_context_hash(
+                self._available_names,
+                modules_data,
+                compact_cfg,
+                module_data["import_targets"],
+            )
+            if function_cache is not None
+            else ""
+        )
 
     def _build_available_names(self) -> dict[str, str]:
         # map of available names
@@ -495,6 +655,8 @@ class CallAnalyzer(ast.NodeVisitor):
                 class_node["table_name"] = class_info["table_name"]
             if "model_fields" in class_info:
                 class_node["model_fields"] = class_info["model_fields"]
+            if class_info.get("relationships"):
+                class_node["relationships"] = class_info["relationships"]
 
         if node.decorator_list:
             class_node["decorators"] = [
@@ -515,11 +677,15 @@ class CallAnalyzer(ast.NodeVisitor):
             "children": [],
             "args": self._parse_arguments(node.args),
             "calls": [],
+            "external_calls": [],
         }
 
-        file_path = self.module_data.get("filename")
-        cfg_json = cfg_visitor.generate_cfg_from_file(file_path, node.name)
-        function_node["cfg"] = json.loads(cfg_json)
+        cache_key, digest, cached = self._lookup_function(node)
+        if cached is None:
+            function_node["cfg"] = self._build_cfg(node)
+        else:
+            function_node.update(cached)
+            self._cached_nodes.add(id(function_node))
 
 
         if func_info.get("type") == "handler":
@@ -530,11 +696,22 @@ class CallAnalyzer(ast.NodeVisitor):
             function_node["decorators"] = [
                 self._get_decorator_name(decorator) for decorator in node.decorator_list
             ]
+            # code objects (and profilers) start at the first decorator
+            function_node["firstlineno"] = node.decorator_list[0].lineno
 
         self._add_child(function_node)
         self._current_path.append(function_node)
         self.generic_visit(node)
         self._current_path.pop()
+        if cached is None and digest is not None:
+            self.function_cache.store(
+                cache_key,
+                digest,
+                node.lineno,
+                function_node["cfg"],
+                function_node["calls"],
+                function_node["external_calls"],
+            )
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:  # noqa: D102
         func_info = self.module_data["declarations"].get(node.name, {})
@@ -547,11 +724,15 @@ class CallAnalyzer(ast.NodeVisitor):
             "children": [],
             "args": self._parse_arguments(node.args),
             "calls": [],
+            "external_calls": [],
         }
 
-        file_path = self.module_data.get("filename")
-        cfg_json = cfg_visitor.generate_cfg_from_file(file_path, node.name)
-        function_node["cfg"] = json.loads(cfg_json)
+        cache_key, digest, cached = self._lookup_function(node)
+        if cached is None:
+            function_node["cfg"] = self._build_cfg(node)
+        else:
+            function_node.update(cached)
+            self._cached_nodes.add(id(function_node))
 
         # Добавляем информацию о handler'е если это handler  # noqa: RUF003
         if func_info.get("type") == "handler":
@@ -562,22 +743,93 @@ class CallAnalyzer(ast.NodeVisitor):
             function_node["decorators"] = [
                 self._get_decorator_name(decorator) for decorator in node.decorator_list
             ]
+            # code objects (and profilers) start at the first decorator
+            function_node["firstlineno"] = node.decorator_list[0].lineno
 
         self._add_child(function_node)
         self._current_path.append(function_node)
         self.generic_visit(node)
         self._current_path.pop()
+        if cached is None and digest is not None:
+            self.function_cache.store(
+                cache_key,
+                digest,
+                node.lineno,
+                function_node["cfg"],
+                function_node["calls"],
+                function_node["external_calls"],
+            )
+
+    def _lookup_function(
+        self,
+        node: ast.FunctionDef | ast.AsyncFunctionDef,
+    ) -> tuple[tuple[str, str] | None, str | None, dict[str, Any] | None]:
+        # (cache key, source span hash, cached cfg and calls or None)
+        if self.function_cache is None:
+            return None, None, None
+        qualname = ".".join(
+            [item["name"] for item in self._current_path[1:]] + [node.name]
+        )
+        cache_key = (self.module_name, qualname)
+        digest = source_span_hash(
+            self.module_data["source_lines"],
+            node,
+            self._context_hash,
+        )
+        return cache_key, digest, self.function_cache.lookup(
+            cache_key,
+            digest,
+            node.lineno,
+        )
+
+    def _build_cfg(
+        self,
+        node: ast.FunctionDef | ast.AsyncFunctionDef,
+    ) -> dict[str, Any]:
+        cfg = cfg_visitor.generate_cfg_from_node(node)
+        if self.compact_cfg:
+            cfg = cfg_blocks.compact_cfg(cfg)
+        return cfg
 
     def visit_Call(self, node: ast.Call) -> None:
+        if id(self._get_current_node()) in self._cached_nodes:
+            # call list reused from the cache, only nested definitions matter
+            self.generic_visit(node)
+            return
+
         call_info = self._analyze_call(node)
         try:
             if call_info:
                 self._add_call(call_info)
+            else:
+                self._add_external_call(node)
         except Exception as _e:  # noqa: BLE001, S110
             pass
 
         self.generic_visit(node)
 
+    def visit_Await(self, node: ast.Await) -> None:  # noqa: D102
+        if isinstance(node.value, ast.Call):
+            self._awaited.add(id(node.value))
+        self.generic_visit(node)
+
+    def _add_external_call(self, node: ast.Call) -> None:
+        # everything not resolved into the project: libraries, builtins and
+        # methods of local objects, named through the module's imports
+        current_node = self._get_current_node()
+        name = call_name(node)
+        if name is None or "external_calls" not in current_node:
+            return
+        base, dot, rest = name.partition(".")
+        target = self.module_data["import_targets"].get(base)
+        external_call = {
+            "name": f"{target}{dot}{rest}" if target else name,
+            "lineno": node.lineno,
+        }
+        if id(node) in self._awaited:
+            external_call["awaited"] = True
+        current_node["external_calls"].append(external_call)
+
     def _analyze_call(self, node: ast.Call) -> dict[str, Any]:
         if isinstance(node.func, ast.Name):
             function_name = node.func.id
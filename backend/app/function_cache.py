@@ -0,0 +1,122 @@
+import ast  # noqa: D100
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+
+def source_span_hash(
+    lines: list[str],
+    node: ast.FunctionDef | ast.AsyncFunctionDef,
+    context: str = "",
+) -> str:
+    """Hash the source text of a function, decorators included.
+
+    Only the text inside the line/col span counts, so code moving up or down
+    in the file keeps the hash; ``context`` adds whatever else the cached
+    result depends on.
+    """  # noqa: DOC201
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+    start_col = min([node.col_offset] + [d.col_offset for d in node.decorator_list])
+    span = lines[start - 1 : node.end_lineno]
+    span[-1] = span[-1][: node.end_col_offset]
+    span[0] = span[0][start_col:]
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(context.encode())
+    for line in span:
+        digest.update(line.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def module_context_hash(
+    available_names: dict[str, str],
+    modules_data: dict[str, Any],
+    compact_cfg: bool,
+    import_targets: dict[str, str] | None = None,
+) -> str:
+    """Hash of everything outside a function that its CFG and call list depend on."""  # noqa: DOC201
+    resolution = sorted(
+        (name, source, source in modules_data)
+        for name, source in available_names.items()
+    )
+    targets = sorted((import_targets or {}).items())
+    encoded = json.dumps([compact_cfg, resolution, targets]).encode()
+    return hashlib.sha1(encoded, usedforsecurity=False).hexdigest()
+
+
+def _shift_cfg(cfg: dict[str, Any], delta: int) -> dict[str, Any]:
+    if "nodes" not in cfg:
+        return cfg
+    nodes = []
+    for node in cfg["nodes"]:
+        shifted = {**node}
+        for field in ("lineno", "end_lineno"):
+            if shifted.get(field) is not None:
+                shifted[field] += delta
+        nodes.append(shifted)
+    return {**cfg, "nodes": nodes}
+
+
+def _shift_calls(calls: list[dict[str, Any]], delta: int) -> list[dict[str, Any]]:
+    return [{**call, "lineno": call["lineno"] + delta} for call in calls]
+
+
+class FunctionCache:
+    """CFGs and call lists of functions, reused across scans while their text is unchanged.
+
+    An LRU of at most ``max_entries`` functions, so functions of projects
+    that are no longer scanned are eventually dropped.
+    """
+
+    def __init__(self, max_entries: int = 50_000) -> "FunctionCache":  # noqa: D107
+        self.max_entries = max_entries
+        # (module file, qualname) -> hash, lineno, cfg and call lists of the last build
+        self._entries: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        key: tuple[str, str],
+        digest: str,
+        lineno: int,
+    ) -> dict[str, Any] | None:
+        """Return ``{"cfg", "calls", "external_calls"}`` moved to ``lineno``, or None if the text changed."""  # noqa: DOC201
+        entry = self._entries.get(key)
+        if entry is None or entry["hash"] != digest:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        delta = lineno - entry["lineno"]
+        return {
+            "cfg": _shift_cfg(entry["cfg"], delta),
+            "calls": _shift_calls(entry["calls"], delta),
+            "external_calls": _shift_calls(entry["external_calls"], delta),
+        }
+
+    def store(  # noqa: D102
+        self,
+        key: tuple[str, str],
+        digest: str,
+        lineno: int,
+        cfg: dict[str, Any],
+        calls: list[dict[str, Any]],
+        external_calls: list[dict[str, Any]],
+    ) -> None:
+        self._entries[key] = {
+            "hash": digest,
+            "lineno": lineno,
+            "cfg": cfg,
+            "calls": list(calls),
+            "external_calls": list(external_calls),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def reset_stats(self) -> None:  # noqa: D102
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,182 @@
+from typing import Any  # noqa: D100
+
+X_SPACING = 220
+Y_SPACING = 120
+SWEEPS = 4
+
+
+def strongly_connected_components(successors: list[list[int]]) -> list[int]:
+    """Iterative Tarjan; returns the component id of every node.
+
+    Component ids come out in reverse topological order of the condensed DAG.
+    """  # noqa: DOC201
+    count = len(successors)
+    index = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    component = [-1] * count
+    stack: list[int] = []
+    next_index = 0
+    next_component = 0
+
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work[-1]
+            if edge == 0:
+                index[node] = lowlink[node] = next_index
+                next_index += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            targets = successors[node]
+            while edge < len(targets) and index[targets[edge]] != -1:
+                target = targets[edge]
+                if on_stack[target]:
+                    lowlink[node] = min(lowlink[node], index[target])
+                edge += 1
+
+            if edge < len(targets):
+                work[-1] = (node, edge + 1)
+                work.append((targets[edge], 0))
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = next_component
+                    if member == node:
+                        break
+                next_component += 1
+
+    return component
+
+
+def condense(
+    successors: list[list[int]],
+    component: list[int],
+) -> tuple[list[set[int]], list[set[int]]]:
+    """Component DAG of a graph, as successor and predecessor sets."""  # noqa: DOC201
+    size = max(component, default=-1) + 1
+    dag_successors: list[set[int]] = [set() for _ in range(size)]
+    dag_predecessors: list[set[int]] = [set() for _ in range(size)]
+    for source, targets in enumerate(successors):
+        for target in targets:
+            a, b = component[source], component[target]
+            if a != b:
+                dag_successors[a].add(b)
+                dag_predecessors[b].add(a)
+    return dag_successors, dag_predecessors
+
+
+def _assign_layers(dag_predecessors: list[set[int]]) -> list[int]:
+    # Tarjan numbers components in reverse topological order, so walking the
+    # ids downwards visits every predecessor before its successors
+    layer = [0] * len(dag_predecessors)
+    for comp in range(len(dag_predecessors) - 1, -1, -1):
+        for pred in dag_predecessors[comp]:
+            layer[comp] = max(layer[comp], layer[pred] + 1)
+    return layer
+
+
+def _barycenter(
+    comp: int,
+    neighbours: list[set[int]],
+    position: dict[int, float],
+) -> float:
+    linked = neighbours[comp]
+    if not linked:
+        return position[comp]
+    return sum(position[other] for other in linked) / len(linked)
+
+
+def _order_layers(
+    layers: list[list[int]],
+    dag_successors: list[set[int]],
+    dag_predecessors: list[set[int]],
+) -> None:
+    """Barycenter crossing reduction, alternating downward and upward sweeps.
+
+    Long edges are not split into dummy nodes; a neighbour in any earlier
+    (or later) layer contributes its relative position directly.
+    """
+    position: dict[int, float] = {}
+
+    def _reindex(layer_nodes: list[int]) -> None:
+        width = max(len(layer_nodes), 1)
+        for i, comp in enumerate(layer_nodes):
+            position[comp] = i / width
+
+    for layer_nodes in layers:
+        _reindex(layer_nodes)
+
+    for sweep in range(SWEEPS):
+        downward = sweep % 2 == 0
+        neighbours = dag_predecessors if downward else dag_successors
+        order = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        for i in order:
+            layers[i].sort(key=lambda comp: _barycenter(comp, neighbours, position))  # noqa: B023
+            _reindex(layers[i])
+
+
+def layered_layout(successors: list[list[int]]) -> dict[str, list[int]]:
+    """Sugiyama-style layout over the SCC-condensed DAG.
+
+    Members of one strongly connected component share a layer and sit next
+    to each other. Returns parallel integer arrays indexed by node id.
+    """  # noqa: DOC201
+    count = len(successors)
+    if not count:
+        return {"x": [], "y": [], "layer": [], "component": []}
+
+    component = strongly_connected_components(successors)
+    dag_successors, dag_predecessors = condense(successors, component)
+    comp_layer = _assign_layers(dag_predecessors)
+
+    layers: list[list[int]] = [[] for _ in range(max(comp_layer) + 1)]
+    for comp, layer in enumerate(comp_layer):
+        layers[layer].append(comp)
+    _order_layers(layers, dag_successors, dag_predecessors)
+
+    members: list[list[int]] = [[] for _ in dag_successors]
+    for node, comp in enumerate(component):
+        members[comp].append(node)
+
+    x = [0] * count
+    y = [0] * count
+    rows = [
+        [node for comp in layer_nodes for node in members[comp]]
+        for layer_nodes in layers
+    ]
+    widest = max(len(row) for row in rows)
+    for layer, row in enumerate(rows):
+        offset = (widest - len(row)) * X_SPACING // 2
+        for i, node in enumerate(row):
+            x[node] = offset + i * X_SPACING
+            y[node] = layer * Y_SPACING
+
+    return {
+        "x": x,
+        "y": y,
+        "layer": [comp_layer[comp] for comp in component],
+        "component": component,
+    }
+
+
+def graph_layout(names: list[str], successors: list[list[int]]) -> dict[str, Any]:
+    """Compact layout payload: node names, coordinate arrays and flat edge pairs."""  # noqa: DOC201
+    layout = layered_layout(successors)
+    layout["nodes"] = names
+    edges = []
+    for source, targets in enumerate(successors):
+        for target in targets:
+            edges.extend((source, target))
+    layout["edges"] = edges
+    return layout
@@ -0,0 +1,86 @@
+from collections import deque  # noqa: D100
+from typing import Any, Literal
+
+Direction = Literal["out", "in", "both"]
+
+
+def k_hop_neighborhood(
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+    start: int,
+    hops: int,
+    direction: Direction = "both",
+    max_nodes: int | None = None,
+) -> tuple[dict[int, int], bool]:
+    """Bounded BFS from ``start``; returns ``{node: distance}`` and a truncation flag."""  # noqa: DOC201
+    distance = {start: 0}
+    queue = deque([start])
+    truncated = False
+
+    while queue:
+        node = queue.popleft()
+        if distance[node] >= hops:
+            continue
+        neighbours = []
+        if direction in {"out", "both"}:
+            neighbours.extend(successors[node])
+        if direction in {"in", "both"}:
+            neighbours.extend(predecessors[node])
+        for other in neighbours:
+            if other in distance:
+                continue
+            if max_nodes is not None and len(distance) >= max_nodes:
+                truncated = True
+                break
+            distance[other] = distance[node] + 1
+            queue.append(other)
+        if truncated:
+            break
+
+    return distance, truncated
+
+
+def induced_subgraph(
+    successors: list[list[int]],
+    selected: dict[int, int],
+) -> list[tuple[int, int]]:
+    """Edges of the graph whose both ends are in ``selected``."""  # noqa: DOC201
+    return [
+        (source, target)
+        for source in selected
+        for target in successors[source]
+        if target in selected
+    ]
+
+
+def neighborhood_payload(
+    names: list[str],
+    successors: list[list[int]],
+    predecessors: list[list[int]],
+    start: int,
+    hops: int,
+    direction: Direction = "both",
+    max_nodes: int | None = None,
+) -> dict[str, Any]:
+    """JSON-ready k-hop subgraph around ``names[start]``."""  # noqa: DOC201
+    selected, truncated = k_hop_neighborhood(
+        successors,
+        predecessors,
+        start,
+        hops,
+        direction,
+        max_nodes,
+    )
+    return {
+        "root": names[start],
+        "hops": hops,
+        "direction": direction,
+        "truncated": truncated,
+        "nodes": [
+            {"id": names[node], "distance": dist} for node, dist in selected.items()
+        ],
+        "edges": [
+            {"source": names[source], "target": names[target]}
+            for source, target in induced_subgraph(successors, selected)
+        ],
+    }
@@ -0,0 +1,364 @@
+import ast  # noqa: D100
+import sys
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+
+from .call_graph import CallGraph
+from .cfg_dominators import UNDEFINED, immediate_dominators
+
+# rough cold import times in ms (``python -X importtime``) of third-party
+# packages that are slow to import; options["package_costs"] extends them
+DEFAULT_PACKAGE_COSTS_MS: dict[str, float] = {
+    "fastapi": 60.0,
+    "starlette": 20.0,
+    "pydantic": 40.0,
+    "sqlalchemy": 60.0,
+    "sqlmodel": 80.0,
+    "alembic": 30.0,
+    "celery": 150.0,
+    "boto3": 300.0,
+    "botocore": 250.0,
+    "requests": 40.0,
+    "httpx": 30.0,
+    "aiohttp": 50.0,
+    "jinja2": 15.0,
+    "jwt": 10.0,
+    "passlib": 20.0,
+    "cryptography": 40.0,
+    "emails": 30.0,
+    "numpy": 80.0,
+    "pandas": 300.0,
+    "scipy": 200.0,
+    "sklearn": 500.0,
+    "matplotlib": 250.0,
+    "torch": 1500.0,
+    "tensorflow": 2000.0,
+    "transformers": 1500.0,
+}
+UNKNOWN_PACKAGE_MS = 5.0
+STDLIB_MODULE_MS = 0.5
+# per scanned module: finder/loader overhead, then size and top-level work
+MODULE_OVERHEAD_MS = 0.2
+MS_PER_KB = 0.05
+MS_PER_STATEMENT = 0.01
+MAX_LAZY_HANDLERS = 2
+# below this a lazy import is not worth the indirection
+MIN_LAZY_MS = 1.0
+# external packages share the graph with module paths
+EXTERNAL_SUFFIX = " (external)"
+TOP_MODULES = 10
+
+
+def startup_imports(tree: ast.Module) -> Iterator[ast.Import | ast.ImportFrom]:
+    """Import statements a module runs when it is imported.
+
+    Function bodies run later and ``if TYPE_CHECKING:`` blocks never run;
+    class bodies, ``try`` and other ``if`` blocks run at import time.
+    """  # noqa: DOC402
+    stack = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.If) and "TYPE_CHECKING" in ast.unparse(node.test):
+            stack.extend(reversed(node.orelse))
+            continue
+        children = [
+            child for child in ast.iter_child_nodes(node) if isinstance(child, ast.stmt)
+        ]
+        stack.extend(reversed(children))
+        for handler in getattr(node, "handlers", []):
+            stack.extend(reversed(handler.body))
+
+
+def _dotted(module: str) -> str:
+    module = module.removesuffix(".py").removesuffix("/__init__")
+    return module.replace("/", ".")
+
+
+def _common_prefix(first: str, second: str) -> int:
+    count = 0
+    for left, right in zip(first.split("/"), second.split("/"), strict=False):
+        if left != right:
+            break
+        count += 1
+    return count
+
+
+class ModuleResolver:
+    """Maps dotted import names onto scanned module paths.
+
+    A scanned module answers to every dotted suffix of its path, since the
+    scan root rarely is the import root; when several modules share a
+    suffix, the one closest to the importing module wins.
+    """
+
+    def __init__(self, modules: list[str]) -> "ModuleResolver":  # noqa: D107
+        self.by_suffix: dict[str, list[str]] = {}
+        for module in modules:
+            parts = _dotted(module).split(".")
+            for start in range(len(parts)):
+                suffix = ".".join(parts[start:])
+                self.by_suffix.setdefault(suffix, []).append(module)
+
+    def resolve(self, importer: str, name: str, level: int = 0) -> str | None:
+        """Scanned module that ``import name`` in ``importer`` loads, or None."""  # noqa: DOC201
+        if level:
+            package = _dotted(importer).split(".")
+            if not importer.endswith("/__init__.py"):
+                package = package[:-1]
+            package = package[: len(package) - level + 1]
+            name = ".".join([*package, name] if name else package)
+        candidates = self.by_suffix.get(name)
+        if not candidates:
+            return None
+        return max(candidates, key=lambda module: _common_prefix(module, importer))
+
+
+def module_imports(
+    module: str,
+    tree: ast.Module,
+    resolver: ModuleResolver,
+) -> dict[str, set[str]]:
+    """Modules and external packages a module imports at startup, with bound names.
+
+    Keys are scanned module paths or ``"<package> (external)"`` for the
+    top-level package of anything else; values are the names the imports
+    bind in ``module``.
+    """  # noqa: DOC201
+    imported: dict[str, set[str]] = {}
+    for node in startup_imports(tree):
+        for alias in node.names:
+            if isinstance(node, ast.Import):
+                # ``import a.b`` binds ``a`` unless renamed
+                bound = alias.asname or alias.name.split(".", maxsplit=1)[0]
+                target = resolver.resolve(module, alias.name)
+                requested = alias.name
+            else:
+                bound = alias.asname or alias.name
+                base = node.module or ""
+                # ``from package import submodule`` loads the submodule too
+                target = resolver.resolve(
+                    module,
+                    f"{base}.{alias.name}" if base else alias.name,
+                    node.level,
+                ) or resolver.resolve(module, base, node.level)
+                requested = None if node.level else base
+            if target is None and requested:
+                target = requested.split(".", maxsplit=1)[0] + EXTERNAL_SUFFIX
+            if target is not None and target != module:
+                imported.setdefault(target, set()).add(bound)
+    return imported
+
+
+def startup_names(tree: ast.Module) -> set[str]:
+    """Names a module reads while it is imported, outside function bodies.
+
+    Decorators, default values and annotations of functions count, since
+    they are evaluated when the ``def`` statement runs.
+    """  # noqa: DOC201
+    names = set()
+    stack: list[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            stack.extend(node.decorator_list)
+            stack.append(node.args)
+            if node.returns is not None:
+                stack.append(node.returns)
+            continue
+        if isinstance(node, ast.Lambda):
+            stack.append(node.args)
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def package_cost(package: str, costs: dict[str, float]) -> float:
+    """Estimated cold import time of an external top-level package, in ms."""  # noqa: DOC201
+    if package in costs:
+        return costs[package]
+    if package in sys.stdlib_module_names:
+        return STDLIB_MODULE_MS
+    return UNKNOWN_PACKAGE_MS
+
+
+def module_cost(tree: ast.Module, size: int) -> float:
+    """Estimated time to import one scanned module by itself, in ms."""  # noqa: DOC201
+    return (
+        MODULE_OVERHEAD_MS
+        + MS_PER_KB * size / 1024
+        + MS_PER_STATEMENT * len(tree.body)
+    )
+
+
+def _entry_modules(trees: dict[str, ast.Module]) -> list[str]:
+    # modules creating the ASGI app at top level, else main.py files
+    entries = [
+        module
+        for module, tree in trees.items()
+        if any(
+            isinstance(statement, ast.Assign)
+            and isinstance(statement.value, ast.Call)
+            and ast.unparse(statement.value.func).rsplit(".", maxsplit=1)[-1]
+            == "FastAPI"
+            for statement in tree.body
+        )
+    ]
+    return entries or [
+        module for module in trees if module.rsplit("/", maxsplit=1)[-1] == "main.py"
+    ]
+
+
+def _handler_usage(
+    call_graph: CallGraph,
+    resolver: ModuleResolver,
+) -> dict[str, set[str]]:
+    # module or external package -> handlers that run its code; calls the
+    # scan left unresolved are matched on their import-qualified names
+    usage: dict[str, set[str]] = {}
+    for function_id, node in enumerate(call_graph.nodes):
+        if node.get("type") != "handler":
+            continue
+        handler = call_graph.names[function_id]
+        for callee in call_graph.call_chains(function_id):
+            module = call_graph.modules[callee]
+            usage.setdefault(module, set()).add(handler)
+            for call in call_graph.nodes[callee].get("external_calls", []):
+                parts = call["name"].split(".")
+                usage.setdefault(parts[0], set()).add(handler)
+                for end in range(len(parts) - 1, 0, -1):
+                    target = resolver.resolve(module, ".".join(parts[:end]))
+                    if target is not None:
+                        usage.setdefault(target, set()).add(handler)
+                        break
+    return usage
+
+
+def import_cost(
+    entry: str,
+    trees: dict[str, ast.Module],
+    resolver: ModuleResolver,
+    sizes: dict[str, int],
+    package_costs: dict[str, float],
+) -> dict[str, Any]:
+    """Startup import closure of ``entry`` with own and retained cost per module.
+
+    A module's retained cost covers everything it dominates in the import
+    graph: what would no longer load at startup if it were imported lazily.
+    A module is ``deferrable`` when no importer reads the names its imports
+    bind outside function bodies.
+    """  # noqa: DOC201
+    names = [entry]
+    index = {entry: 0}
+    successors: list[list[int]] = [[]]
+    own: list[float] = []
+    deferrable = [False]
+    queue = deque([entry])
+    while queue:
+        name = queue.popleft()
+        node = index[name]
+        if name not in trees:
+            own.append(package_cost(name.removesuffix(EXTERNAL_SUFFIX), package_costs))
+            continue
+        own.append(module_cost(trees[name], sizes.get(name, 0)))
+        used = startup_names(trees[name])
+        imported = module_imports(name, trees[name], resolver)
+        for target, bound in sorted(imported.items()):
+            if target not in index:
+                index[target] = len(names)
+                names.append(target)
+                successors.append([])
+                deferrable.append(True)
+                queue.append(target)
+            successors[node].append(index[target])
+            if bound & used:
+                deferrable[index[target]] = False
+
+    predecessors: list[list[int]] = [[] for _ in names]
+    for source, targets in enumerate(successors):
+        for target in targets:
+            predecessors[target].append(source)
+    idom = immediate_dominators(successors, predecessors, 0)
+
+    # an immediate dominator is closer to the entry, so it was discovered
+    # earlier: reverse BFS order visits dominator-tree children first
+    retained = list(own)
+    for node in reversed(range(1, len(names))):
+        if idom[node] != UNDEFINED:
+            retained[idom[node]] += retained[node]
+
+    modules = [
+        {
+            "module": name,
+            "external": name.endswith(EXTERNAL_SUFFIX),
+            "own_ms": round(own[node], 3),
+            "retained_ms": round(retained[node], 3),
+            "imported_by": sorted(names[source] for source in predecessors[node]),
+            "deferrable": deferrable[node],
+        }
+        for node, name in enumerate(names)
+    ]
+    return {"entry": entry, "estimated_ms": round(retained[0], 3), "modules": modules}
+
+
+def import_cost_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Startup import cost from each entry module and its lazy-import candidates.
+
+    ``options["entry"]`` picks the entry module (default: modules creating a
+    ``FastAPI()`` app at top level), ``options["package_costs"]`` adds or
+    overrides ms per external package and ``options["max_handlers"]`` is how
+    many handlers may still use a lazy-import candidate.
+    """  # noqa: DOC201
+    options = options or {}
+    trees = analyzer.get_source_trees()
+    sizes = analyzer.get_source_sizes()
+    package_costs = {**DEFAULT_PACKAGE_COSTS_MS, **options.get("package_costs", {})}
+    max_handlers = options.get("max_handlers", MAX_LAZY_HANDLERS)
+    call_graph = CallGraph(dependencies)
+    resolver = ModuleResolver(list(trees))
+    usage = _handler_usage(call_graph, resolver)
+    # routers must be imported for their routes to exist
+    handler_modules = {
+        call_graph.modules[function_id]
+        for function_id, node in enumerate(call_graph.nodes)
+        if node.get("type") == "handler"
+    }
+
+    report = []
+    entries = [options["entry"]] if options.get("entry") else _entry_modules(trees)
+    for entry in entries:
+        result = import_cost(entry, trees, resolver, sizes, package_costs)
+        modules = result.pop("modules")
+        ranked = sorted(modules[1:], key=lambda item: -item["retained_ms"])
+        candidates = []
+        for item in ranked:
+            name = item["module"].removesuffix(EXTERNAL_SUFFIX)
+            used_by = sorted(usage.get(name, ()))
+            if (
+                not item["deferrable"]
+                or item["retained_ms"] < MIN_LAZY_MS
+                or name in handler_modules
+                or len(used_by) > max_handlers
+            ):
+                continue
+            candidates.append({**item, "used_by": used_by})
+        report.append(
+            {
+                **result,
+                "module_count": len(modules),
+                "dominant": ranked[:TOP_MODULES],
+                "lazy_candidates": candidates[:TOP_MODULES],
+            },
+        )
+    return report
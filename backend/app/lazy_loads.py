@@ -0,0 +1,251 @@
+import ast  # noqa: D100
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from .call_graph import CallGraph
+from .cfg_dataflow import FunctionNode, iter_function_defs
+from .di_graph import DependencyResolver
+from .orm_models import annotation_model, iter_models
+
+# what an expression evaluates to: model, relationship hops taken to get
+# there, and whether it is a collection of that model
+Resolved = tuple[str, tuple[dict[str, Any], ...], bool]
+
+
+def relationship_index(dependencies: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """``{model: {attribute: relationship}}`` of every model in a scan."""  # noqa: DOC201
+    return {
+        node["name"]: {
+            relationship["name"]: relationship
+            for relationship in node.get("relationships", [])
+        }
+        for _, node in iter_models(dependencies)
+    }
+
+
+class _ChainVisitor(ast.NodeVisitor):
+    # flow-insensitive: a variable keeps the model of its last binding in
+    # source order, together with the hops that produced it
+
+    def __init__(
+        self,
+        function: FunctionNode,
+        models: dict[str, dict[str, Any]],
+        resolve_alias: Callable[[ast.AST | None], ast.AST | None] | None = None,
+    ) -> "_ChainVisitor":
+        self.models = models
+        self.types: dict[str, Resolved] = {}
+        self.loop_depth = 0
+        self.chains: list[dict[str, Any]] = []
+        arguments = function.args
+        for arg in [
+            *arguments.posonlyargs,
+            *arguments.args,
+            *arguments.kwonlyargs,
+        ]:
+            annotation = arg.annotation
+            if resolve_alias is not None:
+                annotation = resolve_alias(annotation)
+            model, collection = annotation_model(annotation)
+            if model in models:
+                self.types[arg.arg] = (model, (), collection)
+        for statement in function.body:
+            self.visit(statement)
+
+    def _resolve(self, node: ast.AST) -> Resolved | None:
+        if isinstance(node, ast.Name):
+            return self.types.get(node.id)
+        if isinstance(node, ast.Await):
+            return self._resolve(node.value)
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else None
+            return (name, (), False) if name in self.models else None
+        if not isinstance(node, ast.Attribute):
+            return None
+        base = self._resolve(node.value)
+        if base is None or base[2]:
+            return None
+        model, hops, _ = base
+        relationship = self.models.get(model, {}).get(node.attr)
+        if relationship is None or relationship["target"] not in self.models:
+            return None
+        hop = {
+            "model": model,
+            "attribute": node.attr,
+            "target": relationship["target"],
+            "lazy": relationship["lazy"],
+            "loading": relationship["loading"],
+            "lineno": node.lineno,
+        }
+        return relationship["target"], (*hops, hop), relationship["uselist"]
+
+    def _bind(self, target: ast.AST, resolved: Resolved | None) -> None:
+        if not isinstance(target, ast.Name):
+            return
+        if resolved is None:
+            self.types.pop(target.id, None)
+        else:
+            self.types[target.id] = resolved
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        resolved = self._resolve(node)
+        if resolved is not None:
+            # every resolved attribute is a hop; shorter prefixes drop later
+            hops = resolved[1]
+            self.chains.append(
+                {
+                    "lineno": node.lineno,
+                    "expression": ast.unparse(node),
+                    "path": ".".join(
+                        [hops[0]["model"], *(hop["attribute"] for hop in hops)],
+                    ),
+                    "hops": list(hops),
+                    "lazy_hops": sum(hop["loading"] == "lazy" for hop in hops),
+                    "loop_depth": self.loop_depth,
+                },
+            )
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self.visit(node.value)
+        resolved = self._resolve(node.value)
+        for target in node.targets:
+            self.visit(target)
+            self._bind(target, resolved)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        resolved = None
+        if node.value is not None:
+            self.visit(node.value)
+            resolved = self._resolve(node.value)
+        if resolved is None:
+            model, collection = annotation_model(node.annotation)
+            if model in self.models:
+                resolved = (model, (), collection)
+        self._bind(node.target, resolved)
+
+    def _visit_loop(self, node: ast.For | ast.AsyncFor | ast.While) -> None:
+        if isinstance(node, ast.While):
+            self.visit(node.test)
+        else:
+            self.visit(node.iter)
+            iterated = self._resolve(node.iter)
+            if iterated is not None and iterated[2]:
+                self._bind(node.target, (iterated[0], iterated[1], False))
+            else:
+                self._bind(node.target, None)
+        self.loop_depth += 1
+        for statement in node.body:
+            self.visit(statement)
+        self.loop_depth -= 1
+        for statement in node.orelse:
+            self.visit(statement)
+
+    visit_For = visit_AsyncFor = visit_While = _visit_loop
+
+    def _visit_comprehension(self, node: ast.AST) -> None:
+        first, *rest = node.generators
+        self.visit(first.iter)
+        self.loop_depth += 1
+        for generator in (first, *rest):
+            if generator is not first:
+                self.visit(generator.iter)
+            iterated = self._resolve(generator.iter)
+            if iterated is not None and iterated[2]:
+                self._bind(generator.target, (iterated[0], iterated[1], False))
+            for condition in generator.ifs:
+                self.visit(condition)
+        for field in ("elt", "key", "value"):
+            if getattr(node, field, None) is not None:
+                self.visit(getattr(node, field))
+        self.loop_depth -= 1
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = (
+        _visit_comprehension
+    )
+
+    def _skip_scope(self, node: ast.AST) -> None:
+        # nested functions and classes are analysed as functions of their own
+        pass
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = (
+        _skip_scope
+    )
+
+
+def relationship_chains(
+    function: FunctionNode,
+    models: dict[str, dict[str, Any]],
+    resolve_alias: Callable[[ast.AST | None], ast.AST | None] | None = None,
+) -> list[dict[str, Any]]:
+    """Attribute chains of a function that cross at least one relationship.
+
+    Hops through local variables belong to one chain, so ``a = p.x`` then
+    ``a.y`` is one chain of two hops; chains that are a prefix of a longer
+    one are dropped. ``resolve_alias`` expands parameter annotations that
+    name a type alias.
+    """  # noqa: DOC201
+    chains = _ChainVisitor(function, models, resolve_alias).chains
+    keys = [
+        tuple((hop["model"], hop["attribute"], hop["lineno"]) for hop in chain["hops"])
+        for chain in chains
+    ]
+    return [
+        chain
+        for chain, key in zip(chains, keys, strict=True)
+        if not any(len(other) > len(key) and other[: len(key)] == key for other in keys)
+    ]
+
+
+def lazy_loads_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Relationship traversals per function and per handler, through its callees.
+
+    Returns the relationship index of all models, the chains of every
+    function that has any, and a per-handler report ranked by lazy hops.
+    """  # noqa: DOC201
+    models = relationship_index(dependencies)
+    call_graph = CallGraph(dependencies)
+
+    trees = analyzer.get_source_trees()
+    resolver = DependencyResolver(trees, analyzer.get_import_sources())
+    functions = {}
+    for module, tree in trees.items():
+        resolve_alias = partial(resolver.expand_alias, module)
+        for symbol, function in iter_function_defs(module, tree):
+            chains = relationship_chains(function, models, resolve_alias)
+            if chains:
+                functions[symbol] = chains
+
+    handlers = []
+    for function_id, node in enumerate(call_graph.nodes):
+        if node.get("type") != "handler":
+            continue
+        found = [
+            {"function": chain[-1], "via": chain, **finding}
+            for callee, chain in call_graph.call_chains(function_id).items()
+            for finding in functions.get(call_graph.names[callee], [])
+        ]
+        if found:
+            handlers.append(
+                {
+                    "symbol": call_graph.names[function_id],
+                    "http_method": node.get("http_method"),
+                    "path": node.get("path"),
+                    "lazy_hops": sum(finding["lazy_hops"] for finding in found),
+                    "chains": found,
+                },
+            )
+    handlers.sort(key=lambda handler: (-handler["lazy_hops"], -len(handler["chains"])))
+    return {
+        "relationships": {
+            model: list(index.values()) for model, index in models.items() if index
+        },
+        "functions": functions,
+        "handlers": handlers,
+    }
@@ -1,9 +1,33 @@
-from typing import Literal
-from fastapi import FastAPI, HTTPException
+from typing import Any, Literal, Optional
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from .dep_analyzer import get_json_dict
+from .call_graph import CallGraph, FUNCTION_TYPES
+from .cfg_export import CFG_MEDIA_TYPE, encode_cfgs
+from .cfg_metrics import METRICS, FunctionMetrics
+from .cfg_paths import CondensedCFG
+from .cfg_shapes import function_cfg
+from .coverage_overlay import apply_coverage, load_coverage
+from .db_round_trips import round_trip_sort_key
+from .dep_analyzer import (
+    DEFAULT_EXCLUDED_DIRS,
+    get_endpoints_dict,
+    get_json_dict,
+)
+from .function_cache import FunctionCache
+from .graph_layout import graph_layout
+from .graph_query import Direction, neighborhood_payload
+from .module_graph import ModuleGraph, coarsen_by_package, expand_package
+from .profile_overlay import apply_profile, load_stats
 from .pydantic_models import ScanRequest, ScanResult
+from .route_index import RouteIndex
+from .scan_store import ScanStore, compute_scan_fingerprint
+from .stack_samples import (
+    FLAME_MAX_DEPTH,
+    CollapsedStackImporter,
+    flame_subtree,
+)
 
 app = FastAPI(title="Arch-Visualizer MVP")
 
@@ -15,6 +39,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+scan_store = ScanStore()
+# survives rescans: unchanged functions keep their CFG and calls
+function_cache = FunctionCache()
+
+
+def _resolve_scan_id(scan_id: Optional[str]) -> str:
+    resolved = scan_id or scan_store.latest_id()
+    if resolved is None or scan_store.get(resolved) is None:
+        detail = (
+            f"scan '{scan_id}' not found"
+            if scan_id
+            else "no scan available, run POST /scan first"
+        )
+        raise HTTPException(status_code=404, detail=detail)
+    return resolved
+
+
+def _get_scan(scan_id: Optional[str]) -> dict[str, Any]:
+    return scan_store.get(_resolve_scan_id(scan_id))
+
+
+def _build_graph(kind: str, dependencies: dict[str, Any]) -> ModuleGraph | CallGraph:
+    if kind == "modules":
+        return ModuleGraph(dependencies.get("modules", []))
+    return CallGraph(dependencies)
+
+
+def _scan_graph(scan_id: str, kind: str) -> ModuleGraph | CallGraph:
+    return scan_store.derived(
+        scan_id,
+        f"graph:{kind}",
+        lambda dependencies: _build_graph(kind, dependencies),
+    )
+
 
 @app.get("/")
 def healthcheck() -> dict[Literal["status"], str]:
@@ -24,17 +82,448 @@ def healthcheck() -> dict[Literal["status"], str]:
 @app.post("/scan", response_model=ScanResult)
 def scan(req: ScanRequest) -> ScanResult:
     try:
-        dependencies = get_json_dict(
-            project_path=req.repo_root,
-            included_external=not req.include_tests,
-            max_depth=req.max_depth,
+        scan_id = compute_scan_fingerprint(
+            req.repo_root,
+            [d.strip() for d in DEFAULT_EXCLUDED_DIRS.split(",") if d.strip()],
+            req.model_dump(exclude={"verbose"}),
         )
-    except FileNotFoundError as e:
+        dependencies = scan_store.get(scan_id)
+        if dependencies is None:
+            if req.mode == "endpoints":
+                dependencies = get_endpoints_dict(project_path=req.repo_root)
+            else:
+                dependencies = get_json_dict(
+                    root_module=req.root_module or "",
+                    project_path=req.repo_root,
+                    included_external=not req.include_tests,
+                    max_depth=req.max_depth,
+                    compact_cfg=req.compact_cfg,
+                    share_cfg_shapes=req.share_cfg_shapes,
+                    analyses=req.analyses,
+                    analysis_options=req.analysis_options,
+                    function_cache=function_cache,
+                )
+            scan_store.put(scan_id, dependencies)
+        else:
+            scan_store.touch(scan_id)
+    except (FileNotFoundError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"internal error: {e}")
 
-    return ScanResult(dependencies=dependencies)
+    return ScanResult(scan_id=scan_id, dependencies=dependencies)
+
+
+@app.get("/packages")
+def packages(depth: int = 1, scan_id: Optional[str] = None) -> dict[str, Any]:
+    graph = _scan_graph(_resolve_scan_id(scan_id), "modules")
+    return coarsen_by_package(graph, depth=depth)
+
+
+@app.get("/packages/expand")
+def packages_expand(
+    package: str,
+    depth: int = 1,
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    graph = _scan_graph(_resolve_scan_id(scan_id), "modules")
+    try:
+        return expand_package(graph, package, depth=depth)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@app.get("/layout")
+def layout(
+    graph: Literal["modules", "calls"] = "modules",
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    resolved = _resolve_scan_id(scan_id)
+    scan_graph = _scan_graph(resolved, graph)
+    return scan_store.derived(
+        resolved,
+        f"layout:{graph}",
+        lambda _: graph_layout(scan_graph.names, scan_graph.successors),
+    )
+
+
+@app.get("/subgraph")
+def subgraph(
+    node: str,
+    hops: int = Query(1, ge=0),
+    direction: Direction = "both",
+    graph: Optional[Literal["modules", "calls"]] = None,
+    max_nodes: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    # function symbols look like "<module file>:<qualname>"
+    kind = graph or ("calls" if ":" in node else "modules")
+    resolved = _resolve_scan_id(scan_id)
+    scan_graph = _scan_graph(resolved, kind)
+    if node not in scan_graph.index:
+        raise HTTPException(status_code=404, detail=f"node '{node}' not found")
+
+    result = neighborhood_payload(
+        scan_graph.names,
+        scan_graph.successors,
+        scan_graph.predecessors,
+        scan_graph.index[node],
+        hops,
+        direction,
+        max_nodes,
+    )
+    result["graph"] = kind
+    if kind == "modules":
+        # ModuleGraph keeps the order of the scan's modules list
+        modules = _get_scan(resolved).get("modules", [])
+        result["modules"] = [
+            modules[scan_graph.index[item["id"]]] for item in result["nodes"]
+        ]
+    else:
+        for item in result["nodes"]:
+            function_node = scan_graph.nodes[scan_graph.index[item["id"]]]
+            item.update(
+                {
+                    key: value
+                    for key, value in function_node.items()
+                    if key not in {"children", "cfg", "calls"}
+                },
+            )
+    return result
+
+
+def _route_index(scan_id: Optional[str]) -> RouteIndex:
+    resolved = _resolve_scan_id(scan_id)
+    return scan_store.derived(
+        resolved,
+        "routes",
+        lambda dependencies: RouteIndex(dependencies.get("endpoints", [])),
+    )
+
+
+@app.get("/routes")
+def routes(scan_id: Optional[str] = None) -> list[dict[str, Any]]:
+    return _route_index(scan_id).endpoints
+
+
+@app.get("/routes/match")
+def routes_match(
+    path: str,
+    method: Optional[str] = None,
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    return {"path": path, "matches": _route_index(scan_id).match(path, method)}
+
+
+def _function_metrics(scan_id: str) -> FunctionMetrics:
+    def build(dependencies: dict[str, Any]) -> FunctionMetrics:
+        stored = dependencies.get("analyses", {}).get("metrics")
+        if stored is not None:
+            return FunctionMetrics.from_columns(stored)
+        return FunctionMetrics(dependencies)
+
+    return scan_store.derived(scan_id, "metrics", build)
+
+
+@app.get("/hotspots")
+def hotspots(
+    metric: Literal[METRICS] = "cyclomatic",
+    top: int = Query(10, ge=1),
+    function_type: Optional[Literal[FUNCTION_TYPES]] = Query(None, alias="type"),
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    metrics = _function_metrics(_resolve_scan_id(scan_id))
+    return {
+        "metric": metric,
+        "total": len(metrics.symbols),
+        "functions": metrics.top(metric, top, function_type),
+    }
+
+
+@app.get("/paths")
+def paths(
+    function: str,
+    top: int = Query(10, ge=0, le=1000),
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    resolved = _resolve_scan_id(scan_id)
+    call_graph = _scan_graph(resolved, "calls")
+    if function not in call_graph.index:
+        raise HTTPException(status_code=404, detail=f"function '{function}' not found")
+    cfg = function_cfg(
+        _get_scan(resolved),
+        call_graph.nodes[call_graph.index[function]],
+    )
+    if not cfg.get("nodes") or cfg.get("entry_node_id") is None:
+        raise HTTPException(status_code=422, detail=f"no CFG for '{function}'")
+
+    condensed = CondensedCFG(cfg)
+    top_paths, truncated = condensed.top_paths(top)
+    return {
+        "function": function,
+        "paths": str(condensed.path_count),
+        "longest": condensed.longest[condensed.entry],
+        "top": top_paths,
+        "truncated": truncated,
+    }
+
+
+@app.get("/cfgs", response_model=None)
+def cfgs(request: Request, scan_id: Optional[str] = None) -> Any:  # noqa: ANN401
+    resolved = _resolve_scan_id(scan_id)
+    if CFG_MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(
+            content=scan_store.derived(resolved, "cfg_export", encode_cfgs),
+            media_type=CFG_MEDIA_TYPE,
+        )
+    dependencies = _get_scan(resolved)
+    call_graph = _scan_graph(resolved, "calls")
+    return {
+        symbol: function_cfg(dependencies, node)
+        for symbol, node in zip(call_graph.names, call_graph.nodes)
+    }
+
+
+def _analysis(scan_id: Optional[str], name: str) -> Any:  # noqa: ANN401
+    analyses = _get_scan(scan_id).get("analyses", {})
+    if name not in analyses:
+        raise HTTPException(
+            status_code=404,
+            detail=f"scan has no '{name}' analysis, rescan with analyses=['{name}']",
+        )
+    return analyses[name]
+
+
+@app.get("/n-plus-one")
+def n_plus_one(
+    function_type: Optional[Literal[FUNCTION_TYPES]] = Query(None, alias="type"),
+    top: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    ranked = [
+        item
+        for item in _analysis(scan_id, "n_plus_one")
+        if function_type is None or item["type"] == function_type
+    ]
+    return ranked[:top]
+
+
+@app.get("/blocking-calls")
+def blocking_calls(scan_id: Optional[str] = None) -> dict[str, Any]:
+    return _analysis(scan_id, "blocking_calls")
+
+
+@app.get("/di-graph")
+def di_graph(
+    handler: Optional[str] = None,
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    report = _analysis(scan_id, "di_graph")
+    if handler is None:
+        return report
+    found = [item for item in report if item["symbol"] == handler]
+    if not found:
+        raise HTTPException(status_code=404, detail=f"unknown handler: {handler}")
+    return found
+
+
+@app.get("/table-access")
+def table_access(
+    handler: Optional[str] = None,
+    table: Optional[str] = None,
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    index = _analysis(scan_id, "table_access")
+    if handler is not None:
+        if handler not in index["handlers"]:
+            raise HTTPException(status_code=404, detail=f"unknown handler: {handler}")
+        return {handler: index["handlers"][handler]}
+    if table is not None:
+        if table not in index["tables"]:
+            raise HTTPException(
+                status_code=404,
+                detail=f"no handler touches table: {table}",
+            )
+        return {table: index["tables"][table]}
+    return index
+
+
+@app.get("/import-cost")
+def import_cost(
+    entry: Optional[str] = None,
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    report = _analysis(scan_id, "import_cost")
+    if entry is None:
+        return report
+    found = [item for item in report if item["entry"] == entry]
+    if not found:
+        raise HTTPException(status_code=404, detail=f"unknown entry module: {entry}")
+    return found
+
+
+@app.get("/lazy-loads")
+def lazy_loads(scan_id: Optional[str] = None) -> dict[str, Any]:
+    return _analysis(scan_id, "lazy_loads")
+
+
+@app.get("/round-trips")
+def round_trips(
+    sort: Literal["max", "min"] = "max",
+    top: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    table = sorted(_analysis(scan_id, "db_round_trips"), key=round_trip_sort_key(sort))
+    return table[:top]
+
+
+@app.get("/gather-candidates")
+def gather_candidates(
+    function_type: Optional[Literal[FUNCTION_TYPES]] = Query(None, alias="type"),
+    top: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    ranked = [
+        item
+        for item in _analysis(scan_id, "concurrent_awaits")
+        if function_type is None or item["type"] == function_type
+    ]
+    return ranked[:top]
+
+
+def _get_overlay(scan_id: Optional[str], name: str, upload: str) -> Any:  # noqa: ANN401
+    value = scan_store.overlay(_resolve_scan_id(scan_id), name)
+    if value is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"scan has no {name}, upload it to POST /scans/{{scan_id}}/{upload}",
+        )
+    return value
+
+
+def _build_profile(dependencies: dict[str, Any], data: bytes) -> dict[str, Any]:
+    return apply_profile(dependencies, load_stats(data))
+
+
+@app.post("/scans/{scan_id}/profile")
+async def upload_profile(scan_id: str, request: Request) -> dict[str, Any]:
+    # raw .pstats body: curl --data-binary @app.pstats
+    resolved = _resolve_scan_id(scan_id)
+    dependencies = scan_store.get(resolved)
+    data = await request.body()
+    try:
+        # CPU-bound on multi-MB dumps: keep it off the event loop
+        profile = await run_in_threadpool(_build_profile, dependencies, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    scan_store.put_overlay(resolved, "profile", profile)
+    return {
+        key: profile[key]
+        for key in ("entries", "matched_functions", "total_time", "matched_own_time")
+    }
+
+
+@app.get("/hot-handlers")
+def hot_handlers(
+    top: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    return _get_overlay(scan_id, "profile", "profile")["handlers"][:top]
+
+
+def _build_coverage(dependencies: dict[str, Any], data: bytes) -> dict[str, Any]:
+    return apply_coverage(dependencies, load_coverage(data))
+
+
+def _coverage_summary(coverage: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in coverage.items() if key != "functions"}
+
+
+@app.post("/scans/{scan_id}/coverage")
+async def upload_coverage(scan_id: str, request: Request) -> dict[str, Any]:
+    # raw .coverage (SQLite) or `coverage json` body
+    resolved = _resolve_scan_id(scan_id)
+    dependencies = scan_store.get(resolved)
+    data = await request.body()
+    try:
+        # CPU-bound on multi-MB data files: keep it off the event loop
+        coverage = await run_in_threadpool(_build_coverage, dependencies, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    scan_store.put_overlay(resolved, "coverage", coverage)
+    return _coverage_summary(coverage)
+
+
+@app.get("/coverage")
+def coverage(
+    function: Optional[str] = None,
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    resolved = _resolve_scan_id(scan_id)
+    coverage = _get_overlay(resolved, "coverage", "coverage")
+    if function is None:
+        return _coverage_summary(coverage)
+    call_graph = _scan_graph(resolved, "calls")
+    if function not in call_graph.index:
+        raise HTTPException(status_code=404, detail=f"unknown function: {function}")
+    node = call_graph.nodes[call_graph.index[function]]
+    return {
+        "cfg": function_cfg(scan_store.get(resolved), node),
+        "coverage": coverage["functions"].get(function),
+    }
+
+
+@app.post("/scans/{scan_id}/samples")
+async def upload_samples(scan_id: str, request: Request) -> dict[str, Any]:
+    # collapsed stacks, aggregated while the body streams in
+    resolved = _resolve_scan_id(scan_id)
+    # resolving and aggregating frames is CPU-bound: keep it off the event
+    # loop, one worker call per received chunk
+    importer = await run_in_threadpool(
+        CollapsedStackImporter,
+        scan_store.get(resolved),
+    )
+    async for chunk in request.stream():
+        await run_in_threadpool(importer.feed, chunk)
+    await run_in_threadpool(importer.close)
+    samples = await run_in_threadpool(importer.to_dict)
+    scan_store.put_overlay(resolved, "samples", samples)
+    return {
+        key: samples[key]
+        for key in ("total_samples", "resolved_samples", "skipped_lines")
+    }
+
+
+@app.get("/samples")
+def samples_graph(
+    top: Optional[int] = Query(None, ge=1),
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    samples = _get_overlay(scan_id, "samples", "samples")
+    nodes = samples["nodes"][:top]
+    kept = {node["symbol"] for node in nodes}
+    return {
+        "total_samples": samples["total_samples"],
+        "nodes": nodes,
+        "edges": [
+            edge
+            for edge in samples["edges"]
+            if edge["caller"] in kept and edge["callee"] in kept
+        ],
+    }
+
+
+@app.get("/flamegraph")
+def flamegraph(
+    root: Optional[str] = None,
+    max_depth: Optional[int] = Query(None, ge=0, le=FLAME_MAX_DEPTH),
+    scan_id: Optional[str] = None,
+) -> dict[str, Any]:
+    samples = _get_overlay(scan_id, "samples", "samples")
+    subtree = flame_subtree(samples["flamegraph"], root, max_depth)
+    if not subtree["value"] and root is not None:
+        raise HTTPException(status_code=404, detail=f"no samples under: {root}")
+    return subtree
 
 
 @app.get("/graph")
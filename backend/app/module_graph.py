@@ -0,0 +1,144 @@
+from collections import defaultdict  # noqa: D100
+from typing import Any
+
+ROOT_PACKAGE = "."
+
+
+class ModuleGraph:
+    """Integer-indexed import graph over the ``modules`` list of a scan."""
+
+    def __init__(self, modules: list[dict[str, Any]]) -> "ModuleGraph":  # noqa: D107
+        self.names: list[str] = [module_info["module"] for module_info in modules]
+        self.index: dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.successors: list[list[int]] = [[] for _ in self.names]
+        self.predecessors: list[list[int]] = [[] for _ in self.names]
+        self.external_imports: list[int] = [0] * len(self.names)
+
+        for source, module_info in enumerate(modules):
+            seen = set()
+            for imported in module_info.get("imports", []):
+                target = self.index.get(imported)
+                if target is None:
+                    # external dependency, not part of the scanned tree
+                    self.external_imports[source] += 1
+                    continue
+                if target == source or target in seen:
+                    continue
+                seen.add(target)
+                self.successors[source].append(target)
+                self.predecessors[target].append(source)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.names)
+
+    def edges(self) -> list[tuple[int, int]]:  # noqa: D102
+        return [
+            (source, target)
+            for source, targets in enumerate(self.successors)
+            for target in targets
+        ]
+
+
+def package_of(module_path: str, depth: int) -> str:
+    """Return the package directory of ``module_path`` truncated to ``depth`` levels."""  # noqa: DOC201
+    parts = module_path.split("/")[:-1]
+    if depth > 0:
+        parts = parts[:depth]
+    return "/".join(parts) if parts else ROOT_PACKAGE
+
+
+def _is_inside(module_path: str, package: str) -> bool:
+    if package == ROOT_PACKAGE:
+        return "/" not in module_path
+    return module_path.startswith(f"{package}/")
+
+
+def coarsen_by_package(graph: ModuleGraph, depth: int = 1) -> dict[str, Any]:
+    """Aggregate the import graph by package directory with weighted edges."""  # noqa: DOC201
+    module_package = [package_of(name, depth) for name in graph.names]
+
+    packages: dict[str, dict[str, Any]] = {}
+    for i, package in enumerate(module_package):
+        info = packages.setdefault(
+            package,
+            {
+                "package": package,
+                "modules": 0,
+                "internal_edges": 0,
+                "external_imports": 0,
+                "has_subpackages": False,
+            },
+        )
+        info["modules"] += 1
+        info["external_imports"] += graph.external_imports[i]
+        if package_of(graph.names[i], 0) != package:
+            info["has_subpackages"] = True
+
+    weights: dict[tuple[str, str], int] = defaultdict(int)
+    for source, target in graph.edges():
+        source_package = module_package[source]
+        target_package = module_package[target]
+        if source_package == target_package:
+            packages[source_package]["internal_edges"] += 1
+        else:
+            weights[source_package, target_package] += 1
+
+    return {
+        "depth": depth,
+        "packages": sorted(packages.values(), key=lambda p: p["package"]),
+        "edges": [
+            {"source": source, "target": target, "weight": weight}
+            for (source, target), weight in sorted(weights.items())
+        ],
+    }
+
+
+def expand_package(graph: ModuleGraph, package: str, depth: int = 1) -> dict[str, Any]:
+    """Return the internal subgraph of one package plus its aggregated boundary edges.
+
+    Modules outside the package are collapsed to their package at ``depth``,
+    so the client can splice the result into the coarsened view.
+    """  # noqa: DOC201
+    members = [i for i, name in enumerate(graph.names) if _is_inside(name, package)]
+    if not members:
+        msg = f"Package '{package}' not found in scan"
+        raise KeyError(msg)
+    member_set = set(members)
+
+    internal_edges = []
+    boundary: dict[tuple[str, str, str], int] = defaultdict(int)
+    for source in members:
+        for target in graph.successors[source]:
+            if target in member_set:
+                internal_edges.append(
+                    {"source": graph.names[source], "target": graph.names[target]},
+                )
+            else:
+                outside = package_of(graph.names[target], depth)
+                boundary[graph.names[source], outside, "out"] += 1
+        for origin in graph.predecessors[source]:
+            if origin not in member_set:
+                outside = package_of(graph.names[origin], depth)
+                boundary[outside, graph.names[source], "in"] += 1
+
+    return {
+        "package": package,
+        "depth": depth,
+        "modules": [
+            {
+                "module": graph.names[i],
+                "external_imports": graph.external_imports[i],
+            }
+            for i in members
+        ],
+        "edges": internal_edges,
+        "boundary_edges": [
+            {
+                "source": source,
+                "target": target,
+                "direction": direction,
+                "weight": weight,
+            }
+            for (source, target, direction), weight in sorted(boundary.items())
+        ],
+    }
@@ -0,0 +1,138 @@
+import ast  # noqa: D100
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+
+from .call_graph import CallGraph
+from .cfg_dataflow import FunctionNode, iter_function_defs, statement_header
+from .cfg_dominators import immediate_dominators, loop_depths, natural_loops
+from .cfg_visitor import CFGVisitor
+from .db_calls import DEFAULT_DB_CALL_PATTERNS, CallMatcher, call_name
+
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def expression_calls(expr: ast.AST, depth: int) -> Iterator[tuple[ast.Call, int]]:
+    """Calls in an expression with their loop depth; comprehensions add a level.
+
+    All of a comprehension but its first iterable runs once per item.
+    """  # noqa: DOC402
+    stack = [(expr, depth)]
+    while stack:
+        node, level = stack.pop()
+        if isinstance(node, (ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if isinstance(node, ast.Call):
+            yield node, level
+        if isinstance(node, COMPREHENSIONS):
+            first, *_ = node.generators
+            stack.append((first.iter, level))
+            stack.extend(
+                (child, level + 1)
+                for child in ast.iter_child_nodes(node)
+                if child is not first
+            )
+            stack.extend((child, level + 1) for child in first.ifs)
+            stack.append((first.target, level + 1))
+            continue
+        stack.extend((child, level) for child in ast.iter_child_nodes(node))
+
+
+def loop_call_sites(function: FunctionNode) -> Iterator[tuple[ast.Call, int]]:
+    """Every call a function makes itself, with the number of loops around it.
+
+    Loop nesting comes from the natural loops of the function's CFG.
+    """  # noqa: DOC402
+    visitor = CFGVisitor(target_function=function.name)
+    visitor.visit(function)
+    successors = [node.successors for node in visitor.nodes]
+    predecessors = [node.predecessors for node in visitor.nodes]
+    idom = immediate_dominators(successors, predecessors, visitor.entry_node.id)
+    depths = loop_depths(natural_loops(successors, predecessors, idom), len(idom))
+
+    for node in visitor.nodes:
+        depth = depths[node.id]
+        if isinstance(node.ast_node, (ast.For, ast.AsyncFor)):
+            # the iterable is evaluated once, outside the loop it heads
+            yield from expression_calls(node.ast_node.iter, depth - 1)
+            yield from expression_calls(node.ast_node.target, depth)
+            continue
+        for header in statement_header(node.ast_node):
+            yield from expression_calls(header, depth)
+
+
+def _db_functions(call_graph: CallGraph, direct: set[int]) -> set[int]:
+    # functions that reach a DB call directly or through any callee
+    reached = set(direct)
+    queue = deque(direct)
+    while queue:
+        callee = queue.popleft()
+        for caller in call_graph.predecessors[callee]:
+            if caller not in reached:
+                reached.add(caller)
+                queue.append(caller)
+    return reached
+
+
+def n_plus_one_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    options: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """DB calls inside loops, ranked by loop depth and number of call sites.
+
+    ``options["patterns"]`` replaces ``DEFAULT_DB_CALL_PATTERNS``. A call
+    inside a loop is flagged when it matches a pattern, or when it resolves
+    to a scanned function that reaches a matching call through the call graph.
+    """  # noqa: DOC201
+    matcher = CallMatcher((options or {}).get("patterns") or DEFAULT_DB_CALL_PATTERNS)
+    call_graph = CallGraph(dependencies)
+
+    sites: dict[int, list[tuple[str | None, int, int]]] = {}
+    direct: set[int] = set()
+    for module, tree in analyzer.get_source_trees().items():
+        for symbol, function in iter_function_defs(module, tree):
+            function_id = call_graph.index.get(symbol)
+            if function_id is None:
+                continue
+            calls = [
+                (call_name(call), call.lineno, depth)
+                for call, depth in loop_call_sites(function)
+            ]
+            sites[function_id] = calls
+            if any(matcher.matches(name) for name, _, _ in calls):
+                direct.add(function_id)
+    db_functions = _db_functions(call_graph, direct)
+
+    ranked = []
+    for function_id, calls in sites.items():
+        resolved = call_graph.call_site_targets(function_id)
+
+        findings = []
+        for name, lineno, depth in calls:
+            if depth <= 0 or name is None:
+                continue
+            finding = {"call": name, "lineno": lineno, "loop_depth": depth}
+            if not matcher.matches(name):
+                callee = resolved.get((lineno, name.rsplit(".", maxsplit=1)[-1]))
+                if callee is None or callee not in db_functions:
+                    continue
+                finding["via"] = call_graph.names[callee]
+            findings.append(finding)
+
+        if findings:
+            findings.sort(key=lambda finding: finding["lineno"])
+            node = call_graph.nodes[function_id]
+            ranked.append(
+                {
+                    "symbol": call_graph.names[function_id],
+                    "type": node.get("type"),
+                    "http_method": node.get("http_method"),
+                    "path": node.get("path"),
+                    "max_loop_depth": max(f["loop_depth"] for f in findings),
+                    "findings": findings,
+                },
+            )
+
+    ranked.sort(key=lambda item: (-item["max_loop_depth"], -len(item["findings"])))
+    return ranked
@@ -0,0 +1,103 @@
+import ast  # noqa: D100
+from collections.abc import Iterator
+from typing import Any
+
+# factories of relationship attributes: SQLAlchemy and SQLModel
+RELATIONSHIP_FACTORIES = ("relationship", "Relationship")
+# ``lazy=`` strategies that load related rows together with the parent
+EAGER_STRATEGIES = ("joined", "selectin", "subquery", "immediate")
+COLLECTIONS = ("list", "List", "set", "Set", "tuple", "Tuple", "Sequence")
+# wrappers that do not change which model an annotation means
+TRANSPARENT = ("Mapped", "Optional", "Annotated")
+
+
+def annotation_model(annotation: ast.AST | None) -> tuple[str | None, bool]:
+    """Class name an annotation refers to and whether it is a collection of it.
+
+    Unwraps ``Mapped[...]``, ``Optional[...]``, ``X | None`` and string
+    forward references: ``Mapped[list["Item"]]`` gives ``("Item", True)``.
+    """  # noqa: DOC201
+    if annotation is None:
+        return None, False
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        try:
+            parsed = ast.parse(annotation.value, mode="eval")
+        except SyntaxError:
+            return None, False
+        return annotation_model(parsed.body)
+    if isinstance(annotation, ast.Name):
+        return annotation.id, False
+    if isinstance(annotation, ast.Attribute):
+        return annotation.attr, False
+    if isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+        left = annotation_model(annotation.left)
+        if left[0] in {None, "None"}:
+            return annotation_model(annotation.right)
+        return left
+    if isinstance(annotation, ast.Subscript):
+        wrapper, _ = annotation_model(annotation.value)
+        inner = annotation.slice
+        if isinstance(inner, ast.Tuple):
+            inner = inner.elts[0] if inner.elts else None
+        if wrapper in TRANSPARENT:
+            return annotation_model(inner)
+        if wrapper in COLLECTIONS:
+            return annotation_model(inner)[0], True
+    return None, False
+
+
+def _lazy_strategy(call: ast.Call) -> str:
+    keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+    value = keywords.get("lazy")
+    # SQLModel passes SQLAlchemy options through sa_relationship_kwargs
+    options = keywords.get("sa_relationship_kwargs")
+    if value is None and isinstance(options, ast.Dict):
+        for key, option in zip(options.keys, options.values, strict=True):
+            if isinstance(key, ast.Constant) and key.value == "lazy":
+                value = option
+    if not isinstance(value, ast.Constant):
+        return "select"
+    # legacy spellings: lazy=False is joined, lazy=None is noload
+    return {False: "joined", True: "select", None: "noload"}.get(
+        value.value,
+        str(value.value),
+    )
+
+
+def relationship_info(
+    call: ast.Call,
+    annotation: ast.AST | None,
+) -> dict[str, Any] | None:
+    """Target model, collection flag and loading strategy of a ``relationship()`` call."""  # noqa: DOC201
+    func = call.func
+    name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+    if name not in RELATIONSHIP_FACTORIES:
+        return None
+
+    target, uselist = annotation_model(annotation)
+    if call.args:
+        target = annotation_model(call.args[0])[0] or target
+    for keyword in call.keywords:
+        if keyword.arg == "uselist" and isinstance(keyword.value, ast.Constant):
+            uselist = bool(keyword.value.value)
+
+    lazy = _lazy_strategy(call)
+    return {
+        "target": target,
+        "uselist": uselist,
+        "lazy": lazy,
+        "loading": "eager" if lazy in EAGER_STRATEGIES else "lazy",
+    }
+
+
+def iter_models(
+    dependencies: dict[str, Any],
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield ``(module, class node)`` for every ``sql_class`` of a scan."""  # noqa: DOC402
+    for module_info in dependencies.get("modules", []):
+        stack = list(module_info.get("tree", {}).get("children", []))
+        while stack:
+            node = stack.pop()
+            if node.get("type") == "sql_class":
+                yield module_info["module"], node
+            stack.extend(node.get("children", []))
@@ -0,0 +1,185 @@
+import marshal  # noqa: D100
+from pathlib import Path
+from typing import Any
+
+from .call_graph import iter_functions
+
+# pstats key: (filename, firstlineno, funcname)
+ProfileKey = tuple[str, int, str]
+TOP_UNMATCHED = 20
+
+
+def load_stats(data: bytes) -> dict[ProfileKey, tuple]:
+    """Raw ``{key: (cc, nc, tt, ct, callers)}`` table of a ``.pstats`` dump.
+
+    ``pstats.Stats`` reads the same marshal table, but only from files and
+    with sorting and printing machinery around it.
+    """  # noqa: DOC201, DOC501
+    try:
+        stats = marshal.loads(data)  # noqa: S302
+    except (EOFError, ValueError, TypeError) as e:
+        msg = f"not a pstats dump: {e}"
+        raise ValueError(msg) from e
+    if not isinstance(stats, dict) or not all(
+        isinstance(key, tuple) and len(key) == 3 for key in stats
+    ):
+        msg = "not a pstats dump: expected a marshalled stats table"
+        raise ValueError(msg)
+    return stats
+
+
+def load_stats_file(path: str) -> dict[ProfileKey, tuple]:
+    """``load_stats`` of a ``.pstats`` file written by cProfile."""  # noqa: DOC201
+    return load_stats(Path(path).read_bytes())
+
+
+class ModuleFiles:
+    """Matches file paths recorded elsewhere onto scanned module paths.
+
+    Profiles and coverage files come from machines where the project lives
+    in another directory, so a path matches the scanned module it ends
+    with; each distinct path is resolved once.
+    """
+
+    def __init__(self, modules: list[str]) -> "ModuleFiles":  # noqa: D107
+        self._by_basename: dict[str, list[str]] = {}
+        self._files: dict[str, str | None] = {}
+        for module in modules:
+            basename = module.rsplit("/", maxsplit=1)[-1]
+            self._by_basename.setdefault(basename, []).append(module)
+
+    def module(self, filename: str) -> str | None:
+        """Scanned module a recorded file path refers to, or None."""  # noqa: DOC201
+        if filename not in self._files:
+            path = filename.replace("\\", "/")
+            basename = path.rsplit("/", maxsplit=1)[-1]
+            candidates = [
+                module
+                for module in self._by_basename.get(basename, [])
+                if path == module or path.endswith(f"/{module}")
+            ]
+            # the longest suffix is the most specific match
+            self._files[filename] = max(candidates, key=len, default=None)
+        return self._files[filename]
+
+
+class ProfileIndex:
+    """Maps pstats ``(filename, firstlineno, funcname)`` keys onto scan symbols.
+
+    Functions are indexed by ``(module, firstlineno)``, so every entry is
+    one path match (cached per file) and one dict lookup.
+    """
+
+    def __init__(self, dependencies: dict[str, Any]) -> "ProfileIndex":  # noqa: D107
+        self.nodes: dict[str, dict[str, Any]] = {}
+        self._symbols: dict[tuple[str, int], tuple[str, str]] = {}
+        for symbol, module, qualname, node in iter_functions(dependencies):
+            self.nodes[symbol] = node
+            name = qualname.rsplit(".", maxsplit=1)[-1]
+            for lineno in {node["lineno"], node.get("firstlineno", node["lineno"])}:
+                self._symbols[module, lineno] = (symbol, name)
+        self.files = ModuleFiles(
+            [module_info["module"] for module_info in dependencies.get("modules", [])],
+        )
+
+    def symbol(self, key: ProfileKey) -> str | None:
+        """Scan symbol of one pstats entry, or None for code outside the scan."""  # noqa: DOC201
+        filename, lineno, funcname = key
+        module = self.files.module(filename)
+        if module is None:
+            return None
+        found = self._symbols.get((module, lineno))
+        if found is None or found[1] != funcname:
+            return None
+        return found[0]
+
+
+def _function_times(cc: int, nc: int, tt: float, ct: float) -> dict[str, Any]:
+    return {
+        "calls": nc,
+        "primitive_calls": cc,
+        "own_time": tt,
+        "cumulative_time": ct,
+    }
+
+
+def apply_profile(
+    dependencies: dict[str, Any],
+    stats: dict[ProfileKey, tuple],
+) -> dict[str, Any]:
+    """Profile times of a scan's functions, summarised; the scan is not modified.
+
+    ``functions`` maps every matched function symbol to its call counts
+    and own and cumulative seconds; caller -> callee pairs between scanned
+    functions become weighted call-graph edges. Handlers are ranked by
+    cumulative time, and the most expensive code outside the scan is
+    listed by own time.
+    """  # noqa: DOC201
+    index = ProfileIndex(dependencies)
+    functions: dict[str, dict[str, Any]] = {}
+    edges: dict[tuple[str, str], dict[str, Any]] = {}
+    unmatched = []
+    total_time = 0.0
+    for key, (cc, nc, tt, ct, callers) in stats.items():
+        total_time += tt
+        symbol = index.symbol(key)
+        if symbol is None:
+            function = f"{key[0]}:{key[1]}({key[2]})"
+            unmatched.append({"function": function, "own_time": tt, "calls": nc})
+            continue
+        times = _function_times(cc, nc, tt, ct)
+        if symbol in functions:
+            # one function seen under several keys, e.g. reloaded code
+            for field, value in times.items():
+                functions[symbol][field] += value
+        else:
+            functions[symbol] = times
+        for caller_key, caller_stats in callers.items():
+            caller = index.symbol(caller_key)
+            if caller is None:
+                continue
+            # cProfile keeps (cc, nc, tt, ct) per caller, profile only a count
+            if isinstance(caller_stats, tuple):
+                calls, time = caller_stats[1], caller_stats[3]
+            else:
+                calls, time = caller_stats, 0.0
+            edge = edges.setdefault(
+                (caller, symbol),
+                {
+                    "caller": caller,
+                    "callee": symbol,
+                    "calls": 0,
+                    "cumulative_time": 0.0,
+                },
+            )
+            edge["calls"] += calls
+            edge["cumulative_time"] += time
+
+    handlers = []
+    for symbol, times in functions.items():
+        node = index.nodes[symbol]
+        if node.get("type") == "handler":
+            handlers.append(
+                {
+                    "symbol": symbol,
+                    "http_method": node.get("http_method"),
+                    "path": node.get("path"),
+                    **times,
+                    "time_per_call": times["cumulative_time"] / times["calls"]
+                    if times["calls"]
+                    else 0.0,
+                },
+            )
+    handlers.sort(key=lambda handler: -handler["cumulative_time"])
+    unmatched.sort(key=lambda entry: -entry["own_time"])
+
+    return {
+        "entries": len(stats),
+        "matched_functions": len(functions),
+        "total_time": total_time,
+        "matched_own_time": sum(times["own_time"] for times in functions.values()),
+        "functions": functions,
+        "handlers": handlers,
+        "edges": sorted(edges.values(), key=lambda edge: -edge["cumulative_time"]),
+        "unmatched": unmatched[:TOP_UNMATCHED],
+    }
@@ -1,14 +1,19 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pathlib import Path
 
 class ScanRequest(BaseModel):
     repo_root: str
-    root_module: Optional[str] = None
+    root_module: Optional[str] = None  # entry module; scan only what it reaches
     include_tests: Optional[bool] = False
-    max_depth: int = 0  # 0 = unlimited
+    max_depth: int = 0  # import hops from root_module, 0 = unlimited
     verbose: Optional[bool] = False
+    mode: Literal["full", "endpoints"] = "full"  # endpoints = decorators only
+    compact_cfg: bool = False  # merge CFG statements into basic blocks
+    share_cfg_shapes: bool = False  # identical CFG shapes stored once in cfg_shapes
+    analyses: List[str] = []  # optional layers, see analysis_layers.ANALYSIS_LAYERS
+    analysis_options: Dict[str, Dict[str, Any]] = {}  # per-layer options by layer name
 
 class EndpointModel(BaseModel):
     file: str
@@ -16,6 +21,8 @@ class EndpointModel(BaseModel):
     path: Optional[str] = None
     methods: Optional[List[str]] = None
     framework: Optional[str] = None  # e.g. fastapi, flask, unknown
+    lineno: Optional[int] = None
 
 class ScanResult(BaseModel):
+    scan_id: Optional[str] = None
     dependencies: Optional[Dict[str, Any]] = {}
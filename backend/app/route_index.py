@@ -0,0 +1,458 @@
+import ast  # noqa: D100
+from pathlib import Path
+from typing import Any
+
+from .pydantic_models import EndpointModel
+
+HTTP_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "trace"}
+ROUTER_FACTORIES = {"APIRouter", "FastAPI"}
+
+
+def _dotted_module_name(file_path: str) -> str:
+    module_name = file_path[:-3].replace("/", ".")
+    if module_name.endswith(".__init__") or module_name == "__init__":
+        return module_name.rsplit(".", maxsplit=1)[0] if "." in module_name else ""
+    return module_name
+
+
+def _call_name(node: ast.AST) -> str | None:
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+class RouteCollector(ast.NodeVisitor):
+    """Collect routers, route decorators and ``include_router`` calls of one module.
+
+    Only module structure is inspected: no call analysis and no CFGs.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        module_file: str,
+        module_to_file: dict[str, str],
+    ) -> "RouteCollector":
+        self.module_file = module_file
+        self.module_to_file = module_to_file
+        module_name = _dotted_module_name(module_file)
+        self.package = (
+            module_name
+            if module_file.endswith("__init__.py")
+            else module_name.rpartition(".")[0]
+        )
+
+        self.routers: dict[str, ast.AST | None] = {}  # variable -> prefix expr
+        self.constants: dict[str, ast.AST] = {}
+        self.classes: dict[str, dict[str, ast.AST]] = {}
+        self.instances: dict[str, str] = {}  # variable -> class name
+        # local name -> (module file, attribute or None for the module itself)
+        self.imports: dict[str, tuple[str, str | None]] = {}
+        self.handlers: list[dict[str, Any]] = []
+        self.includes: list[tuple[str, ast.AST, ast.AST | None]] = []
+
+    def visit_Import(self, node: ast.Import) -> None:  # noqa: D102
+        for alias in node.names:
+            module_file = self.module_to_file.get(alias.name)
+            if module_file is None:
+                continue
+            if alias.asname:
+                self.imports[alias.asname] = (module_file, None)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:  # noqa: D102
+        if node.level:
+            parts = self.package.split(".") if self.package else []
+            if node.level > 1:
+                parts = parts[: -(node.level - 1)]
+            if node.module:
+                parts.append(node.module)
+            source = ".".join(parts)
+        else:
+            source = node.module or ""
+
+        for alias in node.names:
+            local_name = alias.asname or alias.name
+            submodule = f"{source}.{alias.name}" if source else alias.name
+            if submodule in self.module_to_file:
+                self.imports[local_name] = (self.module_to_file[submodule], None)
+            elif source in self.module_to_file:
+                self.imports[local_name] = (self.module_to_file[source], alias.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:  # noqa: D102
+        attributes = {}
+        for item in node.body:
+            if (
+                isinstance(item, ast.AnnAssign)
+                and isinstance(item.target, ast.Name)
+                and item.value is not None
+            ):
+                attributes[item.target.id] = item.value
+            elif (
+                isinstance(item, ast.Assign)
+                and len(item.targets) == 1
+                and isinstance(item.targets[0], ast.Name)
+            ):
+                attributes[item.targets[0].id] = item.value
+        self.classes[node.name] = attributes
+        self.generic_visit(node)
+
+    def _record_assignment(self, target: ast.AST, value: ast.AST | None) -> None:
+        if not isinstance(target, ast.Name) or value is None:
+            return
+        if isinstance(value, ast.Call) and _call_name(value) in ROUTER_FACTORIES:
+            prefix = next(
+                (kw.value for kw in value.keywords if kw.arg == "prefix"),
+                None,
+            )
+            self.routers[target.id] = prefix
+        elif isinstance(value, ast.Call) and isinstance(value.func, ast.Name):
+            self.instances[target.id] = value.func.id
+        else:
+            self.constants[target.id] = value
+
+    def visit_Assign(self, node: ast.Assign) -> None:  # noqa: D102
+        if len(node.targets) == 1:
+            self._record_assignment(node.targets[0], node.value)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:  # noqa: D102
+        self._record_assignment(node.target, node.value)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:  # noqa: D102
+        if (
+            isinstance(node.func, ast.Attribute)
+            and node.func.attr == "include_router"
+            and isinstance(node.func.value, ast.Name)
+        ):
+            child = node.args[0] if node.args else None
+            prefix = node.args[1] if len(node.args) > 1 else None
+            for keyword in node.keywords:
+                if keyword.arg == "router":
+                    child = keyword.value
+                elif keyword.arg == "prefix":
+                    prefix = keyword.value
+            if child is not None:
+                self.includes.append((node.func.value.id, child, prefix))
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:  # noqa: D102
+        for decorator in node.decorator_list:
+            route = self._parse_route_decorator(decorator)
+            if route:
+                route.update({"function": node.name, "lineno": node.lineno})
+                self.handlers.append(route)
+                break
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # noqa: N815
+
+    def _parse_route_decorator(self, decorator: ast.AST) -> dict[str, Any] | None:
+        # same shapes as DeclarationCollector._parse_router_decorator, but for
+        # any router or app variable, not only one called `router`
+        call = decorator if isinstance(decorator, ast.Call) else None
+        func = call.func if call else decorator
+        if not (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)):
+            return None
+
+        router = func.value.id
+        if (
+            router not in self.routers
+            and router not in self.imports
+            and router != "router"
+        ):
+            return None
+
+        if func.attr in HTTP_METHODS:
+            methods = [func.attr.upper()]
+        elif func.attr == "api_route":
+            methods = ["GET"]
+            for keyword in call.keywords if call else []:
+                if keyword.arg == "methods" and isinstance(
+                    keyword.value,
+                    (ast.List, ast.Tuple),
+                ):
+                    methods = [
+                        element.value.upper()
+                        for element in keyword.value.elts
+                        if isinstance(element, ast.Constant)
+                        and isinstance(element.value, str)
+                    ]
+        else:
+            return None
+
+        path = None
+        if call and call.args:
+            path = call.args[0]
+        elif call:
+            path = next((kw.value for kw in call.keywords if kw.arg == "path"), None)
+        return {"router": router, "path": path, "methods": methods}
+
+
+class RouterResolver:
+    """Resolve router prefixes across modules, following imports and re-exports."""
+
+    def __init__(self, collectors: dict[str, RouteCollector]) -> "RouterResolver":  # noqa: D107
+        self.collectors = collectors
+
+    def _definition(
+        self,
+        module_file: str,
+        name: str,
+        seen: set[tuple[str, str]] | None = None,
+    ) -> tuple[str, str | None] | None:
+        # follow imports and re-exports to the module that defines `name`
+        seen = seen or set()
+        if (module_file, name) in seen or module_file not in self.collectors:
+            return None
+        seen.add((module_file, name))
+
+        collector = self.collectors[module_file]
+        if (
+            name in collector.routers
+            or name in collector.constants
+            or name in collector.instances
+            or name in collector.classes
+        ):
+            return module_file, name
+        if name in collector.imports:
+            target_file, attribute = collector.imports[name]
+            if attribute is None:
+                return target_file, None
+            return self._definition(target_file, attribute, seen)
+        return None
+
+    def _resolve_reference(
+        self,
+        module_file: str,
+        node: ast.AST,
+    ) -> tuple[str, str | None] | None:
+        if isinstance(node, ast.Name):
+            return self._definition(module_file, node.id)
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            base = self._definition(module_file, node.value.id)
+            if base and base[1] is None:
+                return self._definition(base[0], node.attr)
+        return None
+
+    def _resolve_string(  # noqa: PLR0911
+        self,
+        module_file: str,
+        node: ast.AST | None,
+        depth: int = 0,
+    ) -> str | None:
+        if node is None:
+            return ""
+        if depth > 8:  # noqa: PLR2004
+            return None
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left = self._resolve_string(module_file, node.left, depth + 1)
+            right = self._resolve_string(module_file, node.right, depth + 1)
+            return None if left is None or right is None else left + right
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value in node.values:
+                part = self._resolve_string(
+                    module_file,
+                    value.value if isinstance(value, ast.FormattedValue) else value,
+                    depth + 1,
+                )
+                if part is None:
+                    return None
+                parts.append(part)
+            return "".join(parts)
+
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            # settings.API_V1_STR where settings = Settings()
+            base = self._definition(module_file, node.value.id)
+            if base and base[1] is not None:
+                collector = self.collectors[base[0]]
+                class_name = collector.instances.get(base[1])
+                if class_name in collector.classes:
+                    value = collector.classes[class_name].get(node.attr)
+                    return self._resolve_string(base[0], value, depth + 1)
+
+        reference = self._resolve_reference(module_file, node)
+        if reference and reference[1] is not None:
+            value = self.collectors[reference[0]].constants.get(reference[1])
+            if value is not None:
+                return self._resolve_string(reference[0], value, depth + 1)
+        return None
+
+    def _prefix(self, module_file: str, node: ast.AST | None) -> str:
+        value = self._resolve_string(module_file, node)
+        # keep unresolved prefixes visible instead of dropping them
+        return value if value is not None else "{" + ast.unparse(node) + "}"
+
+    def resolve_endpoints(self) -> list[dict[str, Any]]:
+        """Return ``EndpointModel`` records with fully prefixed paths."""  # noqa: DOC201
+        own_prefix: dict[tuple[str, str], str] = {}
+        for module_file, collector in self.collectors.items():
+            for name, prefix in collector.routers.items():
+                own_prefix[module_file, name] = self._prefix(module_file, prefix)
+
+        children: dict[tuple[str, str], list[tuple[tuple[str, str], str]]] = {}
+        included = set()
+        for module_file, collector in self.collectors.items():
+            for parent_name, child, prefix in collector.includes:
+                parent = self._definition(module_file, parent_name)
+                child_ref = self._resolve_reference(module_file, child)
+                if not parent or not child_ref or child_ref not in own_prefix:
+                    continue
+                children.setdefault(parent, []).append(
+                    (child_ref, self._prefix(module_file, prefix)),
+                )
+                included.add(child_ref)
+
+        mounts: dict[tuple[str, str], list[str]] = {}
+        stack = [
+            (router, prefix, frozenset([router]))
+            for router, prefix in own_prefix.items()
+            if router not in included
+        ]
+        while stack:
+            router, mount, path = stack.pop()
+            mounts.setdefault(router, []).append(mount)
+            for child, include_prefix in children.get(router, []):
+                if child not in path:
+                    child_mount = mount + include_prefix + own_prefix[child]
+                    stack.append((child, child_mount, path | {child}))
+
+        endpoints = []
+        for module_file, collector in self.collectors.items():
+            for handler in collector.handlers:
+                router = self._definition(module_file, handler["router"])
+                path = (
+                    self._prefix(module_file, handler["path"])
+                    if handler["path"]
+                    else "/"
+                )
+                for mount in mounts.get(router, [own_prefix.get(router, "")]):
+                    endpoint = EndpointModel(
+                        file=module_file,
+                        function=handler["function"],
+                        path=mount + path if mount else path,
+                        methods=handler["methods"],
+                        framework="fastapi",
+                        lineno=handler["lineno"],
+                    )
+                    endpoints.append(endpoint.model_dump())
+        return endpoints
+
+
+class RouteIndex:
+    """Endpoint records indexed in a path-segment trie."""
+
+    def __init__(self, endpoints: list[dict[str, Any]]) -> "RouteIndex":  # noqa: D107
+        self.endpoints = endpoints
+        self.trie = RouteTrie()
+        for i, endpoint in enumerate(endpoints):
+            self.trie.insert(endpoint["path"] or "/", i)
+
+    def match(self, path: str, method: str | None = None) -> list[dict[str, Any]]:
+        """Endpoints whose path template matches ``path``, most specific first."""  # noqa: DOC201
+        matches = []
+        for endpoint_id, params in self.trie.match(path):
+            endpoint = self.endpoints[endpoint_id]
+            if method and method.upper() not in (endpoint["methods"] or []):
+                continue
+            matches.append({**endpoint, "params": params})
+        return matches
+
+
+class _TrieNode:
+    __slots__ = ("catch_all", "endpoints", "param", "param_names", "static")
+
+    def __init__(self) -> "_TrieNode":
+        self.static: dict[str, _TrieNode] = {}
+        self.param: _TrieNode | None = None
+        self.param_names: list[list[str]] = []
+        self.endpoints: list[int] = []
+        # (catch-all name, endpoint id, names of the parameters before it)
+        self.catch_all: list[tuple[str, int, list[str]]] = []
+
+
+class RouteTrie:
+    """Path-segment trie; ``{name}`` segments match any single segment."""
+
+    def __init__(self) -> "RouteTrie":  # noqa: D107
+        self.root = _TrieNode()
+
+    def insert(self, path: str, endpoint_id: int) -> None:  # noqa: D102
+        node = self.root
+        params = []
+        for segment in (part for part in path.split("/") if part):
+            if segment.startswith("{") and segment.endswith("}"):
+                name = segment[1:-1]
+                if name.endswith(":path"):
+                    node.catch_all.append(
+                        (name.removesuffix(":path"), endpoint_id, params),
+                    )
+                    return
+                if node.param is None:
+                    node.param = _TrieNode()
+                node = node.param
+                params.append(name.split(":", maxsplit=1)[0])
+            else:
+                node = node.static.setdefault(segment, _TrieNode())
+        node.endpoints.append(endpoint_id)
+        node.param_names.append(params)
+
+    def match(self, path: str) -> list[tuple[int, dict[str, str]]]:
+        """Return ``(endpoint_id, params)`` pairs, static segments preferred."""  # noqa: DOC201
+        segments = [part for part in path.split("/") if part]
+        results: list[tuple[int, dict[str, str]]] = []
+        # (node, position, captured values) - static children are pushed last
+        # so that they are explored first
+        stack = [(self.root, 0, ())]
+        while stack:
+            node, position, values = stack.pop()
+            for name, endpoint_id, names in node.catch_all:
+                if position < len(segments):
+                    rest = "/".join(segments[position:])
+                    params = dict(zip(names, values)) | {name: rest}
+                    results.append((endpoint_id, params))
+            if position == len(segments):
+                for endpoint_id, names in zip(node.endpoints, node.param_names):
+                    results.append((endpoint_id, dict(zip(names, values))))
+                continue
+            segment = segments[position]
+            if node.param is not None:
+                stack.append((node.param, position + 1, (*values, segment)))
+            if segment in node.static:
+                stack.append((node.static[segment], position + 1, values))
+        return results
+
+
+def build_route_index(
+    project_root: str,
+    module_files: list[str],
+    trees: dict[str, ast.Module] | None = None,
+) -> RouteIndex:
+    """Parse (or reuse parsed) modules and build their route index."""  # noqa: DOC201
+    root = Path(project_root)
+    module_to_file = {}
+    for module_file in module_files:
+        module_name = _dotted_module_name(module_file)
+        if module_name:
+            module_to_file[module_name] = module_file
+
+    collectors = {}
+    for module_file in module_files:
+        tree = (trees or {}).get(module_file)
+        if tree is None:
+            try:
+                source = (root / module_file).read_text(encoding="utf-8")
+                tree = ast.parse(source, filename=module_file)
+            except (SyntaxError, UnicodeDecodeError, FileNotFoundError):
+                continue
+        collector = RouteCollector(module_file, module_to_file)
+        collector.visit(tree)
+        collectors[module_file] = collector
+
+    return RouteIndex(RouterResolver(collectors).resolve_endpoints())
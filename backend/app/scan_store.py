@@ -0,0 +1,96 @@
+import hashlib  # noqa: D100
+import json
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+def compute_scan_fingerprint(
+    project_path: str,
+    excluded_dirs: list[str],
+    params: dict[str, Any],
+) -> str:
+    """Hash scan parameters together with path, size and mtime of every source file."""  # noqa: DOC201
+    project_root = Path(project_path).resolve()
+    if not project_root.exists():
+        msg = f"Директория {project_root} не существует"
+        raise FileNotFoundError(msg)
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(str(project_root).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+
+    entries = []
+    for py_file in project_root.rglob("*.py"):
+        rel_path = py_file.relative_to(project_root).as_posix()
+        if any(excl in rel_path.split("/") for excl in excluded_dirs):
+            continue
+        stat = py_file.stat()
+        entries.append(f"{rel_path}:{stat.st_size}:{stat.st_mtime_ns}")
+
+    for entry in sorted(entries):
+        digest.update(entry.encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()[:16]
+
+
+class ScanStore:
+    """In-memory LRU registry of scan results keyed by their fingerprint."""
+
+    def __init__(self, max_scans: int = 8) -> "ScanStore":  # noqa: D107
+        self.max_scans = max_scans
+        self._scans: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._derived: dict[str, dict[str, Any]] = {}
+        # uploaded runtime data (profiles, coverage, ...) kept next to a scan,
+        # so the cached scan result itself is never modified
+        self._overlays: dict[str, dict[str, Any]] = {}
+        self._latest: str | None = None
+
+    def put(self, scan_id: str, dependencies: dict[str, Any]) -> None:  # noqa: D102
+        self._scans[scan_id] = dependencies
+        self._scans.move_to_end(scan_id)
+        self._latest = scan_id
+        while len(self._scans) > self.max_scans:
+            evicted, _ = self._scans.popitem(last=False)
+            self._derived.pop(evicted, None)
+            self._overlays.pop(evicted, None)
+
+    def touch(self, scan_id: str) -> None:
+        """Mark a stored scan, e.g. a rescan served from cache, as the latest."""
+        self._scans.move_to_end(scan_id)
+        self._latest = scan_id
+
+    def get(self, scan_id: str | None = None) -> dict[str, Any] | None:
+        """Return a stored scan, or the most recent one when ``scan_id`` is None."""  # noqa: DOC201
+        if scan_id is None:
+            scan_id = self._latest
+        if scan_id is None or scan_id not in self._scans:
+            return None
+        self._scans.move_to_end(scan_id)
+        return self._scans[scan_id]
+
+    def derived(
+        self,
+        scan_id: str,
+        key: str,
+        factory: Callable[[dict[str, Any]], Any],
+    ) -> Any:  # noqa: ANN401
+        """Return a value computed from a stored scan, building it once per fingerprint."""  # noqa: DOC201
+        cache = self._derived.setdefault(scan_id, {})
+        if key not in cache:
+            cache[key] = factory(self._scans[scan_id])
+        return cache[key]
+
+    def put_overlay(self, scan_id: str, name: str, value: Any) -> None:  # noqa: ANN401
+        """Attach (or replace) an overlay of a stored scan."""
+        if scan_id in self._scans:
+            self._overlays.setdefault(scan_id, {})[name] = value
+
+    def overlay(self, scan_id: str, name: str) -> Any:  # noqa: ANN401
+        """Return an overlay of a stored scan, or None if none was attached."""  # noqa: DOC201
+        return self._overlays.get(scan_id, {}).get(name)
+
+    def latest_id(self) -> str | None:  # noqa: D102
+        return self._latest if self._latest in self._scans else None
@@ -0,0 +1,259 @@
+import re  # noqa: D100
+from collections.abc import Iterable
+from typing import Any
+
+from .call_graph import iter_functions
+from .cfg_shapes import function_cfg
+from .profile_overlay import ModuleFiles
+
+# py-spy: ``handler (app/views.py:12)``, line optional
+PY_SPY_FRAME = re.compile(
+    r"^(?P<name>.+?) \((?P<file>[^()]+?)(?::(?P<line>\d+))?\)$",
+)
+# austin: ``app/views.py:handler:12``
+AUSTIN_FRAME = re.compile(r"^(?P<file>.+?\.pyx?):(?P<name>[^:]+):(?P<line>\d+)$")
+TOP_UNRESOLVED = 20
+# nested flame graphs deeper than this do not serialise as JSON responses
+FLAME_MAX_DEPTH = 100
+
+# flame tree node while importing: [samples, {symbol: child node}]
+FlameNode = list[Any]
+
+
+def parse_frame(frame: str) -> tuple[str, str | None, int | None]:
+    """``(function name, file, line)`` of one collapsed-stack frame."""  # noqa: DOC201
+    match = PY_SPY_FRAME.match(frame) or AUSTIN_FRAME.match(frame)
+    if match is None:
+        return frame, None, None
+    line = match.group("line")
+    return match.group("name"), match.group("file"), int(line) if line else None
+
+
+class FrameResolver:
+    """Resolves collapsed-stack frames to scan symbols, once per distinct frame.
+
+    A frame names a function and usually its file and current line; the
+    file narrows the candidates to one module and the line picks the
+    function whose span contains it. A bare name resolves only if no other
+    scanned function shares it.
+    """
+
+    def __init__(self, dependencies: dict[str, Any]) -> "FrameResolver":  # noqa: D107
+        self.files = ModuleFiles(
+            [module_info["module"] for module_info in dependencies.get("modules", [])],
+        )
+        # short name -> (module, symbol, first line, last line)
+        self.by_name: dict[str, list[tuple[str, str, int, int]]] = {}
+        self._cache: dict[str, str | None] = {}
+        for symbol, module, qualname, node in iter_functions(dependencies):
+            first = node.get("firstlineno", node["lineno"])
+            cfg_nodes = function_cfg(dependencies, node).get("nodes", [])
+            last = max(
+                [node["lineno"], *(item.get("end_lineno") or 0 for item in cfg_nodes)],
+            )
+            short_name = qualname.rsplit(".", maxsplit=1)[-1]
+            entry = (module, symbol, first, last)
+            self.by_name.setdefault(short_name, []).append(entry)
+
+    def resolve(self, frame: str) -> str | None:
+        """Scan symbol of a frame, or None for code outside the scan."""  # noqa: DOC201
+        if frame not in self._cache:
+            self._cache[frame] = self._resolve(*parse_frame(frame))
+        return self._cache[frame]
+
+    def _resolve(self, name: str, file: str | None, line: int | None) -> str | None:
+        # qualified names (``Class.method``) are matched on their last part
+        candidates = self.by_name.get(name.rsplit(".", maxsplit=1)[-1], [])
+        if file is not None:
+            module = self.files.module(file)
+            candidates = [item for item in candidates if item[0] == module]
+        if line is not None and len(candidates) > 1:
+            candidates = [item for item in candidates if item[2] <= line <= item[3]]
+        return candidates[0][1] if len(candidates) == 1 else None
+
+
+class CollapsedStackImporter:
+    """Streaming aggregator of ``frame;frame;frame count`` sample lines.
+
+    Unresolved frames are dropped from each stack, so consecutive scanned
+    functions form a call-graph edge even with library code between them.
+    A function's inclusive weight counts each sample once, however often
+    it recurses; its exclusive weight is the samples where it was the
+    innermost scanned function (its own code or the libraries it called).
+    """
+
+    def __init__(self, dependencies: dict[str, Any]) -> "CollapsedStackImporter":  # noqa: D107
+        self.resolver = FrameResolver(dependencies)
+        self.nodes = {
+            symbol: node for symbol, _, _, node in iter_functions(dependencies)
+        }
+        self.total = 0
+        self.resolved = 0
+        self.skipped_lines = 0
+        self.inclusive: dict[str, int] = {}
+        self.exclusive: dict[str, int] = {}
+        self.edges: dict[tuple[str, str], int] = {}
+        self.unresolved: dict[str, int] = {}
+        self.flame: FlameNode = [0, {}]
+        self._buffer = b""
+
+    def add_line(self, line: str) -> None:
+        """Aggregate one ``stack count`` line, counting malformed ones as skipped."""
+        line = line.strip()
+        if not line:
+            return
+        stack, _, count = line.rpartition(" ")
+        try:
+            samples = int(count)
+        except ValueError:
+            self.skipped_lines += 1
+            return
+        if not stack:
+            self.skipped_lines += 1
+            return
+
+        self.total += samples
+        self.flame[0] += samples
+        symbols = []
+        for frame in stack.split(";"):
+            symbol = self.resolver.resolve(frame)
+            if symbol is None:
+                self.unresolved[frame] = self.unresolved.get(frame, 0) + samples
+            else:
+                symbols.append(symbol)
+        if not symbols:
+            return
+
+        self.resolved += samples
+        for symbol in set(symbols):
+            self.inclusive[symbol] = self.inclusive.get(symbol, 0) + samples
+        self.exclusive[symbols[-1]] = self.exclusive.get(symbols[-1], 0) + samples
+        for edge in set(zip(symbols, symbols[1:])):
+            self.edges[edge] = self.edges.get(edge, 0) + samples
+        node = self.flame
+        for index, symbol in enumerate(symbols):
+            # direct self-recursion is one flame frame
+            if index and symbol == symbols[index - 1]:
+                continue
+            node = node[1].setdefault(symbol, [0, {}])
+            node[0] += samples
+
+    def add_lines(self, lines: Iterable[str]) -> None:  # noqa: D102
+        for line in lines:
+            self.add_line(line)
+
+    def feed(self, chunk: bytes) -> None:
+        """Aggregate the complete lines of a chunk of a streamed file."""
+        *lines, self._buffer = (self._buffer + chunk).split(b"\n")
+        for line in lines:
+            self.add_line(line.decode(errors="replace"))
+
+    def close(self) -> None:
+        """Aggregate what is left after the last newline of a streamed file."""
+        if self._buffer:
+            self.add_line(self._buffer.decode(errors="replace"))
+            self._buffer = b""
+
+    def to_dict(self) -> dict[str, Any]:
+        """Weighted call graph of the samples; the scan's nodes are not modified."""  # noqa: DOC201
+        nodes = []
+        for symbol, inclusive in self.inclusive.items():
+            nodes.append(
+                {
+                    "symbol": symbol,
+                    "type": self.nodes[symbol].get("type"),
+                    "inclusive": inclusive,
+                    "exclusive": self.exclusive.get(symbol, 0),
+                    "inclusive_share": inclusive / self.total if self.total else 0.0,
+                },
+            )
+        nodes.sort(key=lambda node: (-node["inclusive"], node["symbol"]))
+        unresolved = sorted(self.unresolved.items(), key=lambda item: -item[1])
+        return {
+            "total_samples": self.total,
+            "resolved_samples": self.resolved,
+            "skipped_lines": self.skipped_lines,
+            "nodes": nodes,
+            "edges": [
+                {"caller": caller, "callee": callee, "weight": weight}
+                for (caller, callee), weight in sorted(
+                    self.edges.items(),
+                    key=lambda item: -item[1],
+                )
+            ],
+            "flamegraph": flame_frames("all", self.flame),
+            "unresolved_frames": [
+                {"frame": frame, "samples": samples}
+                for frame, samples in unresolved[:TOP_UNRESOLVED]
+            ],
+        }
+
+
+def flame_frames(name: str, node: FlameNode) -> list[dict[str, Any]]:
+    """Flame graph as ``{name, value, parent}`` frames in preorder, heaviest first.
+
+    A flat list, unlike a nested tree, serialises however deep the sampled
+    stacks were; ``parent`` is the index of the calling frame, -1 at the root.
+    """  # noqa: DOC201
+    frames = []
+    stack = [(name, node, -1)]
+    while stack:
+        name, (value, children), parent = stack.pop()
+        frames.append({"name": name, "value": value, "parent": parent})
+        index = len(frames) - 1
+        # pushed lightest first, so the heaviest child is visited first
+        for child, grandchild in sorted(children.items(), key=lambda item: item[1][0]):
+            stack.append((child, grandchild, index))
+    return frames
+
+
+def flame_subtree(
+    frames: list[dict[str, Any]],
+    root: str | None = None,
+    max_depth: int | None = None,
+) -> dict[str, Any]:
+    """``{name, value, children}`` flame graph under ``root``, over all its call paths.
+
+    Outermost occurrences of ``root`` are merged, so recursion is not
+    counted twice; without ``root`` the whole graph is returned. The tree
+    is cut below ``max_depth`` levels, and never deeper than
+    ``FLAME_MAX_DEPTH``.
+    """  # noqa: DOC201
+    children: list[list[int]] = [[] for _ in frames]
+    for index, frame in enumerate(frames):
+        if frame["parent"] >= 0:
+            children[frame["parent"]].append(index)
+    if root is None:
+        starts = [0]
+    else:
+        starts = []
+        stack = [0]
+        while stack:
+            for child in children[stack.pop()]:
+                (starts if frames[child]["name"] == root else stack).append(child)
+
+    tree = {
+        "name": frames[0]["name"] if root is None else root,
+        "value": sum(frames[index]["value"] for index in starts),
+        "children": [],
+    }
+    depth = FLAME_MAX_DEPTH if max_depth is None else min(max_depth, FLAME_MAX_DEPTH)
+    stack = [(tree, starts, depth)]
+    while stack:
+        into, group, depth = stack.pop()
+        if depth <= 0:
+            continue
+        by_name: dict[str, list[int]] = {}
+        for index in group:
+            for child in children[index]:
+                by_name.setdefault(frames[child]["name"], []).append(child)
+        merged = [
+            (sum(frames[index]["value"] for index in same), name, same)
+            for name, same in by_name.items()
+        ]
+        merged.sort(key=lambda item: -item[0])
+        for value, name, same in merged:
+            node = {"name": name, "value": value, "children": []}
+            into["children"].append(node)
+            stack.append((node, same, depth - 1))
+    return tree
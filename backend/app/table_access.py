@@ -0,0 +1,211 @@
+import ast  # noqa: D100
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from .call_graph import CallGraph
+from .cfg_dataflow import FunctionNode, iter_function_defs
+from .db_calls import call_name
+from .di_graph import DependencyResolver
+from .graph_layout import strongly_connected_components
+from .orm_models import annotation_model, iter_models
+
+# last segment of a call -> how it touches the models passed as arguments:
+# classes (``select(Item)``, ``Item.id``) or instances (``session.add(item)``)
+READ_CALLS = ("select", "get", "query", "join", "outerjoin", "refresh")
+WRITE_CALLS = ("insert", "update", "delete", "add", "add_all", "merge")
+ACCESS_MODES = ("reads", "writes")
+# class methods that build a model instance
+INSTANCE_FACTORIES = ("model_validate", "from_orm")
+
+
+class _AccessVisitor(ast.NodeVisitor):
+    # models a function reads and writes itself; variables get the model of
+    # an annotation, a constructor call or ``session.get(Model, ...)``
+
+    def __init__(
+        self,
+        function: FunctionNode,
+        models: set[str],
+        resolve_alias: Callable[[ast.AST | None], ast.AST | None] | None = None,
+    ) -> "_AccessVisitor":
+        self.models = models
+        self.instances: dict[str, str] = {}
+        self.reads: set[str] = set()
+        self.writes: set[str] = set()
+        arguments = function.args
+        for arg in [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]:
+            annotation = arg.annotation
+            if resolve_alias is not None:
+                annotation = resolve_alias(annotation)
+            self._bind(arg.arg, annotation_model(annotation)[0])
+        for statement in function.body:
+            self.visit(statement)
+
+    def _bind(self, name: str, model: str | None) -> None:
+        if model in self.models:
+            self.instances[name] = model
+        else:
+            self.instances.pop(name, None)
+
+    def _class_model(self, node: ast.AST) -> str | None:
+        # ``Item`` or a column of it, ``Item.id``
+        while isinstance(node, ast.Attribute):
+            node = node.value
+        if isinstance(node, ast.Name) and node.id in self.models:
+            return node.id
+        return None
+
+    def _value_model(self, node: ast.AST) -> str | None:
+        if isinstance(node, ast.Await):
+            node = node.value
+        if isinstance(node, ast.Name):
+            return self.instances.get(node.id)
+        if isinstance(node, ast.Call):
+            model = self._class_model(node.func)
+            # ``Item(...)``, or SQLModel's ``Item.model_validate(...)``
+            if model is not None and (
+                isinstance(node.func, ast.Name)
+                or node.func.attr in INSTANCE_FACTORIES
+            ):
+                return model
+            name = call_name(node) or ""
+            if name.rsplit(".", maxsplit=1)[-1] == "get" and node.args:
+                return self._class_model(node.args[0])
+        return None
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = call_name(node)
+        method = (name or "").rsplit(".", maxsplit=1)[-1]
+        if method in READ_CALLS or method in WRITE_CALLS:
+            accessed = self.reads if method in READ_CALLS else self.writes
+            arguments = list(node.args)
+            if method == "add_all" and arguments and isinstance(arguments[0], ast.List):
+                arguments = arguments[0].elts
+            for argument in arguments:
+                model = self._class_model(argument) or self._value_model(argument)
+                if model is not None:
+                    accessed.add(model)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self.generic_visit(node)
+        model = self._value_model(node.value)
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._bind(target.id, model)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self.generic_visit(node)
+        if isinstance(node.target, ast.Name):
+            model = annotation_model(node.annotation)[0]
+            if model not in self.models and node.value is not None:
+                model = self._value_model(node.value)
+            self._bind(node.target.id, model)
+
+    def _skip_scope(self, node: ast.AST) -> None:
+        # nested functions are analysed as functions of their own
+        pass
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = (
+        _skip_scope
+    )
+
+
+def direct_table_access(
+    function: FunctionNode,
+    tables: dict[str, str],
+    resolve_alias: Callable[[ast.AST | None], ast.AST | None] | None = None,
+) -> dict[str, set[str]]:
+    """Tables one function reads and writes itself, by ``{model: table}``.
+
+    ``resolve_alias`` expands parameter annotations that name a type alias,
+    such as ``CurrentUser = Annotated[User, Depends(...)]``.
+    """  # noqa: DOC201
+    visitor = _AccessVisitor(function, set(tables), resolve_alias)
+    return {
+        "reads": {tables[model] for model in visitor.reads},
+        "writes": {tables[model] for model in visitor.writes},
+    }
+
+
+class TableAccessIndex:
+    """Bipartite handler <-> table index of reads and writes, callees included.
+
+    Accesses propagate up the call graph once per strongly connected
+    component, in reverse topological order, so each function's set is
+    computed from the already finished sets of its callees.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        call_graph: CallGraph,
+        direct: dict[int, dict[str, set[str]]],
+    ) -> "TableAccessIndex":
+        component = strongly_connected_components(call_graph.successors)
+        size = max(component, default=-1) + 1
+        members: list[list[int]] = [[] for _ in range(size)]
+        for function_id, comp in enumerate(component):
+            members[comp].append(function_id)
+
+        self.functions: list[dict[str, set[str]]] = [{} for _ in component]
+        for functions in members:
+            access = {mode: set() for mode in ACCESS_MODES}
+            for function_id in functions:
+                for mode in ACCESS_MODES:
+                    access[mode] |= direct.get(function_id, {}).get(mode, set())
+                    for callee in call_graph.successors[function_id]:
+                        if component[callee] != component[function_id]:
+                            access[mode] |= self.functions[callee][mode]
+            for function_id in functions:
+                self.functions[function_id] = access
+
+        self.handlers: dict[str, dict[str, Any]] = {}
+        self.tables: dict[str, dict[str, list[str]]] = {}
+        for function_id, node in enumerate(call_graph.nodes):
+            if node.get("type") != "handler":
+                continue
+            symbol = call_graph.names[function_id]
+            access = self.functions[function_id]
+            self.handlers[symbol] = {
+                "http_method": node.get("http_method"),
+                "path": node.get("path"),
+                **{mode: sorted(access[mode]) for mode in ACCESS_MODES},
+            }
+            for mode in ACCESS_MODES:
+                for table in access[mode]:
+                    entry = self.tables.setdefault(
+                        table,
+                        {"read_by": [], "written_by": []},
+                    )
+                    entry["read_by" if mode == "reads" else "written_by"].append(symbol)
+
+    def to_dict(self) -> dict[str, Any]:  # noqa: D102
+        return {"handlers": self.handlers, "tables": self.tables}
+
+
+def table_access_layer(
+    dependencies: dict[str, Any],
+    analyzer: Any = None,  # noqa: ANN401
+    _options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Tables each handler reads and writes through its callees, and the reverse index."""  # noqa: DOC201
+    tables = {
+        node["name"]: node["table_name"]
+        for _, node in iter_models(dependencies)
+        if node.get("table_name")
+    }
+    call_graph = CallGraph(dependencies)
+    trees = analyzer.get_source_trees()
+    resolver = DependencyResolver(trees, analyzer.get_import_sources())
+    direct = {}
+    for module, tree in trees.items():
+        resolve_alias = partial(resolver.expand_alias, module)
+        for symbol, function in iter_function_defs(module, tree):
+            if symbol in call_graph.index:
+                direct[call_graph.index[symbol]] = direct_table_access(
+                    function,
+                    tables,
+                    resolve_alias,
+                )
+    return TableAccessIndex(call_graph, direct).to_dict()